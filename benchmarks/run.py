@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+from src.dolpa.dolpa import APITests, run_bulk_api_tests
+from src.dolpa.dolpa_utils import interpolate, get_dict_value_from_json_path
+from src.dolpa.comparator import Comparator
+from src.dolpa.dolpa_logger import configure_logging
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.2
+
+
+def build_runner_dict(base_url, resource, count, assertions=None, config=None, saves=None):
+    return {
+        'config': {'base_url': base_url, 'headers': {'agent': 'dolpa-bench'}, **(config or {})},
+        'calls': [{'identifier': index, 'resource': resource, 'method': 'GET', 'headers': {},
+                   'saves': {'status': '$.status'} if saves is None else saves, 'assertions': assertions or {}}
+                  for index in range(count)],
+    }
+
+
+def measure(operation, repeat):
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operations = operation()
+        best = max(best, operations / (time.perf_counter() - started))
+    return best
+
+
+def bench_run_all(base_url, resource, count, assertions=None, config=None, saves=None):
+    runner_dict = build_runner_dict(base_url, resource, count, assertions, config, saves)
+
+    def operation():
+        int_test = APITests(json.loads(json.dumps(runner_dict)))
+        try:
+            int_test.run_all()
+        finally:
+            int_test.close()
+        return count
+    return operation
+
+
+def bench_bulk(base_url, temp_dir, files, calls_per_file, workers):
+    for file_index in range(files):
+        with open(os.path.join(temp_dir, f'suite_{file_index:03d}.json'), 'w') as write_file:
+            json.dump(build_runner_dict(base_url, '/small', calls_per_file, {'statusCheck': '$.status==ok'}),
+                      write_file)
+
+    def operation():
+        run_bulk_api_tests(temp_dir, workers=workers)
+        return files * calls_per_file
+    return operation
+
+
+def bench_loop(function, iterations):
+    def operation():
+        for _ in range(iterations):
+            function()
+        return iterations
+    return operation
+
+
+def micro_benchmarks():
+    run_config = {'token': 'abc', 'user': 'alex', 'count': 3, 'base_url': 'http://localhost'}
+    template = {'user': '{{user}}', 'auth': 'Bearer {{token}}', 'items': [{'count': '{{count}}'}, 'static']}
+    response = {'data': {'users': [{'name': f'user-{index}', 'age': index} for index in range(50)]}}
+    return {
+        'interpolate': bench_loop(lambda: interpolate(template, run_config), 20000),
+        'json_path': bench_loop(lambda: get_dict_value_from_json_path(response, 'data.users[42].name'), 50000),
+        'comparator': bench_loop(
+            lambda: Comparator('ageCheck', '$.data.users[42].age>=40', run_config, response).execute(), 20000),
+    }
+
+
+def http_benchmarks(base_url, temp_dir):
+    return {
+        'run_all_small': bench_run_all(base_url, '/small', 200, {'statusCheck': '$.status==ok'}),
+        'run_all_large': bench_run_all(base_url, '/large', 5, {'totalCheck': '$.total>0'}),
+        'run_all_nested': bench_run_all(base_url, '/nested', 50, {'levelCheck': '$.tree.level==6'}),
+        'run_all_slow_concurrent': bench_run_all(base_url, '/slow?delay=0.05', 40, config={'maxConcurrentCalls': 10},
+                                                 saves={}),
+        'run_bulk_threads': bench_bulk(base_url, temp_dir, 20, 20, 4),
+    }
+
+
+def run_benchmarks(selected=None, repeat=3, with_server=True):
+    benchmarks = micro_benchmarks()
+    results = {}
+    if with_server:
+        from benchmarks.server import running_server
+        with running_server() as base_url, tempfile.TemporaryDirectory(prefix='dolpa-bench-') as temp_dir:
+            benchmarks.update(http_benchmarks(base_url, temp_dir))
+            results.update(_run_selected(benchmarks, selected, repeat))
+    else:
+        results.update(_run_selected(benchmarks, selected, repeat))
+    return results
+
+
+def _run_selected(benchmarks, selected, repeat):
+    results = {}
+    for name, operation in benchmarks.items():
+        if selected and name not in selected:
+            continue
+        results[name] = measure(operation, repeat)
+        print(f'{name:<28} {results[name]:>14.1f} ops/s')
+    return results
+
+
+def compare_with_baseline(results, baseline, threshold):
+    regressions = {}
+    for name, value in results.items():
+        expected = baseline.get(name)
+        if expected and value < expected * (1 - threshold):
+            regressions[name] = (value, expected)
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as read_file:
+        return json.load(read_file)['results']
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as write_file:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'unit': 'ops/s',
+                   'results': results}, write_file, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dolpa against a local stand-in API server.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown as a fraction of the baseline, e.g. 0.2 for 20%%')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='names of the benchmarks to run')
+    parser.add_argument('--no-server', action='store_true', help='only run the micro benchmarks')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    configure_logging(level='WARNING', queued=False)
+    results = run_benchmarks(args.only, args.repeat, not args.no_server)
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline or baseline is None:
+        save_baseline(args.baseline, {**(baseline or {}), **results})
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    for name, (value, expected) in regressions.items():
+        print(f'REGRESSION {name}: {value:.1f} ops/s, baseline {expected:.1f} ops/s')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import time
+import socket
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import uvicorn
+from fastapi import FastAPI
+
+app = FastAPI()
+
+
+def build_nested(depth, width):
+    if depth == 0:
+        return {'value': depth, 'name': 'leaf'}
+    return {'level': depth, 'children': [build_nested(depth - 1, width) for _ in range(width)]}
+
+
+LARGE_ITEMS = [{'id': index, 'name': f'item-{index}', 'tags': ['a', 'b', 'c'], 'price': index * 1.5}
+               for index in range(20000)]
+NESTED = build_nested(6, 3)
+
+
+@app.get('/small')
+@app.post('/small')
+async def small():
+    return {'token': 'abc', 'status': 'ok', 'count': 3}
+
+
+@app.get('/large')
+async def large():
+    return {'status': 'ok', 'total': len(LARGE_ITEMS), 'items': LARGE_ITEMS}
+
+
+@app.get('/slow')
+async def slow(delay: float = 0.05):
+    await asyncio.sleep(delay)
+    return {'status': 'ok', 'delay': delay}
+
+
+@app.get('/nested')
+async def nested():
+    return {'status': 'ok', 'tree': NESTED}
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(port=None):
+    port = port or find_free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning', access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError(f'Benchmark server did not start on port {port}')
+        time.sleep(0.01)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,20 @@
+import importlib
+
+_EXPORTS = {
+    'APITests': 'dolpa',
+    'run_api_tests': 'dolpa',
+    'run_bulk_api_tests': 'dolpa',
+    'get_api_test_handler': 'dolpa',
+    'SuiteWatcher': 'watch',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,215 @@
+import os
+import io
+import mmap
+import uuid
+import base64
+import hashlib
+import tempfile
+import importlib
+import mimetypes
+
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import InValidCallAttributeError
+
+BODY_SOURCE_TYPES = ('file', 'bytes', 'generator', 'multipart')
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def resolve_path(path, base_dir=None):
+    if base_dir and not os.path.isabs(path):
+        return os.path.join(base_dir, path)
+    return path
+
+
+class EmptyFile:
+    def read(self, size=-1):
+        return b''
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def close(self):
+        pass
+
+
+def map_file(path):
+    with open(path, 'rb') as read_file:
+        if os.fstat(read_file.fileno()).st_size == 0:
+            return EmptyFile()
+        return mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_file_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    with open(path, 'rb') as read_file:
+        while True:
+            chunk = read_file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def load_generator(reference, args=None):
+    module_name, _, function_name = reference.partition(':')
+    if not function_name:
+        raise InValidCallAttributeError(f'{reference} is not a valid generator. Use "package.module:function".')
+    function = getattr(importlib.import_module(module_name), function_name)
+    for chunk in function(**(args or {})):
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+class MultipartStream:
+    def __init__(self, parts, base_dir=None, boundary=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self._segments = []
+        for part in parts:
+            self._add_part(part, base_dir)
+        self._segments.append((f'--{self.boundary}--\r\n'.encode('utf-8'), None))
+        self._length = sum(len(data) if data is not None else os.path.getsize(path)
+                           for data, path in self._segments)
+        self._index = 0
+        self._current = None
+
+    def _add_part(self, part, base_dir):
+        if 'name' not in part:
+            raise InValidCallAttributeError(f'{part} is not a valid multipart part. Every part needs a "name".')
+        disposition = f'form-data; name="{part["name"]}"'
+        if 'file' in part:
+            path = resolve_path(part['file'], base_dir)
+            filename = part.get('filename', os.path.basename(path))
+            content_type = part.get('contentType') or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            head = (f'--{self.boundary}\r\nContent-Disposition: {disposition}; filename="{filename}"\r\n'
+                    f'Content-Type: {content_type}\r\n\r\n')
+            self._segments.append((head.encode('utf-8'), None))
+            self._segments.append((None, path))
+        else:
+            value = part.get('value', '')
+            value = value if isinstance(value, bytes) else str(value).encode('utf-8')
+            head = f'--{self.boundary}\r\nContent-Disposition: {disposition}\r\n\r\n'
+            self._segments.append((head.encode('utf-8') + value, None))
+        self._segments.append((b'\r\n', None))
+
+    def __len__(self):
+        return self._length
+
+    def _open(self, index):
+        data, path = self._segments[index]
+        return io.BytesIO(data) if data is not None else open(path, 'rb')
+
+    def read(self, size=-1):
+        chunks = []
+        remaining = size if size is not None and size >= 0 else None
+        while self._index < len(self._segments) and (remaining is None or remaining > 0):
+            if self._current is None:
+                self._current = self._open(self._index)
+            chunk = self._current.read(-1 if remaining is None else remaining)
+            if chunk:
+                chunks.append(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+                continue
+            self._current.close()
+            self._current = None
+            self._index += 1
+        return b''.join(chunks)
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise io.UnsupportedOperation('A multipart stream can only be rewound to the start.')
+        self.close()
+        self._index = 0
+        return 0
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+class BodySource:
+    __slots__ = ('data', 'content_type')
+
+    def __init__(self, data, content_type=None):
+        self.data = data
+        self.content_type = content_type
+
+    @property
+    def rewindable(self):
+        return hasattr(self.data, 'seek') or isinstance(self.data, bytes)
+
+    def rewind(self):
+        if hasattr(self.data, 'seek'):
+            self.data.seek(0)
+
+    def close(self):
+        if hasattr(self.data, 'close'):
+            self.data.close()
+
+
+def open_body_source(settings, base_dir=None):
+    if not isinstance(settings, dict) or not any(key in settings for key in BODY_SOURCE_TYPES):
+        raise InValidCallAttributeError(f'{settings} is not a valid bodySource. Use one of {BODY_SOURCE_TYPES}.')
+    content_type = settings.get('contentType')
+    if 'file' in settings:
+        path = resolve_path(settings['file'], base_dir)
+        content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if settings.get('chunked'):
+            return BodySource(iter_file_chunks(path, settings.get('chunkSize', DEFAULT_CHUNK_SIZE)), content_type)
+        return BodySource(map_file(path), content_type)
+    if 'bytes' in settings:
+        value = settings['bytes']
+        data = base64.b64decode(value) if settings.get('encoding') == 'base64' else value.encode('utf-8')
+        return BodySource(data, content_type or 'application/octet-stream')
+    if 'generator' in settings:
+        return BodySource(load_generator(settings['generator'], settings.get('args')),
+                          content_type or 'application/octet-stream')
+    stream = MultipartStream(settings['multipart'], base_dir)
+    return BodySource(stream, stream.content_type)
+
+
+class DownloadedBody:
+    __slots__ = ('path', 'size', 'sha256', 'headers', 'status_code', 'temporary')
+
+    def __init__(self, path, size, sha256, headers, status_code, temporary=False):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.headers = headers
+        self.status_code = status_code
+        self.temporary = temporary
+
+    def to_dict(self):
+        return {'__path': self.path, '__size': self.size, '__sha256': self.sha256, '__headers': self.headers,
+                '__status': self.status_code}
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def download_to_file(response, path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    temporary = path is None
+    if temporary:
+        handle, path = tempfile.mkstemp(prefix='dolpa-download-')
+        write_file = os.fdopen(handle, 'wb')
+    else:
+        write_file = open(path, 'wb')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with write_file:
+            for chunk in response.iter_content(chunk_size):
+                if chunk:
+                    write_file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+    except BaseException:
+        if temporary:
+            remove_file(path)
+        raise
+    return DownloadedBody(path, size, digest.hexdigest(), CaseInsensitiveDict(response.headers or {}),
+                          response.status_code, temporary)
@@ -0,0 +1,271 @@
+import io
+import os
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .dolpa_session import build_adapter, get_session_settings
+from .exceptions import CassetteMissError, InvalidCassetteError
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+CASSETTE_MODES = ('record', 'replay')
+MISS_POLICIES = ('strict', 'passthrough')
+MATCH_RULES = ('method', 'url', 'host', 'path', 'query', 'body')
+DEFAULT_MATCH_ON = ('method', 'url', 'body')
+
+DATA_MAGIC = b'DOLPACAS'
+INDEX_MAGIC = b'DOLPAIDX'
+INDEX_HEADER = struct.Struct('>8sQQ')
+INDEX_SLOT = struct.Struct('>16sQ')
+RECORD_HEADER = struct.Struct('>IQ')
+STREAMED_BODY = '<stream>'
+
+
+def _canonical_body(body):
+    if body is None:
+        return ''
+    if not isinstance(body, (bytes, str)):
+        return STREAMED_BODY
+    text = body.decode('utf-8', 'replace') if isinstance(body, bytes) else body
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        return hashlib.sha256(body if isinstance(body, bytes) else body.encode('utf-8')).hexdigest()
+
+
+class MatchRules:
+    __slots__ = ('match_on', 'ignore_query', 'match_headers')
+
+    def __init__(self, match_on=DEFAULT_MATCH_ON, ignore_query=(), match_headers=()):
+        invalid = set(match_on) - set(MATCH_RULES)
+        if invalid:
+            raise ValueError(f'{sorted(invalid)} - match rules are not supported. Use any of {MATCH_RULES}.')
+        self.match_on = tuple(match_on)
+        self.ignore_query = frozenset(ignore_query)
+        self.match_headers = tuple(name.lower() for name in match_headers)
+
+    def _normalize_url(self, url):
+        parts = urlsplit(url)
+        query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if name not in self.ignore_query)
+        return parts._replace(query=urlencode(query), fragment='')
+
+    def key(self, request):
+        parts = self._normalize_url(request.url)
+        fields = []
+        for rule in self.match_on:
+            if rule == 'method':
+                fields.append(request.method.upper())
+            elif rule == 'url':
+                fields.append(urlunsplit(parts))
+            elif rule == 'host':
+                fields.append(parts.netloc)
+            elif rule == 'path':
+                fields.append(parts.path)
+            elif rule == 'query':
+                fields.append(parts.query)
+            else:
+                fields.append(_canonical_body(request.body))
+        headers = request.headers or {}
+        fields.extend(headers.get(name, '') for name in self.match_headers)
+        return json.dumps(fields)
+
+
+def digest_key(key, occurrence):
+    return hashlib.blake2b(f'{key}\n{occurrence}'.encode('utf-8'), digest_size=16).digest()
+
+
+def write_index(path, entries):
+    capacity = 8
+    while capacity < len(entries) * 2:
+        capacity *= 2
+    mask = capacity - 1
+    slots = bytearray(INDEX_SLOT.size * capacity)
+    occupied = bytearray(capacity)
+    for digest, offset in entries.items():
+        slot = int.from_bytes(digest[:8], 'big') & mask
+        while occupied[slot]:
+            slot = (slot + 1) & mask
+        occupied[slot] = 1
+        INDEX_SLOT.pack_into(slots, slot * INDEX_SLOT.size, digest, offset + 1)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as write_file:
+        write_file.write(INDEX_HEADER.pack(INDEX_MAGIC, capacity, len(entries)))
+        write_file.write(slots)
+    os.replace(temp_path, path)
+
+
+class CassetteIndex:
+    def __init__(self, path):
+        with open(path, 'rb') as read_file:
+            self._map = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.capacity, self.count = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC or self.capacity & (self.capacity - 1):
+            self._map.close()
+            raise InvalidCassetteError(f'{path} is not a cassette index.')
+        self._mask = self.capacity - 1
+
+    def get(self, digest):
+        slot = int.from_bytes(digest[:8], 'big') & self._mask
+        while True:
+            stored, offset = INDEX_SLOT.unpack_from(self._map, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if offset == 0:
+                return None
+            if stored == digest:
+                return offset - 1
+            slot = (slot + 1) & self._mask
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+
+
+class Cassette(BaseAdapter):
+    def __init__(self, path, mode='replay', match_on=DEFAULT_MATCH_ON, ignore_query=(), match_headers=(),
+                 on_miss='strict', repeat_last=False, adapter=None):
+        super().__init__()
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f'{mode} - cassette mode is not supported. Use one of {CASSETTE_MODES}.')
+        if on_miss not in MISS_POLICIES:
+            raise ValueError(f'{on_miss} - miss policy is not supported. Use one of {MISS_POLICIES}.')
+        self.path = path
+        self.index_path = path + '.idx'
+        self.mode = mode
+        self.rules = MatchRules(match_on, ignore_query, match_headers)
+        self.on_miss = on_miss
+        self.repeat_last = repeat_last
+        self._adapter = adapter
+        self._lock = threading.Lock()
+        self._occurrences = {}
+        self._last_offsets = {}
+        self._entries = {}
+        self._data = None
+        self._index = None
+        self._writer = None
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            self._adapter = build_adapter(get_session_settings(None))
+        return self._adapter
+
+    def _open_for_replay(self):
+        with open(self.path, 'rb') as read_file:
+            data = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(DATA_MAGIC)] != DATA_MAGIC:
+            data.close()
+            raise InvalidCassetteError(f'{self.path} is not a cassette.')
+        if not os.path.exists(self.index_path):
+            data.close()
+            raise InvalidCassetteError(f'{self.path} has no index at {self.index_path}. The recording was not '
+                                       f'saved, record it again.')
+        self._index = CassetteIndex(self.index_path)
+        self._data = data
+        LOGGER.info('Replaying %d recorded responses from %s', len(self._index), self.path)
+
+    def _next_occurrence(self, key):
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        return occurrence
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = self.rules.key(request)
+        if self.mode == 'record':
+            response = self.adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                         proxies=proxies)
+            self._record(key, request, response)
+            return response
+        with self._lock:
+            if self._data is None:
+                self._open_for_replay()
+            offset = self._index.get(digest_key(key, self._next_occurrence(key)))
+            if offset is None:
+                offset = self._last_offsets.get(key) if self.repeat_last else None
+            else:
+                self._last_offsets[key] = offset
+            record = self._read(offset) if offset is not None else None
+        if record is None:
+            if self.on_miss == 'strict':
+                raise CassetteMissError(f'No recorded response for {request.method} {request.url} in {self.path}')
+            LOGGER.warning('No recorded response for %s %s, sending it to the network', request.method, request.url)
+            return self.adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                     proxies=proxies)
+        return self._build_response(request, *record)
+
+    def _record(self, key, request, response):
+        body = response.content
+        meta = json.dumps({'status': response.status_code, 'reason': response.reason,
+                           'headers': dict(response.headers), 'url': request.url}).encode('utf-8')
+        with self._lock:
+            if self._writer is None:
+                self._writer = open(self.path, 'ab' if self._entries else 'wb')
+                if not self._entries:
+                    self._writer.write(DATA_MAGIC)
+            offset = self._writer.tell()
+            self._writer.write(RECORD_HEADER.pack(len(meta), len(body)))
+            self._writer.write(meta)
+            self._writer.write(body)
+            self._entries[digest_key(key, self._next_occurrence(key))] = offset
+
+    def _read(self, offset):
+        meta_length, body_length = RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + RECORD_HEADER.size
+        meta = json.loads(self._data[start:start + meta_length])
+        body = self._data[start + meta_length:start + meta_length + body_length]
+        return meta, body
+
+    @staticmethod
+    def _build_response(request, meta, body):
+        response = Response()
+        response.status_code = meta['status']
+        response.reason = meta['reason']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.headers.pop('Content-Encoding', None)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.encoding = None
+        return response
+
+    def save(self):
+        with self._lock:
+            if self._writer is None:
+                return
+            self._writer.close()
+            self._writer = None
+            write_index(self.index_path, self._entries)
+            LOGGER.info('Recorded %d responses into %s', len(self._entries), self.path)
+
+    def close(self):
+        self.save()
+        if self._adapter is not None:
+            self._adapter.close()
+
+    def eject(self):
+        with self._lock:
+            if self._data is not None:
+                self._index.close()
+                self._data.close()
+                self._data = self._index = None
+                self._occurrences, self._last_offsets = {}, {}
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.eject()
+
+    def __getstate__(self):
+        raise TypeError('Cassettes can not be shared with a process pool. Use the "thread" executor.')
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import argparse
+
+
+def parse_variable(pair):
+    name, separator, value = pair.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f'{pair} is not a variable. Use NAME=VALUE.')
+    return name, value
+
+
+def parse_identifier(value):
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='dolpa', description='Run dolpa API tests.')
+    parser.add_argument('--log-level', default=os.environ.get('DOLPA_LOG_LEVEL', 'WARNING'))
+    parser.add_argument('--log-format', choices=('text', 'json'), default=None)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run a test file or every test file under a folder.')
+    run.add_argument('path')
+    run.add_argument('-w', '--workers', type=int, default=1)
+    run.add_argument('--executor', choices=('thread', 'process'), default='thread')
+    run.add_argument('--index', dest='index_path', help='Keep a suite index at this path.')
+    run.add_argument('--result-cache', help='Keep per-file results at this path.')
+    run.add_argument('--rerun', choices=('all', 'changed', 'failed', 'affected'))
+    run.add_argument('--tag', dest='tags', action='append')
+    run.add_argument('--resource-prefix')
+    run.add_argument('--cassette', help='Replay responses from this cassette.')
+    run.add_argument('--record', action='store_true', help='Record responses into --cassette instead.')
+    run.add_argument('--deadline', type=float, help='Skip whatever is left after this many seconds.')
+    _add_run_options(run)
+
+    call = commands.add_parser('call', help='Run a single call of a test file.')
+    call.add_argument('path')
+    call.add_argument('identifier', type=parse_identifier)
+    call.add_argument('--assert', dest='run_with_assertions', action='store_true')
+
+    watch = commands.add_parser('watch', help='Rerun test files whenever they change.')
+    watch.add_argument('path')
+    watch.add_argument('-w', '--workers', type=int, default=1)
+    watch.add_argument('--interval', type=float, default=0.2, help='Seconds between checks for changes.')
+    _add_run_options(watch)
+    return parser
+
+
+def _add_run_options(parser):
+    parser.add_argument('--timeout', type=float, help='Default timeout of every call in seconds.')
+    parser.add_argument('--var', dest='variables', action='append', type=parse_variable, metavar='NAME=VALUE')
+
+
+def format_summary(summary, elapsed, out):
+    for result in summary.failed:
+        print(f'FAILED {result.path}: {type(result.error).__name__}: {result.error}', file=out)
+    print(f'{len(summary.passed)} passed, {len(summary.failed)} failed, {len(summary.skipped)} skipped, '
+          f'{len(summary.cached)} cached in {elapsed:.2f}s', file=out)
+
+
+def _run_suite(args):
+    from .dolpa import run_bulk_api_tests
+
+    options = dict(workers=args.workers, executor=args.executor, fail_fast=False, index_path=args.index_path,
+                   timeout=args.timeout, deadline=args.deadline, variables=dict(args.variables or ()),
+                   result_cache=args.result_cache, rerun=args.rerun, tags=args.tags,
+                   resource_prefix=args.resource_prefix)
+    if not args.cassette:
+        return run_bulk_api_tests(args.path, **options)
+    from .cassette import Cassette
+    with Cassette(args.cassette, mode='record' if args.record else 'replay') as cassette:
+        return run_bulk_api_tests(args.path, adapter=cassette, **options)
+
+
+def command_run(args, out):
+    if args.index_path and os.path.isfile(args.path):
+        print(f'dolpa run: --index needs a folder, {args.path} is a file.', file=out)
+        return 2
+    started = time.perf_counter()
+    summary = _run_suite(args)
+    format_summary(summary, time.perf_counter() - started, out)
+    return 0 if summary.ok else 1
+
+
+def command_call(args, out):
+    from .dolpa import get_api_test_handler
+
+    handler = get_api_test_handler(args.path)
+    try:
+        endpoint_call = handler.run(args.identifier, run_with_assertions=args.run_with_assertions)
+    except Exception as e:
+        print(f'FAILED {args.path} call {args.identifier}: {type(e).__name__}: {e}', file=out)
+        return 1
+    finally:
+        handler.close()
+    status_code = getattr(endpoint_call.response, 'status_code', None)
+    print(f'{endpoint_call.method} {endpoint_call.resource} -> {status_code}', file=out)
+    for name in endpoint_call.saves or {}:
+        print(f'  {name} = {handler.run_config.get(name)!r}', file=out)
+    return 0
+
+
+def command_watch(args, out):
+    from .watch import SuiteWatcher
+
+    watcher = SuiteWatcher(args.path, workers=args.workers, timeout=args.timeout,
+                           variables=dict(args.variables or ()), interval=args.interval)
+    print(f'Watching {args.path} for changes. Press Ctrl+C to stop.', file=out)
+
+    def on_summary(summary):
+        format_summary(summary, sum(result.duration for result in summary), out)
+        suite = watcher.suite_summary
+        print(f'suite: {len(suite.passed)} of {len(suite)} files passing', file=out)
+        out.flush()
+
+    watcher.run_forever(on_summary)
+    return 0
+
+
+COMMANDS = {'run': command_run, 'call': command_call, 'watch': command_watch}
+
+
+def main(argv=None, out=None):
+    out = out or sys.stdout
+    args = build_parser().parse_args(argv)
+    from .dolpa_logger import configure_logging
+    configure_logging(args.log_level, structured=args.log_format == 'json' if args.log_format else None)
+    return COMMANDS[args.command](args, out)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
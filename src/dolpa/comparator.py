@@ -1,48 +1,305 @@
-from .dolpa_utils import interpolate, get_dict_value_from_json_path
-from .exceptions import FailedAssertion, NotAllowedComparison
+import re
+import json
+import operator
+from functools import lru_cache
+
+from .dolpa_utils import interpolate, compile_json_path, KeySegment, IndexSegment, SliceSegment, WildcardSegment
+from .schema import compile_schema, ValidationErrors
+from .exceptions import FailedAssertion, NotAllowedComparison, InvalidSchemaError, AttributeNotFoundError
 from .dolpa_logger import get_logger
 
 LOGGER = get_logger()
 
+ALLOWED_COMPARATORS = ["==", "<=", ">=", "!=", "<", ">"]
+OPERATOR_FUNCTIONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+NUMBER_PATTERN = re.compile(r'^-?\d+(\.\d+)?([eE][+-]?\d+)?$')
+QUANTIFIER_PATTERN = re.compile(r'^(all|any|none|count)\s*\((.+)\)$')
+DEFAULT_REPORTED_FAILURES = 10
+
+
+def tokenize_assertion(assertion):
+    depth, brackets, quote, index = 0, 0, None, 0
+    while index < len(assertion):
+        char = assertion[index]
+        if quote:
+            quote = None if char == quote else quote
+        elif assertion.startswith('{{', index):
+            depth += 1
+            index += 1
+        elif assertion.startswith('}}', index) and depth:
+            depth -= 1
+            index += 1
+        elif char in '\'"' and not depth:
+            quote = char
+        elif char in '[(' and not depth:
+            brackets += 1
+        elif char in '])' and brackets and not depth:
+            brackets -= 1
+        elif not depth and not brackets:
+            for comparator in ALLOWED_COMPARATORS:
+                if assertion.startswith(comparator, index):
+                    return (assertion[:index].strip(), comparator,
+                            assertion[index + len(comparator):].strip())
+        index += 1
+    raise NotAllowedComparison(f"Found invalid comparator in {assertion}! Valid comparators are {ALLOWED_COMPARATORS}")
+
+
+class Literal:
+    __slots__ = ('raw', 'quoted', 'number', 'boolean', 'is_null')
+
+    def __init__(self, raw):
+        self.quoted = len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in '\'"'
+        self.raw = raw[1:-1] if self.quoted else raw
+        self.number = None
+        if not self.quoted and NUMBER_PATTERN.match(raw):
+            self.number = float(raw) if any(char in raw for char in '.eE') else int(raw)
+        self.boolean = {'true': True, 'false': False}.get(raw) if not self.quoted else None
+        self.is_null = not self.quoted and raw == 'null'
+
+    def typed_for(self, actual):
+        if self.quoted:
+            return self.raw
+        if isinstance(actual, bool):
+            return self.boolean if self.boolean is not None else self.raw
+        if isinstance(actual, (int, float)):
+            return self.number if self.number is not None else self.raw
+        if actual is None and self.is_null:
+            return None
+        return self.raw
+
+
+class CompiledAssertion:
+    __slots__ = ('assertion', 'path', 'json_path', 'operator', 'expected', 'compare', 'dynamic_path',
+                 'dynamic_expected')
+
+    def __init__(self, assertion):
+        left_side, comparator, right_side = tokenize_assertion(assertion)
+        if not left_side:
+            raise NotAllowedComparison(f"{assertion} has nothing to compare on the left side")
+        self.assertion = assertion
+        self.path = left_side[2:] if left_side.startswith("$.") else left_side
+        self.operator = comparator
+        self.compare = OPERATOR_FUNCTIONS[comparator]
+        self.dynamic_path = '{{' in self.path
+        self.json_path = None if self.dynamic_path else compile_json_path(self.path)
+        self.dynamic_expected = '{{' in right_side
+        self.expected = right_side if self.dynamic_expected else Literal(right_side)
+
+    def resolve(self, response, run_config):
+        json_path = compile_json_path(interpolate(self.path, run_config)) if self.dynamic_path else self.json_path
+        actual = json_path.get(response)
+        if self.dynamic_expected:
+            expected = interpolate(self.expected, run_config)
+            if isinstance(expected, str):
+                expected = Literal(expected).typed_for(actual)
+        else:
+            expected = self.expected.typed_for(actual)
+        return actual, expected
+
+    def evaluate(self, response, run_config):
+        actual, expected = self.resolve(response, run_config)
+        try:
+            return bool(self.compare(actual, expected)), actual, expected
+        except TypeError:
+            return False, actual, expected
+
+
+class QuantifierState:
+    __slots__ = ('expected', 'total', 'matched', 'failures')
+
+    def __init__(self, expected, limit):
+        self.expected = expected
+        self.total = 0
+        self.matched = 0
+        self.failures = ValidationErrors(limit)
+
+
+class QuantifierAssertion:
+    __slots__ = ('assertion', 'quantifier', 'path', 'json_path', 'operator', 'compare', 'expected',
+                 'dynamic_expected')
+
+    def __init__(self, assertion, quantifier, path, comparator, right_side):
+        self.assertion = assertion
+        self.quantifier = quantifier
+        self.path = path[2:] if path.startswith('$.') else path
+        if '{{' in self.path:
+            raise NotAllowedComparison(f'{assertion} can not use variables in the path of {quantifier}()')
+        self.json_path = compile_json_path(self.path)
+        self.operator = comparator
+        self.compare = OPERATOR_FUNCTIONS[comparator]
+        self.dynamic_expected = '{{' in right_side
+        self.expected = right_side if self.dynamic_expected else Literal(right_side)
+
+    def start(self, run_config, limit):
+        expected = self.expected
+        if self.dynamic_expected:
+            expected = interpolate(expected, run_config)
+            expected = Literal(expected) if isinstance(expected, str) else expected
+        return QuantifierState(expected, limit)
+
+    def _matches(self, value, expected):
+        try:
+            return bool(self.compare(value, expected.typed_for(value) if isinstance(expected, Literal) else expected))
+        except TypeError:
+            return False
+
+    def feed(self, state, location, value):
+        state.total += 1
+        if self.quantifier == 'count':
+            return
+        matched = self._matches(value, state.expected)
+        if matched:
+            state.matched += 1
+        if matched == (self.quantifier == 'none'):
+            state.failures.add(location, f'{value!r}')
+
+    def finish(self, state):
+        if self.quantifier == 'count':
+            if self._matches(state.total, state.expected):
+                return True, None
+            expected = state.expected.raw if isinstance(state.expected, Literal) else state.expected
+            return False, f'Found {state.total} values, expected {self.operator} {expected!r}'
+        if self.quantifier == 'any':
+            return bool(state.matched), f'None of the {state.total} values matched'
+        if self.quantifier == 'none':
+            return not state.matched, (f'{state.matched} of {state.total} values matched: '
+                                       f'{state.failures.describe()}')
+        if not state.total:
+            return False, f'No values found at $.{self.path}'
+        return state.matched == state.total, (f'{state.total - state.matched} of {state.total} values did not '
+                                              f'match: {state.failures.describe()}')
+
+
+class SchemaAssertion:
+    __slots__ = ('assertion', 'path', 'json_path', 'validator')
+
+    def __init__(self, assertion):
+        if not isinstance(assertion.get('schema'), (dict, bool)):
+            raise InvalidSchemaError(f'{assertion} is not a schema assertion. Use {{"schema": {{...}}, "path": '
+                                     f'"$.items"}}.')
+        self.assertion = json.dumps(assertion, sort_keys=True)
+        path = assertion.get('path', '$')
+        self.path = path[2:] if path.startswith('$.') else '' if path == '$' else path
+        self.json_path = compile_json_path(self.path) if self.path else None
+        self.validator = compile_schema(assertion['schema'])
+
+    def start(self, run_config, limit):
+        return QuantifierState(None, limit)
+
+    def feed(self, state, location, value):
+        state.total += 1
+        self.validator.validate(value, location, state.failures)
+
+    def finish(self, state):
+        if not state.total:
+            return False, f'No value found at $.{self.path}'
+        errors = state.failures
+        return not errors.count, f'{errors.count} schema violations: {errors.describe()}'
+
+
+class PlanNode:
+    __slots__ = ('children', 'consumers')
+
+    def __init__(self):
+        self.children = {}
+        self.consumers = []
+
+
+def _segment_key(segment):
+    if isinstance(segment, (KeySegment, IndexSegment)):
+        return type(segment).__name__, segment.key
+    if isinstance(segment, SliceSegment):
+        return 'slice', segment.slice.start, segment.slice.stop, segment.slice.step
+    if isinstance(segment, WildcardSegment):
+        return 'wildcard',
+    return 'segment', id(segment)
+
+
+class AssertionPlan:
+    def __init__(self, assertions):
+        self.assertions = assertions
+        self.root = PlanNode()
+        for name, compiled in assertions.items():
+            node = self.root
+            for segment in (compiled.json_path.segments if compiled.json_path is not None else ()):
+                key = _segment_key(segment)
+                if key not in node.children:
+                    node.children[key] = (segment, PlanNode())
+                node = node.children[key][1]
+            node.consumers.append(name)
+
+    def _walk(self, node, value, location, states):
+        for name in node.consumers:
+            self.assertions[name].feed(states[name], location, value)
+        for segment, child in node.children.values():
+            for key, item in segment.items(value):
+                self._walk(child, item, location + (key if isinstance(key, tuple) else (key,)), states)
+
+    def evaluate(self, response, run_config, limit=DEFAULT_REPORTED_FAILURES):
+        states = {name: compiled.start(run_config, limit) for name, compiled in self.assertions.items()}
+        self._walk(self.root, response, (), states)
+        return {name: compiled.finish(states[name]) for name, compiled in self.assertions.items()}
+
+
+def check_bulk_result(assertion_name, compiled, passed, detail):
+    if passed:
+        LOGGER.info("%s which asserts %s passed", assertion_name, compiled.assertion)
+    else:
+        raise FailedAssertion(f"{assertion_name} which asserts {compiled.assertion} failed. {detail}")
+
+
+def is_bulk_assertion(compiled):
+    return isinstance(compiled, (QuantifierAssertion, SchemaAssertion))
+
+
+def build_assertion_plan(compiled_assertions):
+    bulk = {name: compiled for name, compiled in compiled_assertions.items() if is_bulk_assertion(compiled)}
+    return AssertionPlan(bulk) if bulk else None
+
+
+@lru_cache(maxsize=4096)
+def _compile_string_assertion(assertion):
+    left_side, comparator, right_side = tokenize_assertion(assertion)
+    match = QUANTIFIER_PATTERN.match(left_side)
+    if match:
+        return QuantifierAssertion(assertion, match.group(1), match.group(2).strip(), comparator, right_side)
+    return CompiledAssertion(assertion)
+
+
+@lru_cache(maxsize=256)
+def _compile_schema_assertion(assertion_text):
+    return SchemaAssertion(json.loads(assertion_text))
+
+
+def compile_assertion(assertion):
+    if isinstance(assertion, dict):
+        return _compile_schema_assertion(json.dumps(assertion, sort_keys=True))
+    return _compile_string_assertion(assertion)
+
 
 class Comparator:
     def __init__(self, assertion_name, assertion, run_config, response):
         self.assertion_name = assertion_name
-        self.assertion = assertion
+        self.compiled = assertion if isinstance(assertion, CompiledAssertion) else compile_assertion(assertion)
+        self.assertion = self.compiled.assertion
         self.run_config = run_config
         self.response = response
-        self.allowed_comparators = ["==", "<=", ">=", "!=", "<", ">"]
+        self.allowed_comparators = ALLOWED_COMPARATORS
 
     def execute(self):
-        left_side, right_side = None, None
-        comparator = None
-        for operator in self.allowed_comparators:
-            if operator in self.assertion:
-                left_side, right_side = (item.strip() for item in self.assertion.split(operator))
-                comparator = operator
-                break
-        if comparator is None:
-            raise NotAllowedComparison(f"Found invalid comparator! Valid comparators are f{self.allowed_comparators}")
-        if left_side.startswith("$."):
-            left_side_interpolated = interpolate(left_side[2:], self.run_config)
-        else:
-            left_side_interpolated = left_side
-        right_side_interpolated = interpolate(right_side, self.run_config)
-        if comparator == "==":
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) == right_side_interpolated
-        elif comparator == "<=":
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) <= right_side_interpolated
-        elif comparator == ">=":
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) >= right_side_interpolated
-        elif comparator == "!=":
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) != right_side_interpolated
-        elif comparator == "<":
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) < right_side_interpolated
-        else:
-            is_pass = get_dict_value_from_json_path(self.response, left_side_interpolated) > right_side_interpolated
+        try:
+            is_pass, actual, expected = self.compiled.evaluate(self.response, self.run_config)
+        except AttributeNotFoundError as e:
+            raise FailedAssertion(f"{self.assertion_name} which asserts {self.assertion} failed. {e}")
         if is_pass:
-            LOGGER.info(f"{self.assertion_name} which asserts {self.assertion} passed")
+            LOGGER.info("%s which asserts %s passed", self.assertion_name, self.assertion)
         else:
-            raise FailedAssertion(f"{self.assertion_name} which asserts {self.assertion} failed")
-
-
+            raise FailedAssertion(f"{self.assertion_name} which asserts {self.assertion} failed. "
+                                  f"Found {actual!r}, expected {self.compiled.operator} {expected!r}")
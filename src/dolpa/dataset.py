@@ -0,0 +1,156 @@
+import os
+import csv
+import json
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import InValidCallAttributeError, DatasetRowsFailedError, DeadlineExceededError
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+DATASET_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+class DatasetSettings:
+    __slots__ = ('path', 'format', 'batch_size', 'concurrency', 'bind_as', 'limit', 'max_reported_failures',
+                 'delimiter')
+
+    def __init__(self, path, format=None, batch_size=100, concurrency=1, bind_as=None, limit=None,
+                 max_reported_failures=20, delimiter=','):
+        self.path = path
+        self.format = format or DATASET_FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.format not in DATASET_FORMATS.values():
+            raise InValidCallAttributeError(f'{path} is not a CSV or JSONL dataset. Set "format" to "csv" or "jsonl".')
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.bind_as = bind_as
+        self.limit = limit
+        self.max_reported_failures = max_reported_failures
+        self.delimiter = delimiter
+
+    @classmethod
+    def from_config(cls, settings, base_dir=None):
+        if not settings:
+            return None
+        if isinstance(settings, str):
+            settings = {'path': settings}
+        if not isinstance(settings, dict) or not settings.get('path'):
+            raise InValidCallAttributeError(f'{settings} is not a valid dataset. Use a path or {{"path": <path>}}.')
+        path = settings['path']
+        if base_dir and not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        return cls(
+            path,
+            format=settings.get('format'),
+            batch_size=settings.get('batchSize', 100),
+            concurrency=settings.get('concurrency', 1),
+            bind_as=settings.get('as'),
+            limit=settings.get('limit'),
+            max_reported_failures=settings.get('maxReportedFailures', 20),
+            delimiter=settings.get('delimiter', ','),
+        )
+
+    def bind(self, row):
+        return {self.bind_as: row} if self.bind_as else row
+
+
+def iter_csv_rows(path, delimiter=','):
+    with open(path, 'r', newline='') as read_file:
+        yield from csv.DictReader(read_file, delimiter=delimiter)
+
+
+def iter_jsonl_rows(path):
+    with open(path, 'r') as read_file:
+        for line_number, line in enumerate(read_file, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise InValidCallAttributeError(f'Line {line_number} of {path} is not a JSON object.')
+            yield row
+
+
+def iter_dataset(settings: DatasetSettings):
+    if settings.format == 'csv':
+        rows = iter_csv_rows(settings.path, settings.delimiter)
+    else:
+        rows = iter_jsonl_rows(settings.path)
+    return itertools.islice(rows, settings.limit) if settings.limit is not None else rows
+
+
+def iter_batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class RowFailure:
+    __slots__ = ('row_number', 'row', 'error')
+
+    def __init__(self, row_number, row, error):
+        self.row_number = row_number
+        self.row = row
+        self.error = error
+
+    def __repr__(self):
+        return f'RowFailure({self.row_number}, {self.row!r}, {type(self.error).__name__}: {self.error})'
+
+
+class DatasetReport:
+    def __init__(self, name, max_reported_failures=20):
+        self.name = name
+        self.max_reported_failures = max_reported_failures
+        self.rows = 0
+        self.failed = 0
+        self.failures = []
+
+    @property
+    def passed(self):
+        return self.rows - self.failed
+
+    def add(self, row_number, row, error=None):
+        self.rows += 1
+        if error is None:
+            return
+        self.failed += 1
+        LOGGER.error('%s failed for dataset row %d: %s', self.name, row_number, error)
+        if len(self.failures) < self.max_reported_failures:
+            self.failures.append(RowFailure(row_number, row, error))
+
+    def raise_for_failures(self):
+        if not self.failed:
+            return
+        shown = '; '.join(f'row {failure.row_number}: {type(failure.error).__name__}: {failure.error}'
+                          for failure in self.failures)
+        raise DatasetRowsFailedError(f'{self.name} failed for {self.failed} of {self.rows} dataset rows. {shown}',
+                                     self)
+
+
+def run_dataset(settings: DatasetSettings, name, run_row):
+    report = DatasetReport(name, settings.max_reported_failures)
+
+    def run(row_number, row):
+        try:
+            run_row(settings.bind(row))
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            return row_number, row, e
+        return row_number, row, None
+
+    rows = enumerate(iter_dataset(settings), 1)
+    if settings.concurrency and settings.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=settings.concurrency, thread_name_prefix='dolpa-dataset') as pool:
+            for batch in iter_batches(rows, settings.batch_size):
+                for outcome in pool.map(lambda item: run(*item), batch):
+                    report.add(*outcome)
+    else:
+        for batch in iter_batches(rows, settings.batch_size):
+            for row_number, row in batch:
+                report.add(*run(row_number, row))
+    LOGGER.info('%s ran %d dataset rows, %d failed', name, report.rows, report.failed)
+    return report
@@ -1,19 +1,56 @@
 import os
+import copy
 import json
+import time
+import pickle
+import datetime
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 import requests
-from requests.auth import HTTPDigestAuth
-from .dolpa_utils import interpolate, get_dict_value_from_json_path
+from .dolpa_utils import interpolate, get_dict_value_from_json_path, compile_template, compile_json_path
+from .streaming import extract_json_paths
+from .bodies import open_body_source, download_to_file, remove_file, DEFAULT_CHUNK_SIZE
+from .metrics import CallTimings
 from .dolpa_logger import get_logger
-from .comparator import Comparator
+from .dolpa_session import build_session, SessionRegistry, send_with_connection_timings
+from .comparator import (Comparator, compile_assertion, build_assertion_plan, check_bulk_result,
+                         DEFAULT_REPORTED_FAILURES)
+from .scheduler import build_call_graph, CallScheduler
+from .dolpa_results import FileResult, BulkRunSummary, CallRecord, ResultStore
+from .memo import MemoStore, memo_key, get_memo_settings
+from .dolpa_auth import get_auth_handler, SUPPORTED_AUTH_TYPES
+from .resilience import (Resilience, Deadline, RetryPolicy, HedgePolicy, CircuitBreakerRegistry, normalize_timeout,
+                         resolve_timeout, cap_timeout)
+from .suite_index import SuiteIndex
+from .cassette import Cassette
+from .dataset import DatasetSettings, run_dataset
+from .result_cache import ResultCache
+from .scope import Scope, get_environment
 from .exceptions import (InValidCallAttributeError, InValidCallAttributeModifierError,
-                         AuthTypeNotSupportedError, NoResponseDataError, FailedAssertion)
+                         AuthTypeNotSupportedError, NoResponseDataError, FailedAssertion, CallSkippedError)
 
 LOGGER = get_logger()
 
 
+class ResponseSummary:
+    __slots__ = ('status_code', 'reason', 'headers', 'url', 'elapsed', 'content')
+
+    def __init__(self, response, content=None):
+        self.status_code = response.status_code
+        self.reason = getattr(response, 'reason', None)
+        self.headers = getattr(response, 'headers', None)
+        self.url = getattr(response, 'url', None)
+        self.elapsed = getattr(response, 'elapsed', None)
+        self.content = content
+
+
 class EndpointCall:
-    allowed_keys = {'identifier', 'description', 'resource', 'method', 'body', 'headers', 'saves', 'assertions', 'auth'}
+    allowed_keys = {'identifier', 'description', 'resource', 'method', 'body', 'headers', 'saves', 'assertions', 'auth',
+                    'abortIfAssertionFails', 'responseMode', 'memoize', 'timeout', 'retries', 'hedge', 'dataset',
+                    'bodySource', 'downloadPath'}
+    allowed_response_modes = {'json', 'stream', 'download'}
     allowed_modifiers = {'replace', 'merge'}
 
     def __init__(self, call):
@@ -23,15 +60,54 @@ class EndpointCall:
         self.resource = call['resource']
         self.method = call['method']
         self.body = call.get('body')
+        self.body_source = call.get('bodySource')
+        self.download_path = call.get('downloadPath')
         self.headers = None
         self.header_strategy = None
         self.saves = call.get('saves')
         self.assertions = call.get('assertions')
         self.auth = call.get('auth')
         self.abort_if_assertion_fails = call.get('abortIfAssertionFails')
+        self.response_mode = call.get('responseMode')
+        self.memoize = call.get('memoize')
+        self.timeout = normalize_timeout(call.get('timeout'))
+        self.retry_policy = RetryPolicy.from_config(call.get('retries'))
+        self.hedge_policy = HedgePolicy.from_config(call.get('hedge'))
+        self.dataset = call.get('dataset')
+        self.resource_template = compile_template(self.resource)
+        self.body_template = compile_template(self.body)
+        self.body_source_template = compile_template(self.body_source)
+        self.auth_template = compile_template(self.auth)
+        self.compiled_assertions = {name: compile_assertion(assertion)
+                                    for name, assertion in (self.assertions or {}).items()}
+        self.assertion_plan = build_assertion_plan(self.compiled_assertions)
+        self.required_paths = self._get_required_paths()
         self._response = None
+        self.response_json = None
+        self.assertion_results = {}
+        self.timings = None
+        self.memo_entry = None
+        self.temporary_path = None
         self._populate_headers_and_headers_strategy(call)
 
+    def new_execution(self):
+        execution = copy.copy(self)
+        execution._response = None
+        execution.response_json = None
+        execution.assertion_results = {}
+        execution.timings = None
+        execution.memo_entry = None
+        execution.temporary_path = None
+        return execution
+
+    def _get_required_paths(self):
+        required_paths = [compile_json_path(path[2:]) for path in (self.saves or {}).values() if path.startswith('$.')]
+        for compiled in self.compiled_assertions.values():
+            if compiled.json_path is None:
+                return None
+            required_paths.append(compiled.json_path)
+        return required_paths
+
     def _validate(self, call):
         keys_set = {key if ':' not in key else key.split(':')[0] for key in call.keys()}
         modifier_set = {key.split(':')[1] for key in call.keys() if ':' in key}
@@ -41,6 +117,14 @@ class EndpointCall:
         if not set(keys_set).issubset(self.allowed_keys):
             invalid_attrs = set(keys_set) - (set(keys_set).intersection(self.allowed_keys))
             raise InValidCallAttributeError(f'{invalid_attrs} not allowed. Fix your JSON file.')
+        if call.get('responseMode', 'json') not in self.allowed_response_modes:
+            raise InValidCallAttributeError(f'{call["responseMode"]} is not a valid responseMode. '
+                                            f'Use one of {sorted(self.allowed_response_modes)}.')
+        if call.get('body') is not None and call.get('bodySource') is not None:
+            raise InValidCallAttributeError('A call can not have both body and bodySource. Fix your JSON file.')
+        if not isinstance(call.get('memoize', False), (bool, dict)):
+            raise InValidCallAttributeError(f'{call["memoize"]} is not a valid memoize value. Use true or {{"ttl": '
+                                            f'<seconds>}}.')
 
     def _populate_headers_and_headers_strategy(self, call):
         possible_headers_key = ['headers'] + ['headers' + ':' + mod for mod in self.allowed_modifiers]
@@ -61,133 +145,564 @@ class EndpointCall:
 
 class APITests:
     call_method_to_req_method_mapping = {
-        'GET': requests.get,
-        'POST': requests.post,
-        'PUT': requests.put,
-        'DELETE': requests.delete,
-        'HEAD': requests.head,
-        'OPTIONS': requests.options,
-        'PATCH': requests.patch,
+        'GET': requests.Session.get,
+        'POST': requests.Session.post,
+        'PUT': requests.Session.put,
+        'DELETE': requests.Session.delete,
+        'HEAD': requests.Session.head,
+        'OPTIONS': requests.Session.options,
+        'PATCH': requests.Session.patch,
     }
 
-    def __init__(self, runner_dict):
-        self.response_store = []
-        self.run_config = runner_dict['config']
+    def __init__(self, runner_dict, session=None, adapter=None, endpoint_calls=None, response_store=None,
+                 metrics=None, source_path=None, memo_store=None, resilience=None, variables=None,
+                 circuit_breakers=None):
+        self.config = runner_dict['config']
+        suite_scope = variables if variables is None or isinstance(variables, Scope) else Scope(variables)
+        self._environment = Scope(get_environment(), Scope(self.config, suite_scope))
+        self.run_config = self._environment.child()
+        self._owns_resilience = resilience is None
+        self.resilience = resilience if resilience is not None else Resilience()
+        self.timeout = resolve_timeout(normalize_timeout(self.run_config.get('timeout')), self.resilience.timeout)
+        self.retry_policy = RetryPolicy.from_config(self.run_config.get('retries'))
+        self.hedge_policy = HedgePolicy.from_config(self.run_config.get('hedge'))
+        self.circuit_breakers = (circuit_breakers or self.resilience.circuit_breakers or
+                                 CircuitBreakerRegistry.from_config(self.run_config.get('circuitBreaker')))
+        self.metrics = metrics
+        self.source_path = source_path
+        self.memo_store = memo_store if memo_store is not None else MemoStore()
+        self._memo_entries = {}
+        self.dataset_reports = {}
+        self.response_store = (response_store if response_store is not None
+                               else ResultStore.from_config(self.config, source_path))
         self.calls = runner_dict['calls']
-        self._app_env_indicator = 'dolpa_'
+        self.endpoint_calls = endpoint_calls if endpoint_calls is not None else compile_calls(runner_dict)
+        if self.config.get('dataset') and any(call.dataset for call in self.endpoint_calls):
+            raise InValidCallAttributeError('A call can not have a dataset when its file already has one. '
+                                            'Fix your JSON file.')
+        self._owns_session = session is None
+        self.session = session or build_session(self.config, adapter)
+
+    def close(self):
+        self.response_store.close()
+        if self._owns_resilience:
+            self.resilience.latency_tracker.close()
+        if self._owns_session:
+            self.session.close()
 
     def _load_into_config_from_env(self):
-        env_variables = os.environ
-        for var_name, var_value in env_variables.items():
-            if var_name.startswith(self._app_env_indicator):
-                self.run_config[var_name] = var_value
+        self._environment.local = get_environment()
 
-    def _combine_global_with_local(self, key, local_map, strategy=None):
+    def _combine_global_with_local(self, key, local_map, strategy=None, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
         strategy = strategy or 'merge'
-        if self.run_config.get(key):
+        if run_config.get(key):
             if local_map and isinstance(local_map, dict):
                 if strategy == 'merge':
-                    return {**self.run_config[key], **local_map}
+                    return {**run_config[key], **local_map}
                 if strategy == 'replace':
                     return local_map
             else:
-                return {**self.run_config[key]}
+                return {**run_config[key]}
         return local_map
 
-    def _get_auth(self, call_auth_settings_dict=None):
+    def _get_auth(self, call_auth_settings_dict=None, run_config=None, interpolated=False):
+        run_config = self.run_config if run_config is None else run_config
         if call_auth_settings_dict:
-            local_auth = interpolate(call_auth_settings_dict, self.run_config)
-            auth_type = local_auth['auth']
+            local_auth = call_auth_settings_dict if interpolated else interpolate(call_auth_settings_dict, run_config)
         else:
-            local_auth = {}
-            auth_type = self.run_config.get('auth')
+            global_auth = run_config.get('auth')
+            local_auth = interpolate(global_auth, run_config) if isinstance(global_auth, dict) else {'auth': global_auth}
+        auth_type = local_auth.get('auth')
         if not auth_type:
             return None
-        if auth_type.lower() not in ['basic', 'digest']:
-            AuthTypeNotSupportedError(f'{auth_type} - auth mechanism is not supported.')
-        username = local_auth.get('username') or self.run_config['dolpa_username']
-        password = local_auth.get('password') or self.run_config['dolpa_password']
-        if auth_type.lower() == 'basic':
-            return username, password
-        if self.run_config['auth'].lower() == 'digest':
-            return HTTPDigestAuth(username, password)
-        return None
-
-    def _call_execute(self, call: EndpointCall):
-        endpoint = self.run_config['base_url'] + call.resource if call.resource.startswith('/') else call.resource
-        endpoint = interpolate(endpoint, self.run_config)
-        headers = self._combine_global_with_local('headers', call.headers, call.header_strategy)
-        requests_func = self.call_method_to_req_method_mapping[call.method.upper()]
-        LOGGER.info(f'Making {call.method.upper()} request to the endpoint: {endpoint}')
-        response = requests_func(
-            endpoint,
-            json=interpolate(call.body, self.run_config),
-            headers=headers,
-            auth=self._get_auth(call.auth),
-        )
-        LOGGER.info(f'{endpoint} responded with status code: {response.status_code}')
-        json_res = response.json()
+        if auth_type.lower() not in SUPPORTED_AUTH_TYPES:
+            raise AuthTypeNotSupportedError(f'{auth_type} - auth mechanism is not supported.')
+        if auth_type.lower() in ('basic', 'digest'):
+            username = local_auth.get('username') or run_config['dolpa_username']
+            password = local_auth.get('password') or run_config['dolpa_password']
+        else:
+            username = local_auth.get('username') or run_config.get('dolpa_username')
+            password = local_auth.get('password') or run_config.get('dolpa_password')
+        return get_auth_handler(self.session, auth_type, username, password, local_auth)
+
+    def _build_request(self, call: EndpointCall, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
+        endpoint = call.resource_template.render(run_config)
+        if call.resource.startswith('/'):
+            endpoint = interpolate(run_config['base_url'], run_config) + endpoint
+        headers = self._combine_global_with_local('headers', call.headers, call.header_strategy, run_config)
+        body = call.body_template.render(run_config)
+        auth = self._get_auth(call.auth_template.render(run_config), run_config, interpolated=True)
+        return call.method.upper(), endpoint, body, headers, auth
+
+    def _apply_saves(self, call: EndpointCall, json_res, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
         for key, val in call.saves.items():
-            self.run_config[key] = get_dict_value_from_json_path(json_res, val[2:]) if val.startswith("$.") else val
-        call.response = response
+            run_config[key] = get_dict_value_from_json_path(json_res, val[2:]) if val.startswith("$.") else val
+
+    def _call_execute(self, call: EndpointCall, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
+        timings = call.timings
+        if timings is not None:
+            started = time.perf_counter()
+        method, endpoint, body, headers, auth = self._build_request(call, run_config)
+        requests_func = self.call_method_to_req_method_mapping[method]
+        response_mode = self._response_mode(call, run_config)
+        body_source = None
+        if call.body_source:
+            body_source = open_body_source(call.body_source_template.render(run_config), self._base_dir())
+            kwargs = dict(data=body_source.data, headers={'Content-Type': body_source.content_type, **(headers or {})},
+                          auth=auth)
+        else:
+            kwargs = dict(json=body, headers=headers, auth=auth)
+        if response_mode != 'json':
+            kwargs['stream'] = True
+        LOGGER.info('Making %s request to the endpoint: %s', method, endpoint)
+        if timings is not None:
+            sent = time.perf_counter()
+            timings.interpolation = sent - started
+        try:
+            response = self._send(call, method, requests_func, endpoint, kwargs, body_source)
+        finally:
+            if body_source is not None:
+                body_source.close()
+        LOGGER.info('%s responded with status code: %s', endpoint, response.status_code)
+        if timings is not None:
+            received = time.perf_counter()
+            self._split_request_timings(timings, response, received - sent)
+        chunk_size = run_config.get('streamChunkSize') or DEFAULT_CHUNK_SIZE
+        if response_mode == 'stream':
+            try:
+                response_json = extract_json_paths(response.iter_content(chunk_size), call.required_paths)
+            finally:
+                response.close()
+        elif response_mode == 'download':
+            download_path = call.download_path or run_config.get('downloadPath')
+            try:
+                downloaded = download_to_file(response, interpolate(download_path, run_config), chunk_size)
+            finally:
+                response.close()
+            if downloaded.temporary:
+                call.temporary_path = downloaded.path
+            response_json = downloaded.to_dict()
+        else:
+            response_json = response.json()
+        self._apply_saves(call, response_json, run_config)
+        if timings is not None:
+            timings.parse = time.perf_counter() - received
+        keep_body = response_mode == 'json' and self.response_store.keep_bodies != 'none'
+        call.response = ResponseSummary(response, getattr(response, 'content', None) if keep_body else None)
+        call.response_json = response_json
         return call
 
-    def do_call_assertions(self, call: EndpointCall):
+    @staticmethod
+    def _response_mode(call: EndpointCall, run_config):
+        return call.response_mode or run_config.get('responseMode') or 'json'
+
+    def _send(self, call: EndpointCall, method, requests_func, endpoint, kwargs, body_source=None):
+        deadline = self.resilience.deadline
+        breaker = self.circuit_breakers.get(urlsplit(endpoint).netloc) if self.circuit_breakers else None
+        if breaker is not None and not breaker.allow():
+            raise CallSkippedError(f'Circuit for {urlsplit(endpoint).netloc} is open, skipped {method} {endpoint}')
+        retry_policy = call.retry_policy or self.retry_policy
+        hedge_policy = call.hedge_policy or self.hedge_policy
+        attempts = retry_policy.attempts_for(method) if retry_policy else 1
+        if body_source is not None and not body_source.rewindable:
+            attempts = 1
+        timeout = resolve_timeout(call.timeout, self.timeout)
+        hedged = hedge_policy is not None and method == 'GET' and 'stream' not in kwargs and body_source is None
+        for attempt in range(attempts):
+            deadline.check(f'{method} {endpoint}')
+            if attempt and body_source is not None:
+                body_source.rewind()
+            kwargs['timeout'] = cap_timeout(timeout, deadline.remaining())
+            send = lambda: send_with_connection_timings(lambda: requests_func(self.session, endpoint, **kwargs))
+            try:
+                if hedged:
+                    response = self.resilience.latency_tracker.send((method, endpoint), hedge_policy, send)
+                else:
+                    response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                delay = retry_policy.delay(attempt)
+                LOGGER.warning('%s %s failed with %s, retrying in %.2fs', method, endpoint, type(e).__name__, delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                if attempt + 1 >= attempts or not retry_policy.should_retry(response):
+                    return response
+                delay = retry_policy.delay(attempt, response)
+                LOGGER.warning('%s %s responded with %s, retrying in %.2fs', method, endpoint, response.status_code,
+                               delay)
+                response.close()
+            remaining = deadline.remaining()
+            time.sleep(delay if remaining is None else min(delay, remaining))
+
+    @staticmethod
+    def _split_request_timings(timings, response, request_time):
+        timings.connect, timings.tls = getattr(response, 'connection_timings', (0.0, 0.0))
+        elapsed = getattr(response, 'elapsed', None)
+        headers_time = elapsed.total_seconds() if isinstance(elapsed, datetime.timedelta) else request_time
+        timings.server = max(headers_time - timings.connect - timings.tls, 0.0)
+        timings.download = max(request_time - headers_time, 0.0)
+
+    def do_call_assertions(self, call: EndpointCall, run_config=None):
         if not call.response:
             raise NoResponseDataError(f'The call do not have response set. Probably it\'s not yet called.')
-        response_json = call.response.json()
+        self._assert_response(call, call.response_json, run_config)
+
+    def _assert_response(self, call: EndpointCall, response_json, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
         should_fail_if_assertion_fails = True
         if call.abort_if_assertion_fails is None:
-            global_abort_state = self.run_config.get('abortIfAssertionFails')
+            global_abort_state = run_config.get('abortIfAssertionFails')
             if global_abort_state is not None:
                 should_fail_if_assertion_fails = global_abort_state
+        bulk_results = {}
+        if call.assertion_plan is not None:
+            bulk_results = call.assertion_plan.evaluate(response_json, run_config,
+                                                        run_config.get('maxReportedIndices') or DEFAULT_REPORTED_FAILURES)
         for assertion_name, assertion in call.assertions.items():
             try:
-                Comparator(assertion_name, assertion, self.run_config, response_json).execute()
+                compiled = call.compiled_assertions[assertion_name]
+                if assertion_name in bulk_results:
+                    check_bulk_result(assertion_name, compiled, *bulk_results[assertion_name])
+                else:
+                    Comparator(assertion_name, compiled, run_config, response_json).execute()
+                call.assertion_results[assertion_name] = True
             except FailedAssertion as e:
+                call.assertion_results[assertion_name] = False
                 if should_fail_if_assertion_fails:
                     raise e
                 else:
-                    LOGGER.warning(f"{assertion_name} which asserts {assertion} failed. Continuing...")
+                    LOGGER.warning("%s which asserts %s failed. Continuing...", assertion_name, assertion)
 
-    def run_all(self, run_with_assertions=True):
-        self._load_into_config_from_env()
-        for call_dict in self.calls:
-            endpoint_call = EndpointCall(call_dict)
-            self._call_execute(endpoint_call)
+    def _record_call(self, call: EndpointCall, elapsed, error=None, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
+        response = call.response
+        body = getattr(response, 'content', None)
+        record = CallRecord(
+            call.identifier,
+            status_code=getattr(response if response is not None else call.memo_entry, 'status_code', None),
+            elapsed=elapsed,
+            saved={key: run_config.get(key) for key in (call.saves or {})},
+            assertions=dict(call.assertion_results),
+            error=None if error is None else f'{type(error).__name__}: {error}',
+            skipped=isinstance(error, CallSkippedError),
+        )
+        return self.response_store.add(record, body if isinstance(body, bytes) else None)
+
+    def _finish_call(self, call: EndpointCall, elapsed, error=None, run_config=None):
+        record = self._record_call(call, elapsed, error, run_config)
+        if self._memo_entries and call.response is not None:
+            self._invalidate_memos(record.status_code)
+        if call.timings is not None:
+            call.timings.total = elapsed
+            self.metrics.on_call(self.source_path, call.identifier, call.timings, record.status_code, record.passed)
+
+    def _invalidate_memos(self, status_code):
+        for key, entry in list(self._memo_entries.items()):
+            if status_code in entry.invalidate_on:
+                LOGGER.warning('Received %s, invalidating memoized call results', status_code)
+                self.memo_store.invalidate(key)
+                self._memo_entries.pop(key, None)
+
+    def _call_and_assert(self, endpoint_call: EndpointCall, run_with_assertions, run_config=None):
+        try:
+            self._call_execute(endpoint_call, run_config)
             if run_with_assertions:
-                self.do_call_assertions(endpoint_call)
+                assertions_started = time.perf_counter()
+                self.do_call_assertions(endpoint_call, run_config)
+                if endpoint_call.timings is not None:
+                    endpoint_call.timings.assertions = time.perf_counter() - assertions_started
+        finally:
+            if endpoint_call.temporary_path is not None:
+                remove_file(endpoint_call.temporary_path)
+
+    def _execute_memoized(self, endpoint_call: EndpointCall, run_with_assertions, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
+        key = memo_key(*self._build_request(endpoint_call, run_config))
+        ttl, invalidate_on = get_memo_settings(endpoint_call.memoize)
+
+        def compute():
+            self._call_and_assert(endpoint_call, run_with_assertions, run_config)
+            saved = {name: run_config.get(name) for name in (endpoint_call.saves or {})}
+            return saved, endpoint_call.response.status_code
+
+        entry, hit = self.memo_store.get_or_compute(key, compute, ttl, invalidate_on)
+        self._memo_entries[key] = entry
+        if hit:
+            LOGGER.info('Reusing memoized result of call %s', endpoint_call.identifier)
+            run_config.update(entry.saved)
+            endpoint_call.memo_entry = entry
+
+    def _execute(self, endpoint_call: EndpointCall, run_with_assertions, run_config=None):
+        if self.metrics is not None:
+            endpoint_call.timings = CallTimings()
+        started = time.perf_counter()
+        try:
+            self.resilience.deadline.check(f'call {endpoint_call.identifier}')
+            if endpoint_call.memoize:
+                self._execute_memoized(endpoint_call, run_with_assertions, run_config)
+            else:
+                self._call_and_assert(endpoint_call, run_with_assertions, run_config)
+        except Exception as e:
+            self._finish_call(endpoint_call, time.perf_counter() - started, e, run_config)
+            raise
+        self._finish_call(endpoint_call, time.perf_counter() - started, run_config=run_config)
+        return endpoint_call
+
+    def _run_dataset(self, settings, name, run_row):
+        report = run_dataset(DatasetSettings.from_config(settings, self._base_dir()), name,
+                             lambda row: run_row(self.run_config.child(row)))
+        self.dataset_reports[name] = report
+        report.raise_for_failures()
+        return report
+
+    def _base_dir(self):
+        return os.path.dirname(os.path.abspath(self.source_path)) if self.source_path else None
+
+    def _execute_call_at(self, index, run_with_assertions, run_config=None):
+        endpoint_call = self.endpoint_calls[index]
+        if endpoint_call.dataset:
+            return self._run_dataset(
+                endpoint_call.dataset, f'call {endpoint_call.identifier}',
+                lambda row_config: self._execute(endpoint_call.new_execution(), run_with_assertions, row_config)
+            )
+        return self._execute(endpoint_call.new_execution(), run_with_assertions, run_config)
+
+    def _run_calls(self, run_with_assertions, max_concurrency, run_config=None):
+        run_config = self.run_config if run_config is None else run_config
+        graph = build_call_graph(self.calls, set(run_config.keys()))
+        if max_concurrency > 1 and len(self.calls) > 1:
+            CallScheduler(graph, max_concurrency).run(
+                lambda index: self._execute_call_at(index, run_with_assertions, run_config)
+            )
+            return
+        for index in range(len(self.endpoint_calls)):
+            self._execute_call_at(index, run_with_assertions, run_config)
+
+    def run_all(self, run_with_assertions=True, max_concurrency=None):
+        self._load_into_config_from_env()
+        max_concurrency = max_concurrency or self.run_config.get('maxConcurrentCalls') or 1
+        if self.config.get('dataset'):
+            self._run_dataset(self.config['dataset'], self.source_path or 'file',
+                              lambda row_config: self._run_calls(run_with_assertions, max_concurrency, row_config))
+            return
+        self._run_calls(run_with_assertions, max_concurrency)
 
     def run(self, call_identifier: int, run_with_assertions=False):
         self._load_into_config_from_env()
-        call = [item for item in self.calls if item["identifier"] == call_identifier][0]
-        endpoint_call = EndpointCall(call)
-        self._call_execute(endpoint_call)
-        if run_with_assertions:
-            self.do_call_assertions(endpoint_call)
-        return endpoint_call
+        endpoint_call = [item for item in self.endpoint_calls if item.identifier == call_identifier][0]
+        return self._execute(endpoint_call.new_execution(), run_with_assertions)
 
 
-def run_api_tests(folder_path):
+def run_api_tests(folder_path, session=None, adapter=None, metrics=None, memo_store=None):
     with open(folder_path, 'r') as read_file:
-        int_test = APITests(json.load(read_file))
+        int_test = APITests(json.load(read_file), session=session, adapter=adapter, metrics=metrics,
+                            source_path=folder_path, memo_store=memo_store)
+    try:
         int_test.run_all()
+    finally:
+        int_test.close()
+
 
+def compile_calls(runner_dict):
+    return [EndpointCall(call) for call in runner_dict['calls']]
 
-def run_bulk_api_tests(root_path):
+
+def discover_test_files(root_path):
+    test_files = []
     contents = sorted(os.listdir(root_path))
     for curr_path in contents:
         inner_path = (root_path + curr_path) if root_path.endswith('/') else (root_path + '/' + curr_path)
         if os.path.isdir(inner_path):
-            run_bulk_api_tests(inner_path)
+            test_files.extend(discover_test_files(inner_path))
+        elif inner_path.endswith('.json'):
+            test_files.append(inner_path)
+    return test_files
+
+
+class RunContext:
+    def __init__(self, sessions, index=None, metrics=None, memo_store=None, resilience=None, variables=None):
+        self.sessions = sessions
+        self.variables = Scope(variables) if variables else None
+        self.index = index
+        self.metrics = metrics
+        self.memo_store = memo_store if memo_store is not None else MemoStore()
+        self.resilience = resilience if resilience is not None else Resilience()
+        self._circuit_breakers = {}
+        self._lock = threading.Lock()
+
+    def circuit_breakers_for(self, config):
+        settings = config.get('circuitBreaker')
+        if self.resilience.circuit_breakers is not None or not settings:
+            return self.resilience.circuit_breakers
+        key = json.dumps(settings, sort_keys=True)
+        with self._lock:
+            if key not in self._circuit_breakers:
+                self._circuit_breakers[key] = CircuitBreakerRegistry.from_config(settings)
+            return self._circuit_breakers[key]
+
+    def indexed_file(self, file_path):
+        return self.index.get(file_path) if self.index is not None else None
+
+    def load(self, file_path, indexed_file=None):
+        if indexed_file is None:
+            with open(file_path, 'r') as read_file:
+                runner_dict = json.load(read_file)
+            endpoint_calls = None
+        elif indexed_file.error is not None:
+            raise indexed_file.error
+        else:
+            runner_dict = indexed_file.runner_dict
+            endpoint_calls = indexed_file.endpoint_calls
+        return APITests(runner_dict, session=self.sessions.get(runner_dict['config']), endpoint_calls=endpoint_calls,
+                        metrics=self.metrics, source_path=file_path, memo_store=self.memo_store,
+                        resilience=self.resilience, variables=self.variables,
+                        circuit_breakers=self.circuit_breakers_for(runner_dict['config']))
+
+
+def _run_test_file(file_path, context, indexed_file=None):
+    started = time.perf_counter()
+    try:
+        context.resilience.deadline.check(file_path)
+        int_test = context.load(file_path, indexed_file)
+        try:
+            int_test.run_all()
+        finally:
+            int_test.close()
+    except Exception as e:
+        return FileResult(file_path, error=e, duration=time.perf_counter() - started)
+    return FileResult(file_path, duration=time.perf_counter() - started)
+
+
+_PROCESS_CONTEXT = None
+
+
+def _run_test_file_in_process(file_path, indexed_file=None, timeout=None, deadline=None, circuit_breaker=None,
+                              variables=None):
+    global _PROCESS_CONTEXT
+    if _PROCESS_CONTEXT is None:
+        _PROCESS_CONTEXT = RunContext(SessionRegistry(), resilience=Resilience(
+            timeout, deadline, CircuitBreakerRegistry.from_config(circuit_breaker)), variables=variables)
+    result = _run_test_file(file_path, _PROCESS_CONTEXT, indexed_file)
+    if result.error is not None:
+        try:
+            pickle.dumps(result.error)
+        except Exception:
+            result.error = RuntimeError(f'{type(result.error).__name__}: {result.error}')
+    return result
+
+
+def _run_serial(test_files, context, fail_fast):
+    results = []
+    for file_path in test_files:
+        result = _run_test_file(file_path, context, context.indexed_file(file_path))
+        results.append(result)
+        if result.failed and fail_fast:
+            break
+    return results
+
+
+def _run_parallel(test_files, context, fail_fast, workers, executor, circuit_breaker=None):
+    if executor == 'process':
+        if context.metrics is not None:
+            raise ValueError('Metrics hooks can not be shared with a process pool. Use the "thread" executor.')
+        pool = ProcessPoolExecutor(max_workers=workers)
+        resilience = context.resilience
+        variables = context.variables.local if context.variables is not None else None
+        submit = lambda path: pool.submit(_run_test_file_in_process, path, context.indexed_file(path),
+                                          resilience.timeout, resilience.deadline, circuit_breaker, variables)
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda path: pool.submit(_run_test_file, path, context, context.indexed_file(path))
+    else:
+        raise ValueError(f'{executor} - executor is not supported. Use "thread" or "process".')
+    results = {}
+    first_failed_position = None
+    with pool:
+        pending = {submit(file_path): position for position, file_path in enumerate(test_files)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = pending.pop(future)
+                result = future.result()
+                results[position] = result
+                if result.failed and fail_fast and (first_failed_position is None or
+                                                        position < first_failed_position):
+                    first_failed_position = position
+            if first_failed_position is not None:
+                for future, position in list(pending.items()):
+                    if position > first_failed_position and future.cancel():
+                        pending.pop(future)
+    return [results[position] for position in sorted(results)
+            if first_failed_position is None or position <= first_failed_position]
+
+
+def run_test_files(test_files, context, workers=1, executor='thread', fail_fast=False, circuit_breaker=None):
+    if workers and workers > 1 and len(test_files) > 1:
+        return _run_parallel(test_files, context, fail_fast, workers, executor, circuit_breaker)
+    return _run_serial(test_files, context, fail_fast)
+
+
+def run_bulk_api_tests(root_path, sessions=None, adapter=None, workers=1, executor='thread', fail_fast=True,
+                       index_path=None, metrics=None, memo_store=None, timeout=None, deadline=None,
+                       circuit_breaker=None, variables=None, result_cache=None, rerun=None, tags=None,
+                       resource_prefix=None):
+    owns_sessions = sessions is None
+    if isinstance(adapter, Cassette) and executor == 'process' and workers and workers > 1:
+        raise ValueError('Cassettes can not be shared with a process pool. Use the "thread" executor.')
+    if rerun and rerun != 'all' and result_cache is None:
+        raise ValueError(f'{rerun} - rerun mode needs a result cache.')
+    if index_path and os.path.isfile(root_path):
+        raise ValueError(f'{root_path} is a file. A suite index needs a folder.')
+    if isinstance(result_cache, str):
+        result_cache = ResultCache(result_cache)
+    resilience = Resilience(timeout, Deadline(deadline), CircuitBreakerRegistry.from_config(circuit_breaker))
+    context = RunContext(sessions or SessionRegistry(adapter), metrics=metrics, memo_store=memo_store,
+                         resilience=resilience, variables=variables)
+    try:
+        if index_path:
+            context.index = SuiteIndex(root_path, index_path, compile_calls)
+            test_files = context.index.refresh()
+            context.index.save()
+        elif os.path.isfile(root_path):
+            test_files = [root_path]
         else:
-            if inner_path.endswith('.json'):
-                with open(inner_path, 'r') as read_file:
-                    int_test = APITests(json.load(read_file))
-                    int_test.run_all()
+            test_files = discover_test_files(root_path)
+        selected_files = test_files
+        if result_cache is not None:
+            keys, selected = result_cache.select(test_files, rerun or 'all', context.indexed_file,
+                                                 variables, tags, resource_prefix)
+            selected_files = [file_path for file_path in test_files if file_path in selected]
+        results = run_test_files(selected_files, context, workers, executor, fail_fast, circuit_breaker)
+        if result_cache is not None:
+            for result in results:
+                result_cache.record(result, keys[result.path])
+            result_cache.save()
+            ran = {result.path: result for result in results}
+            results = [ran[file_path] if file_path in ran else result_cache.cached_result(file_path)
+                       for file_path in test_files if file_path in ran or file_path not in selected]
+    finally:
+        resilience.latency_tracker.close()
+        if owns_sessions:
+            context.sessions.close()
+    summary = BulkRunSummary(results)
+    LOGGER.info('%d of %d test files passed, %d skipped, %d from the result cache', len(summary.passed),
+                len(summary), len(summary.skipped), len(summary.cached))
+    first_failure = summary.first_failure()
+    if fail_fast and first_failure is not None:
+        raise first_failure.error
+    return summary
 
 
-def get_api_test_handler(file_path):
+def get_api_test_handler(file_path, session=None, adapter=None, metrics=None, memo_store=None):
     with open(file_path, 'r') as read_file:
-        int_test = APITests(json.load(read_file))
+        int_test = APITests(json.load(read_file), session=session, adapter=adapter, metrics=metrics,
+                            source_path=file_path, memo_store=memo_store)
         return int_test
@@ -0,0 +1,116 @@
+import time
+import weakref
+import threading
+
+import requests
+from requests.auth import AuthBase, HTTPDigestAuth
+
+from .exceptions import AuthTypeNotSupportedError
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+SUPPORTED_AUTH_TYPES = ('basic', 'digest', 'bearer', 'oauth2')
+DEFAULT_REFRESH_MARGIN = 30
+
+
+class TokenAuth(AuthBase):
+    def __init__(self, token=None, token_url=None, client_id=None, client_secret=None, scope=None,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, session=None):
+        if not token and not token_url:
+            raise AuthTypeNotSupportedError('Token auth needs either a token or a tokenUrl.')
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.credentials = (token, token_url, client_id, client_secret, scope)
+        self._token = token
+        self._expires_at = None
+        self._session = weakref.ref(session) if session is not None else None
+        self._lock = threading.Lock()
+
+    def needs_refresh(self):
+        if self.token_url is None:
+            return False
+        return self._token is None or (self._expires_at is not None and
+                                       time.monotonic() >= self._expires_at - self.refresh_margin)
+
+    def _fetch_token(self):
+        session = self._session() if self._session is not None else None
+        data = {'grant_type': 'client_credentials'}
+        if self.scope:
+            data['scope'] = self.scope
+        LOGGER.info('Requesting a new access token from %s', self.token_url)
+        post = session.post if session is not None else requests.post
+        response = post(self.token_url, data=data, auth=(self.client_id, self.client_secret))
+        response.raise_for_status()
+        payload = response.json()
+        self._token = payload['access_token']
+        expires_in = payload.get('expires_in')
+        self._expires_at = time.monotonic() + float(expires_in) if expires_in else None
+
+    def get_token(self, force_refresh=False):
+        with self._lock:
+            if force_refresh or self.needs_refresh():
+                self._fetch_token()
+            return self._token
+
+    def authorization(self):
+        return f'Bearer {self.get_token()}'
+
+    def handle_401(self, response, **kwargs):
+        if response.status_code != 401 or self.token_url is None or getattr(response.request, '_dolpa_retried', False):
+            return response
+        response.content
+        response.close()
+        request = response.request.copy()
+        request._dolpa_retried = True
+        request.headers['Authorization'] = f'Bearer {self.get_token(force_refresh=True)}'
+        retried = response.connection.send(request, **kwargs)
+        retried.history.append(response)
+        retried.request = request
+        return retried
+
+    def __call__(self, request):
+        request.headers['Authorization'] = self.authorization()
+        request.register_hook('response', self.handle_401)
+        return request
+
+
+_AUTH_HANDLERS = weakref.WeakKeyDictionary()
+_AUTH_HANDLERS_LOCK = threading.Lock()
+
+
+def _build_handler(auth_type, username, password, settings, session):
+    if auth_type == 'digest':
+        return HTTPDigestAuth(username, password)
+    if auth_type == 'bearer':
+        return TokenAuth(token=settings.get('token') or password)
+    return TokenAuth(
+        token_url=settings.get('tokenUrl'),
+        client_id=settings.get('clientId') or username,
+        client_secret=settings.get('clientSecret') or password,
+        scope=settings.get('scope'),
+        refresh_margin=settings.get('refreshMargin', DEFAULT_REFRESH_MARGIN),
+        session=session,
+    )
+
+
+def get_auth_handler(session, auth_type, username=None, password=None, settings=None):
+    auth_type = auth_type.lower()
+    if auth_type not in SUPPORTED_AUTH_TYPES:
+        raise AuthTypeNotSupportedError(f'{auth_type} - auth mechanism is not supported.')
+    if auth_type == 'basic':
+        return username, password
+    settings = settings or {}
+    key = (auth_type, username, password, settings.get('token'), settings.get('tokenUrl'), settings.get('clientId'),
+           settings.get('clientSecret'), settings.get('scope'))
+    with _AUTH_HANDLERS_LOCK:
+        handlers = _AUTH_HANDLERS.get(session)
+        if handlers is None:
+            handlers = _AUTH_HANDLERS[session] = {}
+        handler = handlers.get(key)
+        if handler is None:
+            handler = handlers[key] = _build_handler(auth_type, username, password, settings, session)
+        return handler
@@ -1,5 +1,15 @@
-import logging
+import os
 import sys
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = __name__
+LEVEL_ENV_VARIABLE = 'DOLPA_LOG_LEVEL'
+FORMAT_ENV_VARIABLE = 'DOLPA_LOG_FORMAT'
+QUEUE_ENV_VARIABLE = 'DOLPA_LOG_QUEUE'
 
 
 class CustomFormatter(logging.Formatter):
@@ -19,19 +29,96 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset
     }
 
+    def __init__(self):
+        super().__init__()
+        self.formatters = {level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()}
+        self.default_formatter = logging.Formatter(self.FORMATS[logging.INFO])
+
+    def format(self, record):
+        return self.formatters.get(record.levelno, self.default_formatter).format(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    reserved = frozenset(vars(logging.makeLogRecord({})).keys()) | {'message', 'asctime'}
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in self.reserved})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        return record
+
+
+_LISTENER = None
+
+
+def _parse_level(level):
+    if level is None:
+        level = os.environ.get(LEVEL_ENV_VARIABLE, 'DEBUG')
+    if isinstance(level, str):
+        parsed = logging.getLevelName(level.upper())
+        if not isinstance(parsed, int):
+            raise ValueError(f'{level} is not a valid log level')
+        return parsed
+    return level
+
+
+def _stop_listener():
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+
+
+def configure_logging(level=None, structured=None, queued=None, stream=None):
+    global _LISTENER
+    if structured is None:
+        structured = os.environ.get(FORMAT_ENV_VARIABLE, '').lower() in ('json', 'jsonl')
+    if queued is None:
+        queued = os.environ.get(QUEUE_ENV_VARIABLE, '').lower() in ('1', 'true', 'yes')
+    root_logger = logging.getLogger(LOGGER_NAME)
+    root_logger.setLevel(_parse_level(level))
+    _stop_listener()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonLinesFormatter() if structured else CustomFormatter())
+    if queued:
+        records = queue.SimpleQueue()
+        _LISTENER = QueueListener(records, handler)
+        _LISTENER.start()
+        handler = DeferredQueueHandler(records)
+    root_logger.addHandler(handler)
+    root_logger.propagate = False
+    return root_logger
+
+
+def flush_logging():
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER.start()
+
+
+atexit.register(_stop_listener)
 
 
-def get_logger():
-    root_logger = logging.getLogger(__name__)
-    root_logger.setLevel(logging.DEBUG)
+def get_logger(level=None):
+    root_logger = logging.getLogger(LOGGER_NAME)
+    if level is not None or not root_logger.level:
+        root_logger.setLevel(_parse_level(level))
 
     if not root_logger.hasHandlers():
         handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.DEBUG)
         handler.setFormatter(CustomFormatter())
         root_logger.addHandler(handler)
         return root_logger
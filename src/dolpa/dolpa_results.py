@@ -0,0 +1,257 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import deque
+
+from .exceptions import CallSkippedError
+
+
+class FileResult:
+    __slots__ = ('path', 'error', 'duration', 'cached')
+
+    def __init__(self, path, error=None, duration=0.0, cached=False):
+        self.path = path
+        self.error = error
+        self.duration = duration
+        self.cached = cached
+
+    @property
+    def passed(self):
+        return self.error is None
+
+    @property
+    def skipped(self):
+        return isinstance(self.error, CallSkippedError)
+
+    @property
+    def failed(self):
+        return self.error is not None and not self.skipped
+
+    def __repr__(self):
+        status = 'passed' if self.passed else f'skipped: {self.error}' if self.skipped else f'failed: {self.error!r}'
+        return f'FileResult({self.path}, {status}{", cached" if self.cached else ""})'
+
+
+class BulkRunSummary:
+    def __init__(self, results=None):
+        self.results = list(results or [])
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def passed(self):
+        return [result for result in self.results if result.passed]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.failed]
+
+    @property
+    def skipped(self):
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    @property
+    def cached(self):
+        return [result for result in self.results if result.cached]
+
+    def first_failure(self):
+        return next((result for result in self.results if result.failed and not result.cached), None)
+
+
+class CallRecord:
+    __slots__ = ('identifier', 'status_code', 'elapsed', 'saved', 'assertions', 'error', 'body', 'skipped')
+
+    def __init__(self, identifier, status_code=None, elapsed=0.0, saved=None, assertions=None, error=None, body=None,
+                 skipped=False):
+        self.identifier = identifier
+        self.status_code = status_code
+        self.elapsed = elapsed
+        self.saved = saved
+        self.assertions = assertions
+        self.error = error
+        self.body = body
+        self.skipped = skipped
+
+    @property
+    def passed(self):
+        return not self.skipped and self.error is None and all((self.assertions or {}).values())
+
+    def to_dict(self):
+        return {
+            'identifier': self.identifier,
+            'statusCode': self.status_code,
+            'elapsed': self.elapsed,
+            'saved': self.saved,
+            'assertions': self.assertions,
+            'error': self.error,
+            'skipped': self.skipped,
+        }
+
+
+class JsonLinesSpill:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w')
+
+    def write(self, record):
+        self._file.write(json.dumps(record.to_dict(), default=str) + '\n')
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def read(self):
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, 'r') as read_file:
+            for line in read_file:
+                yield CallRecord(**{RECORD_FIELDS[key]: value for key, value in json.loads(line).items()})
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteSpill:
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('DROP TABLE IF EXISTS call_records')
+        self._connection.execute('CREATE TABLE call_records '
+                                 '(identifier TEXT, status_code INTEGER, elapsed REAL, saved TEXT, '
+                                 'assertions TEXT, error TEXT, skipped INTEGER)')
+
+    def write(self, record):
+        self._connection.execute('INSERT INTO call_records VALUES (?, ?, ?, ?, ?, ?, ?)', (
+            json.dumps(record.identifier), record.status_code, record.elapsed,
+            json.dumps(record.saved, default=str), json.dumps(record.assertions), record.error, int(record.skipped),
+        ))
+
+    @property
+    def closed(self):
+        return self._connection is None
+
+    def read(self):
+        if self._connection is not None:
+            self._connection.commit()
+            rows = self._connection.execute('SELECT * FROM call_records ORDER BY rowid').fetchall()
+        else:
+            connection = sqlite3.connect(self.path)
+            try:
+                rows = connection.execute('SELECT * FROM call_records ORDER BY rowid').fetchall()
+            finally:
+                connection.close()
+        for identifier, status_code, elapsed, saved, assertions, error, skipped in rows:
+            yield CallRecord(json.loads(identifier), status_code, elapsed, json.loads(saved), json.loads(assertions),
+                             error, skipped=bool(skipped))
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+
+RECORD_FIELDS = {'identifier': 'identifier', 'statusCode': 'status_code', 'elapsed': 'elapsed', 'saved': 'saved',
+                 'assertions': 'assertions', 'error': 'error', 'skipped': 'skipped'}
+BODY_POLICIES = {'none', 'failures', 'last', 'all'}
+
+
+def spill_path_for(spill_path, source_path=None):
+    if not spill_path or not source_path:
+        return spill_path
+    root, extension = os.path.splitext(spill_path)
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    digest = hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:8]
+    return f'{root}.{name}-{digest}{extension}'
+
+
+class ResultStore:
+    def __init__(self, keep_bodies='none', last_n=10, max_body_bytes=None, max_records=10000, spill_path=None):
+        if keep_bodies not in BODY_POLICIES:
+            raise ValueError(f'{keep_bodies} is not a valid body policy. Use one of {sorted(BODY_POLICIES)}.')
+        self.keep_bodies = keep_bodies
+        self.last_n = last_n
+        self.max_body_bytes = max_body_bytes
+        self.max_records = max_records
+        self.records = deque()
+        self.dropped = 0
+        self.spilled = 0
+        self._bodies = deque()
+        self._body_bytes = 0
+        self._lock = threading.Lock()
+        self._spill = None
+        if spill_path and spill_path.endswith(('.db', '.sqlite')):
+            self._spill = SqliteSpill(spill_path)
+        elif spill_path:
+            self._spill = JsonLinesSpill(spill_path)
+
+    @classmethod
+    def from_config(cls, config, source_path=None):
+        settings = (config or {}).get('resultStore') or {}
+        return cls(
+            keep_bodies=settings.get('keepBodies', 'none'),
+            last_n=settings.get('lastN', 10),
+            max_body_bytes=settings.get('maxBodyBytes'),
+            max_records=settings.get('maxRecords', 10000),
+            spill_path=spill_path_for(settings.get('spillPath'), source_path),
+        )
+
+    def _should_keep_body(self, record, body):
+        if body is None or self.keep_bodies == 'none':
+            return False
+        if self.keep_bodies == 'failures' and record.passed:
+            return False
+        return self.max_body_bytes is None or len(body) <= self.max_body_bytes
+
+    def _release_bodies(self):
+        while self._bodies and ((self.keep_bodies == 'last' and len(self._bodies) > self.last_n) or
+                                (self.max_body_bytes is not None and self._body_bytes > self.max_body_bytes)):
+            released = self._bodies.popleft()
+            if released.body is not None:
+                self._body_bytes -= len(released.body)
+                released.body = None
+
+    def add(self, record, body=None):
+        with self._lock:
+            if self._should_keep_body(record, body):
+                record.body = body
+                self._bodies.append(record)
+                self._body_bytes += len(body)
+                self._release_bodies()
+            self.records.append(record)
+            while self.max_records is not None and len(self.records) > self.max_records:
+                oldest = self.records.popleft()
+                if oldest.body is not None:
+                    self._body_bytes -= len(oldest.body)
+                    oldest.body = None
+                if self._spill is not None and not self._spill.closed:
+                    self._spill.write(oldest)
+                    self.spilled += 1
+                else:
+                    self.dropped += 1
+        return record
+
+    def __iter__(self):
+        if self._spill is not None:
+            yield from self._spill.read()
+        yield from list(self.records)
+
+    def __len__(self):
+        return len(self.records) + self.spilled
+
+    @property
+    def failures(self):
+        return [record for record in self if not record.passed and not record.skipped]
+
+    def close(self):
+        if self._spill is not None and not self._spill.closed:
+            self._spill.close()
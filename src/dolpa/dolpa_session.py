@@ -0,0 +1,141 @@
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.ssl_ import create_urllib3_context
+
+
+DEFAULT_SESSION_SETTINGS = {
+    'poolConnections': 10,
+    'poolMaxsize': 10,
+    'poolBlock': False,
+    'keepAlive': True,
+    'reuseTlsContext': True,
+}
+
+
+_CONNECTION_TIMINGS = threading.local()
+
+
+def reset_connection_timings():
+    _CONNECTION_TIMINGS.connect = 0.0
+    _CONNECTION_TIMINGS.tls = 0.0
+
+
+def get_connection_timings():
+    return getattr(_CONNECTION_TIMINGS, 'connect', 0.0), getattr(_CONNECTION_TIMINGS, 'tls', 0.0)
+
+
+def send_with_connection_timings(send):
+    reset_connection_timings()
+    response = send()
+    response.connection_timings = get_connection_timings()
+    return response
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _CONNECTION_TIMINGS.connect = getattr(_CONNECTION_TIMINGS, 'connect', 0.0) + time.perf_counter() - started
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _CONNECTION_TIMINGS.connect = getattr(_CONNECTION_TIMINGS, 'connect', 0.0) + time.perf_counter() - started
+
+    def connect(self):
+        connect_before = getattr(_CONNECTION_TIMINGS, 'connect', 0.0)
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            connect_time = getattr(_CONNECTION_TIMINGS, 'connect', 0.0) - connect_before
+            tls_time = time.perf_counter() - started - connect_time
+            _CONNECTION_TIMINGS.tls = getattr(_CONNECTION_TIMINGS, 'tls', 0.0) + tls_time
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, reuse_tls_context=True):
+        self._ssl_context = create_urllib3_context() if reuse_tls_context else None
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._ssl_context is not None:
+            pool_kwargs.setdefault('ssl_context', self._ssl_context)
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop('_ssl_context', None)
+        return state
+
+    def __setstate__(self, state):
+        self._ssl_context = None
+        super().__setstate__(state)
+
+
+def get_session_settings(config):
+    settings = dict(DEFAULT_SESSION_SETTINGS)
+    if config and isinstance(config.get('session'), dict):
+        settings.update(config['session'])
+    return settings
+
+
+def build_adapter(settings):
+    return PooledAdapter(
+        pool_connections=int(settings['poolConnections']),
+        pool_maxsize=int(settings['poolMaxsize']),
+        pool_block=bool(settings['poolBlock']),
+        reuse_tls_context=bool(settings['reuseTlsContext']),
+    )
+
+
+def build_session(config=None, adapter=None):
+    settings = get_session_settings(config)
+    session = requests.Session()
+    adapter = adapter or build_adapter(settings)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not settings['keepAlive']:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+class SessionRegistry:
+    def __init__(self, adapter=None):
+        self._adapter = adapter
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, config=None):
+        settings = get_session_settings(config)
+        key = tuple(sorted(settings.items()))
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = build_session(config, self._adapter)
+            return self._sessions[key]
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
@@ -1,108 +1,396 @@
 import re
+import operator
+from functools import lru_cache
 from itertools import product
+from collections.abc import Mapping
 from .dolpa_logger import get_logger
-from .exceptions import AttributeNotFoundError
+from .exceptions import AttributeNotFoundError, InvalidJsonPathError
 
 
 LOGGER = get_logger()
 
 
-def get_dict_value_from_json_path(search_dict, json_path):
+class KeySegment:
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def step(self, value):
+        if isinstance(value, Mapping) and self.key in value:
+            yield value[self.key]
+
+    def items(self, value):
+        if isinstance(value, Mapping) and self.key in value:
+            yield self.key, value[self.key]
+
+
+class IndexSegment:
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def step(self, value):
+        if isinstance(value, list) and -len(value) <= self.key < len(value):
+            yield value[self.key]
+
+    def items(self, value):
+        if isinstance(value, list) and -len(value) <= self.key < len(value):
+            yield self.key % len(value), value[self.key]
+
+
+class WildcardSegment:
+    __slots__ = ()
+
+    def step(self, value):
+        if isinstance(value, Mapping):
+            yield from value.values()
+        elif isinstance(value, list):
+            yield from value
+
+    def items(self, value):
+        if isinstance(value, Mapping):
+            yield from value.items()
+        elif isinstance(value, list):
+            yield from enumerate(value)
+
+
+class SliceSegment:
+    __slots__ = ('slice',)
+
+    def __init__(self, start, stop, step):
+        self.slice = slice(start, stop, step)
+
+    def step(self, value):
+        if isinstance(value, list):
+            for index in range(*self.slice.indices(len(value))):
+                yield value[index]
+
+    def items(self, value):
+        if isinstance(value, list):
+            for index in range(*self.slice.indices(len(value))):
+                yield index, value[index]
+
+
+class FilterSegment:
+    __slots__ = ('path', 'compare', 'expected')
+
+    def __init__(self, expression):
+        match = FILTER_PATTERN.match(expression)
+        if not match:
+            raise InvalidJsonPathError(f'{expression} is not a supported filter expression')
+        self.path = compile_json_path('$' + match.group('path'))
+        self.compare = FILTER_OPERATORS[match.group('operator')] if match.group('operator') else None
+        self.expected = _parse_filter_literal(match.group('value').strip()) if self.compare else None
+
+    def matches(self, item):
+        for found in self.path.find(item):
+            if self.compare is None:
+                return True
+            try:
+                return bool(self.compare(found, self.expected))
+            except TypeError:
+                return False
+        return False
+
+    def step(self, value):
+        items = value.values() if isinstance(value, Mapping) else value if isinstance(value, list) else ()
+        for item in items:
+            if self.matches(item):
+                yield item
+
+    def items(self, value):
+        items = value.items() if isinstance(value, Mapping) else enumerate(value) if isinstance(value, list) else ()
+        for key, item in items:
+            if self.matches(item):
+                yield key, item
+
+
+class RecursiveSegment:
+    __slots__ = ('inner',)
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def step(self, value):
+        stack = [value]
+        while stack:
+            node = stack.pop()
+            yield from self.inner.step(node)
+            if isinstance(node, Mapping):
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+
+    def items(self, value):
+        stack = [((), value)]
+        while stack:
+            location, node = stack.pop()
+            for key, item in self.inner.items(node):
+                yield location + (key,), item
+            if isinstance(node, Mapping):
+                stack.extend(reversed([(location + (key,), item) for key, item in node.items()]))
+            elif isinstance(node, list):
+                stack.extend(reversed([(location + (index,), item) for index, item in enumerate(node)]))
+
+
+FILTER_PATTERN = re.compile(r'^@(?P<path>[^\s<>=!]*)\s*(?:(?P<operator>==|!=|<=|>=|<|>)(?P<value>.+))?$')
+FILTER_OPERATORS = {'==': operator.eq, '!=': operator.ne, '<=': operator.le,
+                    '>=': operator.ge, '<': operator.lt, '>': operator.gt}
+FILTER_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def _parse_filter_literal(raw):
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in '\'"':
+        return raw[1:-1]
+    if raw in FILTER_LITERALS:
+        return FILTER_LITERALS[raw]
     try:
-        if '.' not in json_path:
-            stripped_key = json_path.strip()
-            if len(stripped_key) < len(json_path):
-                LOGGER.warning(f"Removing extra spaces when using the key {stripped_key}. Correct your Json file...")
-            return search_dict[stripped_key]
-        path_tokens = json_path.split('.')
-        current_value = search_dict
-        for token in path_tokens:
-            if '[' in token:
-                assert ']' in token
-                path_token, index = token.split('[')
-                index = index[:-1]
-                current_value = current_value[path_token][int(index)]
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def _read_name(text, index):
+    end = index
+    while end < len(text) and text[end] not in '.[':
+        end += 1
+    name = text[index:end]
+    stripped_name = name.strip()
+    if not stripped_name:
+        raise InvalidJsonPathError(f'Empty key found in the path {text}')
+    if len(stripped_name) < len(name):
+        LOGGER.warning("Removing extra spaces when using the key %s. Correct your Json file...", stripped_name)
+    return (WildcardSegment() if stripped_name == '*' else KeySegment(stripped_name)), end
+
+
+def _read_bracket(text, index):
+    depth, quote, end = 0, None, index
+    while end < len(text):
+        char = text[end]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                break
+        end += 1
+    else:
+        raise InvalidJsonPathError(f'Missing closing bracket in the path {text}')
+    content = text[index + 1:end].strip()
+    if content.startswith('?'):
+        expression = content[1:].strip()
+        if expression.startswith('(') and expression.endswith(')'):
+            expression = expression[1:-1].strip()
+        segment = FilterSegment(expression)
+    elif content == '*':
+        segment = WildcardSegment()
+    elif len(content) >= 2 and content[0] == content[-1] and content[0] in '\'"':
+        segment = KeySegment(content[1:-1])
+    elif ':' in content:
+        try:
+            bounds = [int(item) if item.strip() else None for item in content.split(':')]
+        except ValueError:
+            raise InvalidJsonPathError(f'{content} is not a valid slice in the path {text}')
+        segment = SliceSegment(*(bounds + [None] * (3 - len(bounds)))[:3])
+    else:
+        try:
+            segment = IndexSegment(int(content))
+        except ValueError:
+            segment = KeySegment(content)
+    return segment, end + 1
+
+
+def parse_json_path(json_path):
+    text = json_path.strip()
+    if text.startswith('$'):
+        text = text[1:]
+        if text.startswith('.') and not text.startswith('..'):
+            text = text[1:]
+    segments = []
+    index = 0
+    while index < len(text):
+        if text.startswith('..', index):
+            if text.startswith('[', index + 2):
+                inner, index = _read_bracket(text, index + 2)
             else:
-                current_value = current_value[token]
+                inner, index = _read_name(text, index + 2)
+            segments.append(RecursiveSegment(inner))
+        elif text[index] == '.':
+            segment, index = _read_name(text, index + 1)
+            segments.append(segment)
+        elif text[index] == '[':
+            segment, index = _read_bracket(text, index)
+            segments.append(segment)
+        else:
+            segment, index = _read_name(text, index)
+            segments.append(segment)
+    return segments
+
+
+class JsonPath:
+    __slots__ = ('path', 'segments', 'singular')
+
+    def __init__(self, json_path):
+        self.path = json_path
+        self.segments = parse_json_path(json_path)
+        self.singular = all(isinstance(segment, (KeySegment, IndexSegment)) for segment in self.segments)
+
+    def find(self, document):
+        nodes = iter((document,))
+        for segment in self.segments:
+            nodes = self._step_all(segment, nodes)
+        return nodes
+
+    @staticmethod
+    def _step_all(segment, nodes):
+        for node in nodes:
+            yield from segment.step(node)
+
+    def get(self, document):
+        if not self.singular:
+            return list(self.find(document))
+        current_value = document
+        try:
+            for segment in self.segments:
+                current_value = current_value[segment.key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise AttributeNotFoundError(f'The value {self.path} not found in {document}')
         return current_value
-    except (IndexError, ValueError):
-        raise AttributeNotFoundError(f'The value {json_path} not found in {search_dict}')
+
+
+@lru_cache(maxsize=4096)
+def compile_json_path(json_path):
+    return JsonPath(json_path)
+
+
+def get_dict_value_from_json_path(search_dict, json_path):
+    return compile_json_path(json_path).get(search_dict)
 
 
 def get_all_lookouts(json_path, lower_limit=0, upper_limit=100):
     expansion_stack = []
-    for index, char in enumerate(json_path):
-        if char == '[':
-            end_index = json_path.index(']', index)
-            current_range = json_path[index+1:end_index]
-            if ':' in current_range:
-                start, end = [int(item) for item in current_range.split(":")]
-                expansion_stack.append(list(range(start, end)))
-            else:
-                if current_range == '*':
-                    expansion_stack.append(list(range(lower_limit, upper_limit)))
-                else:
-                    expansion_stack.append([int(current_range)])
-    possible_lookouts_index_tuples = list(product(*expansion_stack))
+    for current_range in re.findall(r'\[([^\]]*)\]', json_path):
+        if ':' in current_range:
+            start, end = [int(item) for item in current_range.split(":")]
+            expansion_stack.append(range(start, end))
+        elif current_range == '*':
+            expansion_stack.append(range(lower_limit, upper_limit))
+        else:
+            expansion_stack.append([int(current_range)])
     all_possible_lookouts = []
-    for lookout in possible_lookouts_index_tuples:
-        wild_path = json_path
-        for pos in lookout:
-            wild_path = wild_path.replace(re.compile('[.*]'), '[pos]')
-        all_possible_lookouts.append(wild_path)
+    for lookout in product(*expansion_stack):
+        positions = iter(lookout)
+        all_possible_lookouts.append(re.sub(r'\[[^\]]*\]', lambda _: f'[{next(positions)}]', json_path))
     return all_possible_lookouts
 
 
-def do_dict_interpolation(call: dict, run_config):
+PLACEHOLDER_PATTERN = re.compile(r'\{\{(.*?)\}\}')
 
-    def convert_string_to_value(raw_value):
-        if not raw_value.strip().startswith("{{"):
-            return raw_value
-        variable_name = raw_value.strip()[2:-2].strip()
-        return run_config[variable_name]
 
-    if len(call) == 0:
-        return {}
+class StaticTemplate:
+    __slots__ = ('value',)
+    is_static = True
 
-    interpolated_dict = {}
-    for key, value in call.items():
-        if isinstance(value, str):
-            interpolated_dict[key] = convert_string_to_value(value)
-        elif isinstance(value, list):
-            interpolated_list = []
-            for list_item in value:
-                if isinstance(list_item, str):
-                    interpolated_list.append(convert_string_to_value(list_item))
-                elif isinstance(list_item, dict):
-                    dict_interpolated = do_dict_interpolation(list_item, run_config)
-                    interpolated_list.append(dict_interpolated)
-                elif isinstance(list_item, list):
-                    dict_interpolated = do_dict_interpolation({'placeholder': list_item}, run_config)
-                    interpolated_list.append(dict_interpolated['placeholder'])
-        elif isinstance(value, dict):
-            dict_interpolated = do_dict_interpolation(value, run_config)
-            interpolated_dict[key] = dict_interpolated
-    return interpolated_dict
+    def __init__(self, value):
+        self.value = value
 
+    def render(self, run_config):
+        return self.value
 
-def do_string_interpolation(raw_string, run_config):
+
+class StringTemplate:
+    __slots__ = ('parts', 'whole')
+    is_static = False
+
+    def __init__(self, parts, whole=None):
+        self.parts = parts
+        self.whole = whole
+
+    def render(self, run_config):
+        if self.whole is not None:
+            return self.whole.get(run_config)
+        return ''.join(part if isinstance(part, str) else str(part.get(run_config)) for part in self.parts)
+
+
+class DictTemplate:
+    __slots__ = ('items',)
+    is_static = False
+
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, run_config):
+        return {key: template.render(run_config) if template.__class__ is not StaticTemplate else template.value
+                for key, template in self.items}
+
+
+class ListTemplate:
+    __slots__ = ('items',)
+    is_static = False
+
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, run_config):
+        return [template.render(run_config) if template.__class__ is not StaticTemplate else template.value
+                for template in self.items]
+
+
+@lru_cache(maxsize=4096)
+def compile_string_template(raw_string):
+    stripped_key = raw_string.strip()
+    if len(stripped_key) < len(raw_string):
+        LOGGER.warning("Removing extra spaces when using the key %s. Correct your Json file...", stripped_key)
     if '{{' not in raw_string:
-        return raw_string
-    interpolated_string = raw_string
-    pattern = r'\{\{.*?\}\}'
-    matches = re.finditer(pattern, raw_string)
-    for match in matches:
-        matched_text = match.group()
-        actual_value = get_dict_value_from_json_path(run_config, match.group().strip()[2:-2].strip())
-        interpolated_string = interpolated_string.replace(matched_text, actual_value, 1)
-    return interpolated_string
+        return StaticTemplate(raw_string)
+    whole_match = PLACEHOLDER_PATTERN.match(stripped_key)
+    if whole_match and whole_match.end() == len(stripped_key):
+        return StringTemplate(None, compile_json_path(whole_match.group(1).strip()))
+    parts = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(raw_string):
+        if match.start() > position:
+            parts.append(raw_string[position:match.start()])
+        parts.append(compile_json_path(match.group(1).strip()))
+        position = match.end()
+    if position < len(raw_string):
+        parts.append(raw_string[position:])
+    return StringTemplate(parts)
 
 
-def interpolate(target, run_config):
+def compile_template(target):
     if isinstance(target, str):
-        stripped_key = target.strip()
-        if len(stripped_key) < len(target):
-            LOGGER.warning(f"Removing extra spaces when using the key {stripped_key}. Correct your Json file...")
-        return do_string_interpolation(target, run_config)
+        return compile_string_template(target)
     if isinstance(target, dict):
-        return do_dict_interpolation(target, run_config)
+        items = [(key, compile_template(value)) for key, value in target.items()]
+        if all(template.is_static for _, template in items):
+            return StaticTemplate(target)
+        return DictTemplate(items)
+    if isinstance(target, list):
+        items = [compile_template(value) for value in target]
+        if all(template.is_static for template in items):
+            return StaticTemplate(target)
+        return ListTemplate(items)
+    return StaticTemplate(target)
+
+
+def do_dict_interpolation(call: dict, run_config):
+    return compile_template(call).render(run_config)
+
+
+def do_string_interpolation(raw_string, run_config):
+    return compile_string_template(raw_string).render(run_config)
+
+
+def interpolate(target, run_config):
+    return compile_template(target).render(run_config)
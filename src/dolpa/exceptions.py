@@ -24,3 +24,45 @@ class NoResponseDataError(Exception):
 
 class AttributeNotFoundError(Exception):
     pass
+
+
+class UnresolvedVariableError(Exception):
+    pass
+
+
+class CallCycleError(Exception):
+    pass
+
+
+class InvalidJsonPathError(Exception):
+    pass
+
+
+class CallSkippedError(Exception):
+    pass
+
+
+class DeadlineExceededError(CallSkippedError):
+    pass
+
+
+class CachedFailureError(Exception):
+    pass
+
+
+class DatasetRowsFailedError(Exception):
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+
+class CassetteMissError(Exception):
+    pass
+
+
+class InvalidCassetteError(Exception):
+    pass
+
+
+class InvalidSchemaError(Exception):
+    pass
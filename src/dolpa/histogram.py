@@ -0,0 +1,69 @@
+class LatencyHistogram:
+    sub_bucket_bits = 6
+    sub_bucket_count = 1 << sub_bucket_bits
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket_index(self, micros):
+        if micros < 2 * self.sub_bucket_count:
+            return micros
+        shift = micros.bit_length() - self.sub_bucket_bits - 1
+        return shift * self.sub_bucket_count + (micros >> shift)
+
+    def _bucket_value(self, index):
+        if index < 2 * self.sub_bucket_count:
+            return index
+        shift = index // self.sub_bucket_count - 1
+        mantissa = index - shift * self.sub_bucket_count
+        return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) // 2
+
+    def record(self, seconds):
+        micros = max(int(seconds * 1_000_000), 0)
+        index = self._bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = max(int(round(percent / 100.0 * self.count)), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value = self._bucket_value(index) / 1_000_000
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'min': self.min,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
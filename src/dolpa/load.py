@@ -0,0 +1,222 @@
+import json
+import time
+import asyncio
+
+from requests.auth import HTTPDigestAuth
+
+from .dolpa import get_api_test_handler
+from .dolpa_auth import TokenAuth
+from .histogram import LatencyHistogram
+from .dolpa_logger import get_logger
+from .exceptions import FailedAssertion, AuthTypeNotSupportedError
+
+LOGGER = get_logger()
+
+
+class LoadResponse:
+    __slots__ = ('status_code', 'content')
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content) if self.content else {}
+
+
+async def resolve_token_auth(headers, auth):
+    if not isinstance(auth, TokenAuth):
+        return headers, auth
+    if auth.needs_refresh():
+        authorization = await asyncio.get_running_loop().run_in_executor(None, auth.authorization)
+    else:
+        authorization = auth.authorization()
+    return {**(headers or {}), 'Authorization': authorization}, None
+
+
+class AiohttpTransport:
+    def __init__(self, limit=100, limit_per_host=0, timeout=None):
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError('Load mode needs aiohttp. Install it with `pip install dolpa[load]`.')
+        self._aiohttp = aiohttp
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = timeout
+        self._session = None
+
+    async def open(self):
+        aiohttp = self._aiohttp
+        connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self._timeout))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _convert_auth(self, auth):
+        if auth is None:
+            return None
+        if isinstance(auth, HTTPDigestAuth):
+            raise AuthTypeNotSupportedError('digest - auth mechanism is not supported in load mode.')
+        return self._aiohttp.BasicAuth(*auth)
+
+    async def request(self, method, url, json=None, headers=None, auth=None):
+        headers, auth = await resolve_token_auth(headers, auth)
+        async with self._session.request(method, url, json=json, headers=headers,
+                                         auth=self._convert_auth(auth)) as response:
+            return LoadResponse(response.status, await response.read())
+
+
+class CallLoadStats:
+    __slots__ = ('requests', 'errors', 'failed_assertions', 'histogram')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.failed_assertions = 0
+        self.histogram = LatencyHistogram()
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.failed_assertions += other.failed_assertions
+        self.histogram.merge(other.histogram)
+        return self
+
+
+class LoadReport:
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.stats = {}
+
+    def stats_for(self, identifier):
+        if identifier not in self.stats:
+            self.stats[identifier] = CallLoadStats()
+        return self.stats[identifier]
+
+    def merge(self, other):
+        for identifier, stats in other.stats.items():
+            self.stats_for(identifier).merge(stats)
+        self.duration = max(self.duration, other.duration)
+        return self
+
+    def to_dict(self):
+        report = {}
+        for identifier, stats in self.stats.items():
+            report[identifier] = {
+                'requests': stats.requests,
+                'errors': stats.errors,
+                'failedAssertions': stats.failed_assertions,
+                'errorRate': stats.errors / stats.requests if stats.requests else 0.0,
+                'throughput': stats.requests / self.duration if self.duration else 0.0,
+                'latency': stats.histogram.to_dict(),
+            }
+        return report
+
+
+class LoadRunner:
+    def __init__(self, api_tests, call_identifier=None, virtual_users=10, rate=None, duration=None,
+                 iterations=None, transport=None, run_assertions=False):
+        if duration is None and iterations is None:
+            raise ValueError('Load mode needs a duration or an iteration count.')
+        self.api_tests = api_tests
+        self.virtual_users = virtual_users
+        self.rate = rate
+        self.duration = duration
+        self.iterations = iterations
+        self.run_assertions = run_assertions
+        self.transport = transport or AiohttpTransport(limit=virtual_users)
+        calls = api_tests.endpoint_calls
+        if call_identifier is not None:
+            calls = [item for item in calls if item.identifier == call_identifier]
+        self.calls = calls
+        self._started_iterations = 0
+        self._next_slot = None
+        self._deadline = None
+
+    def _claim_iteration(self, loop):
+        if self._deadline is not None and loop.time() >= self._deadline:
+            return False
+        if self.iterations is not None:
+            if self._started_iterations >= self.iterations:
+                return False
+            self._started_iterations += 1
+        return True
+
+    async def _pace(self, loop):
+        if not self.rate:
+            return
+        now = loop.time()
+        self._next_slot = max(self._next_slot or now, now)
+        slot, self._next_slot = self._next_slot, self._next_slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _send(self, call, run_config, report):
+        stats = report.stats_for(call.identifier if call.identifier is not None else call.resource)
+        method, endpoint, body, headers, auth = self.api_tests._build_request(call, run_config)
+        headers, auth = await resolve_token_auth(headers, auth)
+        started = time.perf_counter()
+        try:
+            response = await self.transport.request(method, endpoint, json=body, headers=headers, auth=auth)
+        except (AuthTypeNotSupportedError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            stats.requests += 1
+            stats.errors += 1
+            LOGGER.debug('%s %s failed during load run: %s', method, endpoint, e)
+            return False
+        stats.histogram.record(time.perf_counter() - started)
+        stats.requests += 1
+        if response.status_code >= 400:
+            stats.errors += 1
+            return False
+        if call.saves or (self.run_assertions and call.assertions):
+            response_json = response.json()
+            self.api_tests._apply_saves(call, response_json, run_config)
+            if self.run_assertions:
+                try:
+                    self.api_tests._assert_response(call, response_json, run_config)
+                except FailedAssertion:
+                    stats.failed_assertions += 1
+                    return False
+        return True
+
+    async def _virtual_user(self, loop, report):
+        while self._claim_iteration(loop):
+            run_config = self.api_tests.run_config.child()
+            for call in self.calls:
+                await self._pace(loop)
+                if not await self._send(call, run_config, report):
+                    break
+
+    async def run_async(self):
+        self.api_tests._load_into_config_from_env()
+        loop = asyncio.get_running_loop()
+        self._started_iterations = 0
+        self._next_slot = None
+        self._deadline = loop.time() + self.duration if self.duration is not None else None
+        report = LoadReport()
+        started = time.perf_counter()
+        await self.transport.open()
+        try:
+            await asyncio.gather(*(self._virtual_user(loop, report) for _ in range(self.virtual_users)))
+        finally:
+            await self.transport.close()
+        report.duration = time.perf_counter() - started
+        LOGGER.info('Load run finished after %.2fs', report.duration)
+        return report
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+
+def run_load_test(file_path, call_identifier=None, **kwargs):
+    api_tests = get_api_test_handler(file_path)
+    try:
+        return LoadRunner(api_tests, call_identifier=call_identifier, **kwargs).run()
+    finally:
+        api_tests.close()
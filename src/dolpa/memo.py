@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+DEFAULT_INVALIDATE_ON = (401,)
+
+
+class MemoEntry:
+    __slots__ = ('saved', 'status_code', 'expires_at', 'invalidate_on')
+
+    def __init__(self, saved, status_code=None, expires_at=None, invalidate_on=DEFAULT_INVALIDATE_ON):
+        self.saved = saved
+        self.status_code = status_code
+        self.expires_at = expires_at
+        self.invalidate_on = tuple(invalidate_on)
+
+    def expired(self, now=None):
+        return self.expires_at is not None and (now or time.time()) >= self.expires_at
+
+    def to_dict(self):
+        return {'saved': self.saved, 'statusCode': self.status_code, 'expiresAt': self.expires_at,
+                'invalidateOn': list(self.invalidate_on)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['saved'], data.get('statusCode'), data.get('expiresAt'),
+                   data.get('invalidateOn', DEFAULT_INVALIDATE_ON))
+
+
+def get_memo_settings(memoize):
+    if memoize is True:
+        return None, DEFAULT_INVALIDATE_ON
+    if isinstance(memoize, dict):
+        return memoize.get('ttl'), tuple(memoize.get('invalidateOn', DEFAULT_INVALIDATE_ON))
+    return None, DEFAULT_INVALIDATE_ON
+
+
+def _auth_key(auth):
+    if auth is None or isinstance(auth, (tuple, list)):
+        return auth
+    credentials = getattr(auth, 'credentials', None)
+    if credentials is not None:
+        return [type(auth).__name__, *credentials]
+    return [type(auth).__name__, getattr(auth, 'username', None), getattr(auth, 'password', None)]
+
+
+def memo_key(method, endpoint, body, headers, auth=None):
+    payload = json.dumps([method, endpoint, body, headers, _auth_key(auth)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoStore:
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as read_file:
+                entries = {key: MemoEntry.from_dict(data) for key, data in json.load(read_file).items()}
+        except Exception as e:
+            LOGGER.warning('Ignoring unreadable memo store %s: %s', self.path, e)
+            return
+        now = time.time()
+        self._entries = {key: entry for key, entry in entries.items() if not entry.expired(now)}
+
+    def _save(self):
+        if not self.path:
+            return
+        persisted = {key: entry.to_dict() for key, entry in self._entries.items() if entry.expires_at is not None}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as write_file:
+            json.dump(persisted, write_file, default=str)
+        os.replace(temp_path, self.path)
+
+    def get_or_compute(self, key, compute, ttl=None, invalidate_on=DEFAULT_INVALIDATE_ON):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not entry.expired():
+                    self.hits += 1
+                    return entry, True
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    in_flight = self._in_flight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            in_flight.wait()
+        try:
+            saved, status_code = compute()
+            entry = MemoEntry(saved, status_code, time.time() + ttl if ttl else None, invalidate_on)
+            with self._lock:
+                if status_code is None or status_code < 400:
+                    self._entries[key] = entry
+                    self._save()
+            return entry, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save()
+
+    def __len__(self):
+        return len(self._entries)
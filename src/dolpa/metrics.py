@@ -0,0 +1,117 @@
+import json
+import threading
+
+from .histogram import LatencyHistogram
+
+PHASES = ('interpolation', 'connect', 'tls', 'server', 'download', 'parse', 'assertions', 'total')
+
+
+class CallTimings:
+    __slots__ = PHASES
+
+    def __init__(self):
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+
+    def to_dict(self):
+        return {phase: getattr(self, phase) for phase in PHASES}
+
+
+class MetricsHook:
+    def on_call(self, file_path, identifier, timings, status_code=None, passed=True):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class MetricsAggregator(MetricsHook):
+    def __init__(self):
+        self.calls = {}
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, store, key):
+        if key not in store:
+            store[key] = {'count': 0, 'failures': 0, 'phases': {phase: LatencyHistogram() for phase in PHASES}}
+        return store[key]
+
+    def on_call(self, file_path, identifier, timings, status_code=None, passed=True):
+        with self._lock:
+            for stats in (self._stats(self.calls, (file_path, identifier)), self._stats(self.files, file_path)):
+                stats['count'] += 1
+                stats['failures'] += 0 if passed else 1
+                for phase in PHASES:
+                    stats['phases'][phase].record(getattr(timings, phase))
+
+    @staticmethod
+    def _summary(stats):
+        return {
+            'count': stats['count'],
+            'failures': stats['failures'],
+            'phases': {phase: histogram.to_dict() for phase, histogram in stats['phases'].items()},
+        }
+
+    def report(self):
+        with self._lock:
+            return {
+                'files': {file_path: self._summary(stats) for file_path, stats in self.files.items()},
+                'calls': [{'file': file_path, 'identifier': identifier, **self._summary(stats)}
+                          for (file_path, identifier), stats in self.calls.items()],
+            }
+
+
+class JsonReportWriter(MetricsAggregator):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def close(self):
+        with open(self.path, 'w') as write_file:
+            json.dump(self.report(), write_file, indent=2, default=str)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PrometheusExporter(MetricsAggregator):
+    quantiles = (0.5, 0.9, 0.99)
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path
+
+    def render(self):
+        lines = [
+            '# HELP dolpa_call_phase_seconds Time spent in each phase of a dolpa call.',
+            '# TYPE dolpa_call_phase_seconds summary',
+        ]
+        with self._lock:
+            items = list(self.calls.items())
+        for (file_path, identifier), stats in items:
+            labels = f'file="{_escape_label(file_path)}",identifier="{_escape_label(identifier)}"'
+            for phase, histogram in stats['phases'].items():
+                phase_labels = f'{labels},phase="{phase}"'
+                for quantile in self.quantiles:
+                    lines.append(f'dolpa_call_phase_seconds{{{phase_labels},quantile="{quantile}"}} '
+                                 f'{histogram.percentile(quantile * 100) or 0.0}')
+                lines.append(f'dolpa_call_phase_seconds_sum{{{phase_labels}}} {histogram.total}')
+                lines.append(f'dolpa_call_phase_seconds_count{{{phase_labels}}} {histogram.count}')
+        lines.append('# HELP dolpa_call_failures_total Failed dolpa calls.')
+        lines.append('# TYPE dolpa_call_failures_total counter')
+        for (file_path, identifier), stats in items:
+            labels = f'file="{_escape_label(file_path)}",identifier="{_escape_label(identifier)}"'
+            lines.append(f'dolpa_call_failures_total{{{labels}}} {stats["failures"]}')
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        if self.path:
+            with open(self.path, 'w') as write_file:
+                write_file.write(self.render())
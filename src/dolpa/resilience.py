@@ -0,0 +1,258 @@
+import time
+import random
+import threading
+import email.utils
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+
+from .histogram import LatencyHistogram
+from .exceptions import InValidCallAttributeError, DeadlineExceededError
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def normalize_timeout(value):
+    if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    if isinstance(value, dict):
+        return value.get('connect'), value.get('read')
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return tuple(value)
+    raise InValidCallAttributeError(f'{value} is not a valid timeout. Use seconds or {{"connect": <seconds>, '
+                                    f'"read": <seconds>}}.')
+
+
+def resolve_timeout(*timeouts):
+    return next((timeout for timeout in timeouts if timeout is not None), None)
+
+
+def cap_timeout(timeout, remaining):
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, description):
+        if self.expired:
+            raise DeadlineExceededError(f'Suite deadline of {self.seconds}s exceeded before {description}')
+
+
+def parse_retry_after(response):
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:
+    __slots__ = ('attempts', 'backoff', 'max_backoff', 'jitter', 'statuses')
+
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=30.0, jitter=True, statuses=RETRY_STATUSES):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+
+    @classmethod
+    def from_config(cls, settings):
+        if not settings:
+            return None
+        if settings is True:
+            return cls()
+        if isinstance(settings, int):
+            return cls(attempts=cls.validate_attempts(settings))
+        if isinstance(settings, dict):
+            return cls(
+                attempts=cls.validate_attempts(settings.get('attempts', 3)),
+                backoff=settings.get('backoff', 0.5),
+                max_backoff=settings.get('maxBackoff', 30.0),
+                jitter=settings.get('jitter', True),
+                statuses=settings.get('statuses', RETRY_STATUSES),
+            )
+        raise InValidCallAttributeError(f'{settings} is not a valid retries setting.')
+
+    @staticmethod
+    def validate_attempts(attempts):
+        if not isinstance(attempts, int) or isinstance(attempts, bool) or attempts < 1:
+            raise InValidCallAttributeError(f'{attempts} is not a valid number of attempts. Use 1 or more.')
+        return attempts
+
+    def attempts_for(self, method):
+        return self.attempts if method in IDEMPOTENT_METHODS else 1
+
+    def should_retry(self, response):
+        return response.status_code in self.statuses
+
+    def delay(self, attempt, response=None):
+        delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after = parse_retry_after(response) if response is not None else None
+        return max(delay, min(retry_after, self.max_backoff)) if retry_after is not None else delay
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self.opened_at = 'closed', 0, None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = 'open', time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings):
+        if not settings:
+            return None
+        if settings is True:
+            return cls()
+        return cls(settings.get('failureThreshold', 5), settings.get('resetTimeout', 30.0))
+
+    def get(self, host):
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+
+class HedgePolicy:
+    __slots__ = ('percentile', 'min_samples')
+
+    def __init__(self, percentile=95, min_samples=20):
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+    @classmethod
+    def from_config(cls, settings):
+        if not settings:
+            return None
+        if settings is True:
+            return cls()
+        return cls(settings.get('percentile', 95), settings.get('minSamples', 20))
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class LatencyTracker:
+    def __init__(self, max_workers=16):
+        self.histograms = {}
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def threshold(self, key, policy):
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None or histogram.count < policy.min_samples:
+                return None
+            return histogram.percentile(policy.percentile)
+
+    def record(self, key, seconds):
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dolpa-hedge')
+            return self._pool
+
+    def send(self, key, policy, send):
+        started = time.perf_counter()
+        threshold = self.threshold(key, policy)
+        if threshold is None:
+            response = send()
+        else:
+            pool = self._get_pool()
+            first = pool.submit(send)
+            try:
+                response = first.result(timeout=threshold)
+            except FutureTimeoutError:
+                LOGGER.info('%s is slower than p%s (%.3fs), sending a hedged request', key[1], policy.percentile,
+                            threshold)
+                second = pool.submit(send)
+                done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+                winner = next((future for future in (first, second)
+                               if future in done and future.exception() is None), None)
+                if winner is None:
+                    winner = second if first in done else first
+                loser = second if winner is first else first
+                loser.add_done_callback(_close_response)
+                response = winner.result()
+        self.record(key, time.perf_counter() - started)
+        return response
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+class Resilience:
+    def __init__(self, timeout=None, deadline=None, circuit_breakers=None, latency_tracker=None):
+        self.timeout = normalize_timeout(timeout)
+        self.deadline = deadline if deadline is not None else Deadline()
+        self.circuit_breakers = circuit_breakers
+        self.latency_tracker = latency_tracker if latency_tracker is not None else LatencyTracker()
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+
+from .dolpa_utils import interpolate
+from .dolpa_results import FileResult
+from .scheduler import find_variables, IMPLICIT_READS
+from .scope import Scope, get_environment
+from .exceptions import CachedFailureError, CallSkippedError
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+RERUN_MODES = ('all', 'changed', 'failed', 'affected')
+
+
+def _resolve_base_url(config, environment, variables):
+    base_url = config.get('base_url')
+    try:
+        return interpolate(base_url, Scope(environment, Scope(config, Scope(variables))))
+    except Exception:
+        return base_url
+
+
+def compute_cache_key(digest, runner_dict, environment=None, variables=None):
+    environment = get_environment() if environment is None else environment
+    variables = variables or {}
+    names = find_variables(runner_dict) | set(IMPLICIT_READS)
+    config = runner_dict.get('config') or {}
+    payload = [
+        digest,
+        {name: environment[name] for name in sorted(names) if name in environment},
+        {name: variables[name] for name in sorted(names) if name in variables},
+        _resolve_base_url(config, environment, variables),
+    ]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def describe_file(file_path, indexed_file=None):
+    if indexed_file is not None:
+        return indexed_file.digest, indexed_file.runner_dict or {}
+    with open(file_path, 'rb') as read_file:
+        content = read_file.read()
+    try:
+        runner_dict = json.loads(content)
+    except ValueError:
+        runner_dict = None
+    return hashlib.sha256(content).hexdigest(), runner_dict if isinstance(runner_dict, dict) else {}
+
+
+def is_affected(runner_dict, tags=None, resource_prefix=None):
+    file_tags = set((runner_dict.get('config') or {}).get('tags') or ())
+    if tags and file_tags.intersection(tags):
+        return True
+    if resource_prefix:
+        return any(str(call.get('resource', '')).startswith(resource_prefix) for call in runner_dict.get('calls', ()))
+    return False
+
+
+class ResultCache:
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as read_file:
+                data = json.load(read_file)
+        except Exception as e:
+            LOGGER.warning('Ignoring unreadable result cache %s: %s', self.path, e)
+            return
+        if data.get('version') == self.version:
+            self.entries = data.get('files', {})
+
+    def save(self):
+        if not self.path:
+            return
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as write_file:
+            json.dump({'version': self.version, 'files': self.entries}, write_file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def should_run(self, file_path, key, mode='changed', runner_dict=None, tags=None, resource_prefix=None):
+        entry = self.entries.get(file_path)
+        if mode == 'all':
+            return True
+        if mode == 'changed':
+            return entry is None or entry['key'] != key
+        if mode == 'failed':
+            return entry is None or not entry['passed']
+        return is_affected(runner_dict or {}, tags, resource_prefix)
+
+    def select(self, test_files, mode='changed', indexed_file=None, variables=None, tags=None,
+               resource_prefix=None):
+        if mode not in RERUN_MODES:
+            raise ValueError(f'{mode} - rerun mode is not supported. Use one of {RERUN_MODES}.')
+        environment = get_environment()
+        keys, selected = {}, set()
+        for file_path in test_files:
+            digest, runner_dict = describe_file(file_path, indexed_file(file_path) if indexed_file else None)
+            keys[file_path] = key = compute_cache_key(digest, runner_dict, environment, variables)
+            if self.should_run(file_path, key, mode, runner_dict, tags, resource_prefix):
+                selected.add(file_path)
+        LOGGER.info('Rerun mode %s selected %d of %d test files', mode, len(selected), len(test_files))
+        return keys, selected
+
+    def cached_result(self, file_path):
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return FileResult(file_path, error=CallSkippedError(f'{file_path} was not selected and has no cached '
+                                                                f'result'), cached=True)
+        error = None if entry['passed'] else CachedFailureError(f'{file_path} failed in the last run: '
+                                                                 f'{entry["error"]}')
+        return FileResult(file_path, error=error, duration=entry['duration'], cached=True)
+
+    def record(self, result, key):
+        if result.skipped or result.cached:
+            return
+        self.entries[result.path] = {
+            'key': key,
+            'passed': result.passed,
+            'error': None if result.passed else f'{type(result.error).__name__}: {result.error}',
+            'duration': result.duration,
+            'ranAt': time.time(),
+        }
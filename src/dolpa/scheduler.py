@@ -0,0 +1,139 @@
+import re
+import heapq
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .exceptions import UnresolvedVariableError, CallCycleError
+
+VARIABLE_PATTERN = re.compile(r'\{\{(.*?)\}\}')
+VARIABLE_ROOT_PATTERN = re.compile(r'[.\[]')
+REQUEST_ATTRIBUTES = ('resource', 'body', 'bodySource', 'downloadPath', 'headers', 'auth')
+READ_ATTRIBUTES = REQUEST_ATTRIBUTES + ('assertions',)
+IMPLICIT_READS = ('headers', 'auth', 'abortIfAssertionFails', 'dolpa_username', 'dolpa_password')
+
+
+def find_variables(value):
+    found = set()
+    if isinstance(value, str):
+        for match in VARIABLE_PATTERN.finditer(value):
+            found.add(VARIABLE_ROOT_PATTERN.split(match.group(1).strip(), 1)[0])
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            found |= find_variables(key)
+            found |= find_variables(item)
+    elif isinstance(value, list):
+        for item in value:
+            found |= find_variables(item)
+    return found
+
+
+def get_call_reads(call, attributes=READ_ATTRIBUTES):
+    reads = set(IMPLICIT_READS)
+    for key, value in call.items():
+        if key.split(':')[0] in attributes:
+            reads |= find_variables(value)
+    if call.get('resource', '').startswith('/'):
+        reads.add('base_url')
+    return reads
+
+
+def get_self_satisfied_reads(call, writes):
+    return (find_variables(call.get('assertions')) & writes) - get_call_reads(call, REQUEST_ATTRIBUTES)
+
+
+def get_call_writes(call):
+    return set((call.get('saves') or {}).keys())
+
+
+class CallGraph:
+    def __init__(self, size):
+        self.size = size
+        self.dependencies = [set() for _ in range(size)]
+        self.dependents = [set() for _ in range(size)]
+
+    def add_edge(self, before, after):
+        if before != after:
+            self.dependencies[after].add(before)
+            self.dependents[before].add(after)
+
+    def topological_order(self):
+        remaining = [len(deps) for deps in self.dependencies]
+        ready = [index for index in range(self.size) if remaining[index] == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            index = heapq.heappop(ready)
+            order.append(index)
+            for dependent in self.dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+        if len(order) < self.size:
+            stuck = sorted(set(range(self.size)) - set(order))
+            raise CallCycleError(f'Calls at positions {stuck} depend on each other in a cycle. Fix your JSON file.')
+        return order
+
+
+def build_call_graph(calls, available_variables):
+    graph = CallGraph(len(calls))
+    last_writer = {}
+    readers = defaultdict(list)
+    all_writes = [get_call_writes(call) for call in calls]
+    unresolved = []
+    for index, call in enumerate(calls):
+        for variable in sorted(get_call_reads(call) - get_self_satisfied_reads(call, all_writes[index])):
+            if variable in last_writer:
+                graph.add_edge(last_writer[variable], index)
+            elif variable not in available_variables and variable not in IMPLICIT_READS and not call.get('dataset'):
+                later = [pos for pos in range(index + 1, len(calls)) if variable in all_writes[pos]]
+                reason = f'only saved by the later call at position {later[0]}' if later else 'never defined'
+                unresolved.append(f'{variable} used by the call at position {index} is {reason}')
+            readers[variable].append(index)
+        for variable in all_writes[index]:
+            if variable in last_writer:
+                graph.add_edge(last_writer[variable], index)
+            for reader in readers[variable]:
+                graph.add_edge(reader, index)
+            last_writer[variable] = index
+            readers[variable] = []
+    if unresolved:
+        raise UnresolvedVariableError('Unresolved variables: ' + '; '.join(unresolved))
+    graph.topological_order()
+    return graph
+
+
+class CallScheduler:
+    def __init__(self, graph, max_concurrency):
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+
+    def run(self, execute):
+        remaining = [len(deps) for deps in self.graph.dependencies]
+        ready = [index for index in range(self.graph.size) if remaining[index] == 0]
+        heapq.heapify(ready)
+        failure_index, failure = None, None
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    index = heapq.heappop(ready)
+                    if failure_index is not None and index > failure_index:
+                        continue
+                    running[pool.submit(execute, index)] = index
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        if failure_index is None or index < failure_index:
+                            failure_index, failure = index, e
+                        continue
+                    for dependent in self.graph.dependents[index]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            heapq.heappush(ready, dependent)
+        if failure is not None:
+            raise failure
@@ -0,0 +1,286 @@
+import re
+import json
+from decimal import Decimal, InvalidOperation
+from collections.abc import Mapping
+from functools import lru_cache
+
+from .exceptions import InvalidSchemaError
+
+ANNOTATION_KEYWORDS = {'$schema', '$id', 'title', 'description', 'default', 'examples', 'format', '$comment'}
+TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, Mapping),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'integer': lambda value: (isinstance(value, int) and not isinstance(value, bool)) or
+                             (isinstance(value, float) and value.is_integer()),
+}
+
+
+def format_location(location):
+    return '$' + ''.join(f'[{key}]' if isinstance(key, int) else f'.{key}' for key in location)
+
+
+class ValidationErrors:
+    __slots__ = ('limit', 'count', 'errors')
+
+    def __init__(self, limit=10):
+        self.limit = limit
+        self.count = 0
+        self.errors = []
+
+    def add(self, location, message):
+        self.count += 1
+        if len(self.errors) < self.limit:
+            self.errors.append(f'{format_location(location)}: {message}')
+
+    def describe(self):
+        more = f' (and {self.count - len(self.errors)} more)' if self.count > len(self.errors) else ''
+        return '; '.join(self.errors) + more
+
+
+class SchemaValidator:
+    __slots__ = ('schema', 'checks')
+
+    def __init__(self, schema):
+        self.schema = schema
+        if schema is True:
+            schema = {}
+        elif schema is False:
+            schema = {'not': {}}
+        if not isinstance(schema, Mapping):
+            raise InvalidSchemaError(f'{schema!r} is not a valid schema.')
+        unsupported = set(schema) - set(KEYWORD_COMPILERS) - ANNOTATION_KEYWORDS
+        if unsupported:
+            raise InvalidSchemaError(f'{sorted(unsupported)} - schema keywords are not supported.')
+        self.checks = []
+        for keyword, compiler in KEYWORD_COMPILERS.items():
+            if keyword in schema:
+                self.checks.append(compiler(schema[keyword], schema))
+
+    def __reduce__(self):
+        return compile_schema, (self.schema,)
+
+    def validate(self, value, location, errors):
+        for check in self.checks:
+            check(value, location, errors)
+
+    def is_valid(self, value):
+        errors = ValidationErrors(0)
+        self.validate(value, (), errors)
+        return not errors.count
+
+
+def _compile_type(expected, schema):
+    names = [expected] if isinstance(expected, str) else list(expected)
+    unknown = set(names) - set(TYPE_CHECKS)
+    if unknown:
+        raise InvalidSchemaError(f'{sorted(unknown)} - schema types are not supported.')
+    checks = [TYPE_CHECKS[name] for name in names]
+
+    def check(value, location, errors):
+        if not any(type_check(value) for type_check in checks):
+            errors.add(location, f'expected {" or ".join(names)}, found {value!r}')
+    return check
+
+
+def _compile_enum(options, schema):
+    def check(value, location, errors):
+        if value not in options:
+            errors.add(location, f'{value!r} is not one of {options!r}')
+    return check
+
+
+def _compile_const(expected, schema):
+    def check(value, location, errors):
+        if value != expected:
+            errors.add(location, f'expected {expected!r}, found {value!r}')
+    return check
+
+
+def _string_check(test, message):
+    def compiler(limit, schema):
+        def check(value, location, errors):
+            if isinstance(value, str) and not test(value, limit):
+                errors.add(location, message.format(limit=limit, value=value))
+        return check
+    return compiler
+
+
+def _number_check(test, message):
+    def compiler(limit, schema):
+        def check(value, location, errors):
+            if TYPE_CHECKS['number'](value) and not test(value, limit):
+                errors.add(location, message.format(limit=limit, value=value))
+        return check
+    return compiler
+
+
+def _compile_pattern(pattern, schema):
+    compiled = re.compile(pattern)
+
+    def check(value, location, errors):
+        if isinstance(value, str) and not compiled.search(value):
+            errors.add(location, f'{value!r} does not match {pattern!r}')
+    return check
+
+
+def _compile_required(names, schema):
+    def check(value, location, errors):
+        if isinstance(value, Mapping):
+            for name in names:
+                if name not in value:
+                    errors.add(location, f'missing required property {name!r}')
+    return check
+
+
+def _compile_properties(properties, schema):
+    validators = {name: SchemaValidator(subschema) for name, subschema in properties.items()}
+
+    def check(value, location, errors):
+        if isinstance(value, Mapping):
+            for name, validator in validators.items():
+                if name in value:
+                    validator.validate(value[name], location + (name,), errors)
+    return check
+
+
+def _compile_additional_properties(additional, schema):
+    known = set(schema.get('properties', {}))
+    validator = None if additional is False else SchemaValidator(additional)
+
+    def check(value, location, errors):
+        if isinstance(value, Mapping):
+            for name, item in value.items():
+                if name in known:
+                    continue
+                if validator is None:
+                    errors.add(location, f'unexpected property {name!r}')
+                else:
+                    validator.validate(item, location + (name,), errors)
+    return check
+
+
+def _compile_items(items, schema):
+    if isinstance(items, list):
+        validators = [SchemaValidator(subschema) for subschema in items]
+
+        def check(value, location, errors):
+            if isinstance(value, list):
+                for index, (validator, item) in enumerate(zip(validators, value)):
+                    validator.validate(item, location + (index,), errors)
+        return check
+    validator = SchemaValidator(items)
+
+    def check(value, location, errors):
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                validator.validate(item, location + (index,), errors)
+    return check
+
+
+def _compile_unique_items(unique, schema):
+    def check(value, location, errors):
+        if unique and isinstance(value, list):
+            seen = set()
+            for index, item in enumerate(value):
+                marker = json.dumps(item, sort_keys=True)
+                if marker in seen:
+                    errors.add(location + (index,), f'duplicate item {item!r}')
+                seen.add(marker)
+    return check
+
+
+def _compile_all_of(schemas, schema):
+    validators = [SchemaValidator(subschema) for subschema in schemas]
+
+    def check(value, location, errors):
+        for validator in validators:
+            validator.validate(value, location, errors)
+    return check
+
+
+def _compile_any_of(schemas, schema):
+    validators = [SchemaValidator(subschema) for subschema in schemas]
+
+    def check(value, location, errors):
+        if not any(validator.is_valid(value) for validator in validators):
+            errors.add(location, f'{value!r} matches none of the anyOf schemas')
+    return check
+
+
+def _compile_one_of(schemas, schema):
+    validators = [SchemaValidator(subschema) for subschema in schemas]
+
+    def check(value, location, errors):
+        matched = sum(1 for validator in validators if validator.is_valid(value))
+        if matched != 1:
+            errors.add(location, f'{value!r} matches {matched} of the oneOf schemas, expected exactly 1')
+    return check
+
+
+def _compile_not(subschema, schema):
+    validator = SchemaValidator(subschema)
+
+    def check(value, location, errors):
+        if validator.is_valid(value):
+            errors.add(location, f'{value!r} must not match {subschema!r}')
+    return check
+
+
+def _is_multiple(value, limit):
+    try:
+        return Decimal(repr(value)) % Decimal(repr(limit)) == 0
+    except InvalidOperation:
+        return False
+
+
+def _size_check(kind, test, message):
+    def compiler(limit, schema):
+        def check(value, location, errors):
+            if TYPE_CHECKS[kind](value) and not test(len(value), limit):
+                errors.add(location, message.format(limit=limit, size=len(value)))
+        return check
+    return compiler
+
+
+KEYWORD_COMPILERS = {
+    'type': _compile_type,
+    'enum': _compile_enum,
+    'const': _compile_const,
+    'minLength': _string_check(lambda value, limit: len(value) >= limit, 'shorter than {limit} characters'),
+    'maxLength': _string_check(lambda value, limit: len(value) <= limit, 'longer than {limit} characters'),
+    'pattern': _compile_pattern,
+    'minimum': _number_check(lambda value, limit: value >= limit, '{value!r} is less than {limit}'),
+    'maximum': _number_check(lambda value, limit: value <= limit, '{value!r} is greater than {limit}'),
+    'exclusiveMinimum': _number_check(lambda value, limit: value > limit, '{value!r} is not greater than {limit}'),
+    'exclusiveMaximum': _number_check(lambda value, limit: value < limit, '{value!r} is not less than {limit}'),
+    'multipleOf': _number_check(lambda value, limit: _is_multiple(value, limit), '{value!r} is not a multiple of '
+                                                                               '{limit}'),
+    'required': _compile_required,
+    'properties': _compile_properties,
+    'additionalProperties': _compile_additional_properties,
+    'minProperties': _size_check('object', lambda size, limit: size >= limit, 'has {size} properties, fewer than '
+                                                                              '{limit}'),
+    'maxProperties': _size_check('object', lambda size, limit: size <= limit, 'has {size} properties, more than '
+                                                                              '{limit}'),
+    'items': _compile_items,
+    'minItems': _size_check('array', lambda size, limit: size >= limit, 'has {size} items, fewer than {limit}'),
+    'maxItems': _size_check('array', lambda size, limit: size <= limit, 'has {size} items, more than {limit}'),
+    'uniqueItems': _compile_unique_items,
+    'allOf': _compile_all_of,
+    'anyOf': _compile_any_of,
+    'oneOf': _compile_one_of,
+    'not': _compile_not,
+}
+
+
+@lru_cache(maxsize=256)
+def _compile_schema_text(schema_text):
+    return SchemaValidator(json.loads(schema_text))
+
+
+def compile_schema(schema):
+    return _compile_schema_text(json.dumps(schema, sort_keys=True))
@@ -0,0 +1,86 @@
+import os
+from collections.abc import MutableMapping
+
+ENVIRONMENT_PREFIX = 'dolpa_'
+_MISSING = object()
+_ENVIRONMENT = None
+
+
+def get_environment():
+    global _ENVIRONMENT
+    if _ENVIRONMENT is None:
+        _ENVIRONMENT = {name: value for name, value in os.environ.items() if name.startswith(ENVIRONMENT_PREFIX)}
+    return _ENVIRONMENT
+
+
+def refresh_environment():
+    global _ENVIRONMENT
+    _ENVIRONMENT = None
+    return get_environment()
+
+
+class Scope(MutableMapping):
+    __slots__ = ('local', 'parent')
+
+    def __init__(self, local=None, parent=None):
+        self.local = local if local is not None else {}
+        self.parent = parent
+
+    def __getitem__(self, key):
+        scope = self
+        while scope is not None:
+            value = scope.local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            scope = scope.parent
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        scope = self
+        while scope is not None:
+            value = scope.local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            scope = scope.parent
+        return default
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        self.local[key] = value
+
+    def __delitem__(self, key):
+        del self.local[key]
+
+    def __iter__(self):
+        seen = set()
+        scope = self
+        while scope is not None:
+            for key in scope.local:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+            scope = scope.parent
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def child(self, local=None):
+        return Scope(local, self)
+
+    def layers(self):
+        scope, layers = self, []
+        while scope is not None:
+            layers.append(scope.local)
+            scope = scope.parent
+        return layers
+
+    def to_dict(self):
+        flattened = {}
+        for layer in reversed(self.layers()):
+            flattened.update(layer)
+        return flattened
+
+    def __repr__(self):
+        return f'Scope({self.layers()!r})'
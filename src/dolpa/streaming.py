@@ -0,0 +1,222 @@
+import re
+import codecs
+from json.decoder import scanstring, JSONDecodeError
+
+from .dolpa_utils import KeySegment, IndexSegment
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+NUMBER_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+NUMBER_CHARACTERS = frozenset('0123456789.eE+-')
+LITERALS = {'t': ('true', True), 'f': ('false', False), 'n': ('null', None)}
+
+
+class _ChunkReader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        if self.exhausted:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            text = self.decoder.decode(b'', final=True)
+        else:
+            text = self.decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE_PATTERN.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def read_string(self):
+        while True:
+            try:
+                value, end = scanstring(self.buffer, self.pos + 1)
+            except JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def read_number(self):
+        while True:
+            match = NUMBER_PATTERN.match(self.buffer, self.pos)
+            complete = match and match.end() < len(self.buffer) and self.buffer[match.end()] not in NUMBER_CHARACTERS
+            if complete or (match and self.exhausted):
+                self.pos = match.end()
+                integer = match.group()
+                return float(integer) if match.group(1) or match.group(2) else int(integer)
+            if not self.fill():
+                raise JSONDecodeError('Expecting value', self.buffer, self.pos)
+
+    def read_literal(self, char):
+        text, value = LITERALS[char]
+        while len(self.buffer) - self.pos < len(text):
+            if not self.fill():
+                break
+        if not self.buffer.startswith(text, self.pos):
+            raise JSONDecodeError('Expecting value', self.buffer, self.pos)
+        self.pos += len(text)
+        return value
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise JSONDecodeError(f'Expecting {char!r}', self.buffer, self.pos)
+        self.pos += 1
+
+
+def iter_json_events(chunks):
+    reader = _ChunkReader(chunks)
+    stack = []
+    expect_value = True
+    while True:
+        char = reader.peek()
+        if char is None:
+            if stack or expect_value:
+                raise JSONDecodeError('Unexpected end of JSON input', reader.buffer, reader.pos)
+            return
+        if not expect_value:
+            if not stack:
+                raise JSONDecodeError('Extra data', reader.buffer, reader.pos)
+            reader.pos += 1
+            if char == ',':
+                expect_value = True
+                if stack[-1] == 'map':
+                    yield 'map_key', _read_key(reader)
+                continue
+            if (char == '}' and stack[-1] == 'map') or (char == ']' and stack[-1] == 'array'):
+                yield 'end_' + stack.pop(), None
+                continue
+            raise JSONDecodeError(f'Unexpected {char!r}', reader.buffer, reader.pos - 1)
+        if char == '{':
+            reader.pos += 1
+            stack.append('map')
+            yield 'start_map', None
+            if reader.peek() == '}':
+                reader.pos += 1
+                stack.pop()
+                yield 'end_map', None
+                expect_value = False
+                continue
+            yield 'map_key', _read_key(reader)
+        elif char == '[':
+            reader.pos += 1
+            stack.append('array')
+            yield 'start_array', None
+            if reader.peek() == ']':
+                reader.pos += 1
+                stack.pop()
+                yield 'end_array', None
+                expect_value = False
+        elif char == '"':
+            yield 'value', reader.read_string()
+            expect_value = False
+        elif char in LITERALS:
+            yield 'value', reader.read_literal(char)
+            expect_value = False
+        elif char == '-' or char.isdigit():
+            yield 'value', reader.read_number()
+            expect_value = False
+        else:
+            raise JSONDecodeError('Expecting value', reader.buffer, reader.pos)
+
+
+def _read_key(reader):
+    if reader.peek() != '"':
+        raise JSONDecodeError('Expecting property name enclosed in double quotes', reader.buffer, reader.pos)
+    key = reader.read_string()
+    reader.expect(':')
+    return key
+
+
+class PathTrie:
+    __slots__ = ('children', 'full', 'max_index')
+
+    def __init__(self):
+        self.children = {}
+        self.full = False
+        self.max_index = -1
+
+    def add(self, json_path):
+        node = self
+        for segment in json_path.segments:
+            if node.full:
+                return
+            if isinstance(segment, KeySegment):
+                node = node.children.setdefault(segment.key, PathTrie())
+            elif isinstance(segment, IndexSegment) and segment.key >= 0:
+                node.max_index = max(node.max_index, segment.key)
+                node = node.children.setdefault(segment.key, PathTrie())
+            else:
+                break
+        node.full = True
+        node.children = {}
+
+    def child(self, key):
+        if self.full:
+            return self
+        return self.children.get(key)
+
+
+def build_path_trie(json_paths):
+    trie = PathTrie()
+    if json_paths is None:
+        trie.full = True
+        return trie
+    for json_path in json_paths:
+        trie.add(json_path)
+    return trie
+
+
+def extract_json_paths(chunks, json_paths=None):
+    holder = PathTrie()
+    holder.children[0] = build_path_trie(json_paths)
+    root = []
+    stack = [[root, holder, 0]]
+    skip_depth = 0
+    for event, value in iter_json_events(chunks):
+        if skip_depth:
+            if event in ('start_map', 'start_array'):
+                skip_depth += 1
+            elif event in ('end_map', 'end_array'):
+                skip_depth -= 1
+            continue
+        frame = stack[-1]
+        if event == 'map_key':
+            frame[2] = value
+            continue
+        if event in ('end_map', 'end_array'):
+            stack.pop()
+            continue
+        container, node, key = frame
+        if isinstance(container, list):
+            frame[2] = key + 1
+        child_node = node.child(key)
+        if child_node is None:
+            if event != 'value':
+                skip_depth = 1
+            if isinstance(container, list) and key < node.max_index:
+                container.append(None)
+            continue
+        if event == 'value':
+            child = value
+        else:
+            child = {} if event == 'start_map' else []
+            stack.append([child, child_node, 0 if event == 'start_array' else None])
+        if isinstance(container, dict):
+            container[key] = child
+        else:
+            container.append(child)
+    return root[0]
@@ -0,0 +1,117 @@
+import os
+import json
+import pickle
+import hashlib
+
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+
+class IndexedFile:
+    __slots__ = ('path', 'mtime_ns', 'size', 'digest', 'runner_dict', 'endpoint_calls', 'error')
+
+    def __init__(self, path, mtime_ns, size, digest, runner_dict=None, endpoint_calls=None, error=None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.runner_dict = runner_dict
+        self.endpoint_calls = endpoint_calls
+        self.error = error
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+class SuiteIndex:
+    version = 1
+
+    def __init__(self, root_path, cache_path, compiler):
+        self.root_path = root_path
+        self.cache_path = cache_path
+        self.compiler = compiler
+        self.directories = {}
+        self.files = {}
+        self.test_files = []
+        self._load()
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'rb') as read_file:
+                version, root_path, directories, files = pickle.load(read_file)
+        except Exception as e:
+            LOGGER.warning('Ignoring unreadable suite index %s: %s', self.cache_path, e)
+            return
+        if version == self.version and root_path == self.root_path:
+            self.directories, self.files = directories, files
+
+    def save(self):
+        if not self.cache_path:
+            return
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'wb') as write_file:
+            pickle.dump((self.version, self.root_path, self.directories, self.files), write_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.cache_path)
+
+    def _list_directory(self, dir_path, seen_directories):
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        seen_directories.add(dir_path)
+        cached = self.directories.get(dir_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        entries = []
+        for curr_path in sorted(os.listdir(dir_path)):
+            inner_path = (dir_path + curr_path) if dir_path.endswith('/') else (dir_path + '/' + curr_path)
+            if os.path.isdir(inner_path):
+                entries.append((inner_path, True))
+            elif inner_path.endswith('.json'):
+                entries.append((inner_path, False))
+        self.directories[dir_path] = (mtime_ns, entries)
+        return entries
+
+    def _discover(self, dir_path, seen_directories):
+        test_files = []
+        for inner_path, is_dir in self._list_directory(dir_path, seen_directories):
+            if is_dir:
+                test_files.extend(self._discover(inner_path, seen_directories))
+            else:
+                test_files.append(inner_path)
+        return test_files
+
+    def _index_file(self, file_path):
+        stat = os.stat(file_path)
+        cached = self.files.get(file_path)
+        if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            return cached
+        with open(file_path, 'rb') as read_file:
+            content = read_file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if cached is not None and cached.digest == digest and cached.error is None:
+            cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+            return cached
+        indexed = IndexedFile(file_path, stat.st_mtime_ns, stat.st_size, digest)
+        try:
+            indexed.runner_dict = json.loads(content)
+            indexed.endpoint_calls = self.compiler(indexed.runner_dict)
+        except Exception as e:
+            LOGGER.error('%s failed validation: %s', file_path, e)
+            indexed.runner_dict, indexed.endpoint_calls, indexed.error = None, None, e
+        return indexed
+
+    def refresh(self):
+        seen_directories = set()
+        self.test_files = self._discover(self.root_path, seen_directories)
+        self.directories = {path: entry for path, entry in self.directories.items() if path in seen_directories}
+        self.files = {file_path: self._index_file(file_path) for file_path in self.test_files}
+        return self.test_files
+
+    def get(self, file_path):
+        return self.files.get(file_path)
@@ -0,0 +1,69 @@
+import time
+
+from .dolpa import RunContext, compile_calls, run_test_files
+from .dolpa_session import SessionRegistry
+from .dolpa_results import BulkRunSummary
+from .resilience import Resilience, CircuitBreakerRegistry
+from .suite_index import SuiteIndex
+from .dolpa_logger import get_logger
+
+LOGGER = get_logger()
+
+
+class SuiteWatcher:
+    def __init__(self, root_path, workers=1, adapter=None, timeout=None, circuit_breaker=None, variables=None,
+                 memo_store=None, interval=0.2):
+        self.root_path = root_path
+        self.workers = workers
+        self.interval = interval
+        self.circuit_breaker = circuit_breaker
+        self.index = SuiteIndex(root_path, None, compile_calls)
+        self.context = RunContext(SessionRegistry(adapter), index=self.index, memo_store=memo_store,
+                                  resilience=Resilience(timeout,
+                                                        circuit_breakers=CircuitBreakerRegistry.from_config(
+                                                            circuit_breaker)),
+                                  variables=variables)
+        self.digests = {}
+        self.results = {}
+
+    def changed_files(self):
+        test_files = self.index.refresh()
+        for file_path in set(self.digests) - set(test_files):
+            LOGGER.info('%s was removed', file_path)
+            self.digests.pop(file_path)
+            self.results.pop(file_path, None)
+        return [file_path for file_path in test_files
+                if self.index.get(file_path).digest != self.digests.get(file_path)]
+
+    def poll(self):
+        changed = self.changed_files()
+        if not changed:
+            return None
+        digests = {file_path: self.index.get(file_path).digest for file_path in changed}
+        results = run_test_files(changed, self.context, self.workers, 'thread', False, self.circuit_breaker)
+        for result in results:
+            self.digests[result.path] = digests[result.path]
+            self.results[result.path] = result
+        return BulkRunSummary(results)
+
+    @property
+    def suite_summary(self):
+        return BulkRunSummary(self.results[file_path] for file_path in self.index.test_files
+                              if file_path in self.results)
+
+    def run_forever(self, on_summary=None):
+        try:
+            while True:
+                started = time.monotonic()
+                summary = self.poll()
+                if summary is not None and on_summary is not None:
+                    on_summary(summary)
+                time.sleep(max(self.interval - (time.monotonic() - started), 0.0))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.context.resilience.latency_tracker.close()
+        self.context.sessions.close()
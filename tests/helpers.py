@@ -0,0 +1,24 @@
+import json
+from unittest import mock
+
+BASE_URL = 'http://localhost:8000'
+
+
+def build_call(identifier=1, resource='/a', method='GET', **attributes):
+    return {"identifier": identifier, "resource": resource, "method": method, "headers": {}, "saves": {},
+            "assertions": {}, **attributes}
+
+
+def build_runner_dict(*calls, config=None):
+    return {"config": {"base_url": BASE_URL, **(config or {})}, "calls": list(calls) or [build_call()]}
+
+
+def build_response(payload=None, status_code=200, headers=None, content=b'{}'):
+    response = mock.Mock(status_code=status_code, content=content, headers=headers or {})
+    response.json.return_value = {} if payload is None else payload
+    return response
+
+
+def write_runner_dict(path, runner_dict):
+    with open(path, 'w') as write_file:
+        json.dump(runner_dict, write_file)
@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+import requests
+from requests.auth import HTTPDigestAuth
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.dolpa_auth import TokenAuth
+from src.dolpa.exceptions import AuthTypeNotSupportedError
+
+
+def build_api_tests(auth, session=None):
+    runner_dict = {"config": {"base_url": "http://localhost:8000", "auth": auth, "dolpa_username": "admin",
+                              "dolpa_password": "secret"}, "calls": []}
+    return APITests(runner_dict, session=session or requests.Session())
+
+
+class TestAuth(unittest.TestCase):
+
+    def test_digest_handlers_are_cached_per_session_and_credentials(self):
+        session = requests.Session()
+        first = build_api_tests('digest', session)._get_auth()
+        self.assertIsInstance(first, HTTPDigestAuth)
+        self.assertIs(build_api_tests('digest', session)._get_auth(), first)
+        self.assertIsNot(build_api_tests('digest')._get_auth(), first)
+        other_user = build_api_tests('digest', session)._get_auth({'auth': 'digest', 'username': 'other'})
+        self.assertIsNot(other_user, first)
+        self.assertEqual(other_user.username, 'other')
+
+    def test_call_level_digest_and_unsupported_types(self):
+        api_tests = build_api_tests(None)
+        self.assertIsInstance(api_tests._get_auth({'auth': 'digest'}), HTTPDigestAuth)
+        self.assertEqual(api_tests._get_auth({'auth': 'basic'}), ('admin', 'secret'))
+        self.assertRaises(AuthTypeNotSupportedError, api_tests._get_auth, {'auth': 'kerberos'})
+
+    def test_oauth2_token_is_cached_and_refreshed_before_expiry(self):
+        session = mock.Mock()
+        session.post.return_value.json.return_value = {'access_token': 'abc', 'expires_in': 100}
+        api_tests = build_api_tests({'auth': 'oauth2', 'tokenUrl': 'http://localhost:8000/token',
+                                     'clientId': 'dolpa', 'clientSecret': '{{dolpa_password}}', 'refreshMargin': 30},
+                                    session)
+        auth = api_tests._get_auth()
+        self.assertIsInstance(auth, TokenAuth)
+        self.assertIs(api_tests._get_auth(), auth)
+        with mock.patch('src.dolpa.dolpa_auth.time.monotonic', return_value=1000.0):
+            request = auth(requests.Request('GET', 'http://localhost:8000/users').prepare())
+            auth.get_token()
+        self.assertEqual(request.headers['Authorization'], 'Bearer abc')
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual(session.post.call_args.kwargs['auth'], ('dolpa', 'secret'))
+        with mock.patch('src.dolpa.dolpa_auth.time.monotonic', return_value=1071.0):
+            auth.get_token()
+        self.assertEqual(session.post.call_count, 2)
+
+    def test_static_bearer_token(self):
+        auth = build_api_tests(None)._get_auth({'auth': 'bearer', 'token': 'xyz'})
+        self.assertEqual(auth.authorization(), 'Bearer xyz')
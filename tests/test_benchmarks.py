@@ -0,0 +1,17 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.run import compare_with_baseline, load_baseline, save_baseline
+
+
+class TestBenchmarkBaseline(unittest.TestCase):
+
+    def test_regressions_past_threshold_are_reported(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'baseline.json')
+            self.assertIsNone(load_baseline(path))
+            save_baseline(path, {'interpolate': 1000.0, 'json_path': 500.0})
+            baseline = load_baseline(path)
+        regressions = compare_with_baseline({'interpolate': 850.0, 'json_path': 300.0, 'new': 1.0}, baseline, 0.2)
+        self.assertEqual(regressions, {'json_path': (300.0, 500.0)})
@@ -0,0 +1,137 @@
+import io
+import os
+import hashlib
+import tempfile
+import unittest
+from unittest import mock
+
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.bodies import MultipartStream, open_body_source
+from src.dolpa.exceptions import InValidCallAttributeError, FailedAssertion
+from tests.helpers import build_call, build_runner_dict
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, content=b'{}', headers=None):
+        super().__init__()
+        self.content = content
+        self.headers = headers or {}
+        self.requests = []
+
+    def send(self, request, stream=False, **kwargs):
+        body = request.body
+        if body is None or isinstance(body, bytes):
+            uploaded = body
+        else:
+            uploaded = body.read() if hasattr(body, 'read') else b''.join(body)
+        self.requests.append((request, uploaded))
+        response = Response()
+        response.status_code = 200
+        response.headers.update(self.headers)
+        response.raw = io.BytesIO(self.content)
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def chunks(count):
+    for index in range(count):
+        yield f'chunk-{index};'
+
+
+class TestBodies(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.upload_path = os.path.join(self.temp_dir.name, 'upload.bin')
+        with open(self.upload_path, 'wb') as write_file:
+            write_file.write(b'0123456789' * 1000)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def build_upload(self, call):
+        return build_runner_dict(build_call(**{"resource": "/files", "method": "POST", **call}))
+
+    def run_call(self, call, adapter=None):
+        adapter = adapter or RecordingAdapter()
+        int_test = APITests(self.build_upload(call), adapter=adapter,
+                            source_path=os.path.join(self.temp_dir.name, 'test.json'))
+        try:
+            int_test.run_all()
+        finally:
+            int_test.close()
+        return adapter.requests[-1]
+
+    def test_file_body_is_memory_mapped_with_content_length(self):
+        request, uploaded = self.run_call({"bodySource": {"file": "upload.bin"}})
+        self.assertEqual(uploaded, b'0123456789' * 1000)
+        self.assertEqual(request.headers['Content-Length'], '10000')
+        self.assertEqual(request.headers['Content-Type'], 'application/octet-stream')
+
+    def test_chunked_sources_use_transfer_encoding(self):
+        request, uploaded = self.run_call({"bodySource": {"generator": "tests.test_bodies:chunks", "args": {"count": 3}},
+                                           "headers": {"Content-Type": "text/plain"}})
+        self.assertEqual(uploaded, b'chunk-0;chunk-1;chunk-2;')
+        self.assertEqual(request.headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(request.headers['Content-Type'], 'text/plain')
+        _, uploaded = self.run_call({"bodySource": {"file": self.upload_path, "chunked": True, "chunkSize": 4096}})
+        self.assertEqual(len(uploaded), 10000)
+
+    def test_multipart_stream_knows_its_length_without_reading(self):
+        stream = MultipartStream([{"name": "note", "value": "hello"}, {"name": "upload", "file": self.upload_path}],
+                                 boundary='b0undary')
+        body = stream.read(100) + stream.read()
+        self.assertEqual(len(stream), len(body))
+        self.assertIn(b'filename="upload.bin"', body)
+        self.assertTrue(body.endswith(b'--b0undary--\r\n'))
+        stream.seek(0)
+        self.assertEqual(stream.read(), body)
+        request, uploaded = self.run_call({"bodySource": {"multipart": [{"name": "upload", "file": "upload.bin"}]}})
+        self.assertTrue(request.headers['Content-Type'].startswith('multipart/form-data; boundary='))
+        self.assertEqual(request.headers['Content-Length'], str(len(uploaded)))
+        self.assertEqual(open_body_source({"bytes": "aGk=", "encoding": "base64"}).data, b'hi')
+        self.assertRaises(InValidCallAttributeError, open_body_source, {"path": "x"})
+
+    def test_download_mode_streams_to_disk_and_asserts_on_size_hash_and_headers(self):
+        content = os.urandom(200000)
+        download_path = os.path.join(self.temp_dir.name, 'download.bin')
+        adapter = RecordingAdapter(content, {'Content-Type': 'application/zip'})
+        call = {"method": "GET", "responseMode": "download", "downloadPath": download_path,
+                "saves": {"file_path": "$.__path"},
+                "assertions": {"sizeCheck": f"$.__size=={len(content)}",
+                               "hashCheck": f"$.__sha256=={hashlib.sha256(content).hexdigest()}",
+                               "typeCheck": "$.__headers.Content-Type==application/zip"}}
+        self.run_call(call, adapter)
+        with open(download_path, 'rb') as read_file:
+            self.assertEqual(read_file.read(), content)
+        self.assertRaises(InValidCallAttributeError, APITests,
+                          self.build_upload({"body": {"a": 1}, "bodySource": {"bytes": "a"}}))
+
+    def test_download_header_assertions_ignore_case_and_fail_when_missing(self):
+        adapter = RecordingAdapter(b'PK', {'content-type': 'application/zip'})
+        call = {"method": "GET", "responseMode": "download",
+                "assertions": {"typeCheck": "$.__headers.Content-Type==application/zip"}}
+        self.run_call(call, adapter)
+        call["assertions"] = {"etagCheck": "$.__headers.ETag==abc"}
+        with self.assertRaises(FailedAssertion) as raised:
+            self.run_call(call, adapter)
+        self.assertIn('etagCheck', str(raised.exception))
+
+    def test_temporary_download_is_removed_after_assertions(self):
+        content = b'x' * 1000
+        call = {"method": "GET", "responseMode": "download", "saves": {"file_path": "$.__path"},
+                "assertions": {"sizeCheck": f"$.__size=={len(content)}"}}
+        int_test = APITests(self.build_upload(call), adapter=RecordingAdapter(content))
+        with mock.patch('src.dolpa.dolpa.remove_file', wraps=os.remove) as removed:
+            int_test.run_all()
+        int_test.close()
+        path = int_test.run_config['file_path']
+        removed.assert_called_once_with(path)
+        self.assertTrue(os.path.basename(path).startswith('dolpa-download-'))
+        self.assertFalse(os.path.exists(path))
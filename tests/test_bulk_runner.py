@@ -0,0 +1,63 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import run_bulk_api_tests, discover_test_files
+from src.dolpa.exceptions import FailedAssertion, InValidCallAttributeError
+
+
+class TestBulkRunner(unittest.TestCase):
+    class MockedResponse:
+        status_code = 200
+
+        def __init__(self, mocked_json):
+            self.mocked_json = mocked_json
+
+        def json(self):
+            return self.mocked_json
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'nested'))
+        for index, name in enumerate(['a.json', 'b.json', 'nested/c.json', 'nested/d.json', 'notes.txt']):
+            self._write(name, f'/file-{index}', 'ok')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def _write(self, name, resource, expected, extra_call_keys=None):
+        call = {"resource": resource, "method": "GET", "headers": {}, "saves": {"seen": "$.status"},
+                "assertions": {"statusCheck": f"$.status=={expected}"}}
+        call.update(extra_call_keys or {})
+        with open(os.path.join(self.root, name), 'w') as write_file:
+            json.dump({"config": {"base_url": "http://localhost:8000"}, "calls": [call]}, write_file)
+
+    def _mocked_get(self, session, endpoint, **kwargs):
+        return self.MockedResponse({"status": "broken" if endpoint.endswith('/file-1') else "ok"})
+
+    def test_discover_test_files_is_sorted_and_recursive(self):
+        found = [os.path.relpath(path, self.root) for path in discover_test_files(self.root)]
+        self.assertEqual(found, ['a.json', 'b.json', 'nested/c.json', 'nested/d.json'])
+
+    def test_parallel_run_continues_on_failure_with_ordered_summary(self):
+        with mock.patch.dict('src.dolpa.dolpa.APITests.call_method_to_req_method_mapping', {'GET': self._mocked_get}):
+            summary = run_bulk_api_tests(self.root, workers=3, fail_fast=False)
+        self.assertEqual([os.path.basename(result.path) for result in summary], ['a.json', 'b.json', 'c.json', 'd.json'])
+        self.assertEqual([os.path.basename(result.path) for result in summary.failed], ['b.json'])
+        self.assertIsInstance(summary.failed[0].error, FailedAssertion)
+
+    def test_parallel_run_fail_fast_raises_first_failure(self):
+        with mock.patch.dict('src.dolpa.dolpa.APITests.call_method_to_req_method_mapping', {'GET': self._mocked_get}):
+            self.assertRaises(FailedAssertion, run_bulk_api_tests, self.root, workers=3)
+
+    def test_process_pool_reports_load_errors(self):
+        self._write('a.json', '/file-0', 'ok', {"unknownKey": True})
+        self._write('b.json', '/file-1', 'ok', {"unknownKey": True})
+        for name in ['nested/c.json', 'nested/d.json']:
+            os.remove(os.path.join(self.root, name))
+        summary = run_bulk_api_tests(self.root, workers=2, executor='process', fail_fast=False)
+        self.assertEqual(len(summary.failed), 2)
+        self.assertIsInstance(summary.failed[0].error, InValidCallAttributeError)
@@ -0,0 +1,127 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+
+import requests
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from src.dolpa.dolpa import APITests, run_bulk_api_tests
+from src.dolpa.cassette import Cassette, CassetteIndex, digest_key, write_index
+from src.dolpa.exceptions import CassetteMissError, InvalidCassetteError
+from tests.helpers import build_call, build_runner_dict
+
+
+class EchoAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def send(self, request, stream=False, **kwargs):
+        self.sent += 1
+        response = Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response.raw = io.BytesIO(json.dumps({'url': request.url, 'sent': self.sent}).encode('utf-8'))
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'suite.cassette')
+        self.runner_dict = build_runner_dict(
+            build_call(1, '/login', 'POST', body={"user": "ann", "role": "qa"}, saves={"sent": "$.sent"}),
+            build_call(2, '/users?sent={{sent}}', assertions={"urlCheck": "$.url==http://localhost:8000/users?sent=1"}),
+        )
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def record(self, urls, **rules):
+        upstream = EchoAdapter()
+        with Cassette(self.path, mode='record', adapter=upstream, **rules) as cassette:
+            session = requests.Session()
+            session.mount('http://', cassette)
+            for url in urls:
+                session.get(url)
+        return upstream
+
+    def test_suite_replays_offline_after_recording(self):
+        upstream = EchoAdapter()
+        with Cassette(self.path, mode='record', adapter=upstream) as cassette:
+            APITests(self.runner_dict, adapter=cassette).run_all()
+        self.assertEqual(upstream.sent, 2)
+        offline = EchoAdapter()
+        with Cassette(self.path, adapter=offline) as cassette:
+            int_test = APITests(self.runner_dict, adapter=cassette)
+            int_test.run_all()
+        self.assertEqual(offline.sent, 0)
+        self.assertEqual(int_test.run_config['sent'], 1)
+
+    def test_repeated_requests_replay_in_recorded_order(self):
+        self.record(['http://localhost/poll', 'http://localhost/poll'])
+        session = requests.Session()
+        with Cassette(self.path) as cassette:
+            session.mount('http://', cassette)
+            sent = [session.get('http://localhost/poll').json()['sent'] for _ in range(2)]
+            self.assertRaises(CassetteMissError, session.get, 'http://localhost/poll')
+        self.assertEqual(sent, [1, 2])
+        with Cassette(self.path, repeat_last=True) as cassette:
+            session.mount('http://', cassette)
+            sent = [session.get('http://localhost/poll').json()['sent'] for _ in range(3)]
+        self.assertEqual(sent, [1, 2, 2])
+
+    def test_closing_the_session_saves_a_recording(self):
+        session = requests.Session()
+        session.mount('http://', Cassette(self.path, mode='record', adapter=EchoAdapter()))
+        session.get('http://localhost/a')
+        session.close()
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+        session = requests.Session()
+        with Cassette(self.path) as cassette:
+            session.mount('http://', cassette)
+            self.assertEqual(session.get('http://localhost/a').json()['sent'], 1)
+        os.remove(self.path + '.idx')
+        with Cassette(self.path) as cassette:
+            session.mount('http://', cassette)
+            self.assertRaises(InvalidCassetteError, session.get, 'http://localhost/a')
+
+    def test_misses_are_strict_or_passed_through(self):
+        self.record(['http://localhost/a?ts=1'], ignore_query=['ts'])
+        session = requests.Session()
+        with Cassette(self.path) as cassette:
+            session.mount('http://', cassette)
+            self.assertRaises(CassetteMissError, session.get, 'http://localhost/c')
+        upstream = EchoAdapter()
+        with Cassette(self.path, on_miss='passthrough', adapter=upstream) as cassette:
+            session.mount('http://', cassette)
+            session.get('http://localhost/b')
+        self.assertEqual(upstream.sent, 1)
+        with Cassette(self.path, ignore_query=['ts']) as cassette:
+            session.mount('http://', cassette)
+            self.assertEqual(session.get('http://localhost/a?ts=2').json()['sent'], 1)
+
+    def test_index_lookups_cover_large_cassettes(self):
+        entries = {digest_key(f'key-{number}', 0): number * 10 for number in range(100000)}
+        write_index(self.path + '.idx', entries)
+        index = CassetteIndex(self.path + '.idx')
+        self.assertEqual((len(index), index.capacity), (100000, 262144))
+        self.assertEqual(index.get(digest_key('key-76543', 0)), 765430)
+        self.assertIsNone(index.get(digest_key('key-76543', 1)))
+        index.close()
+        urls = [f'http://localhost/items/{number}' for number in range(200)]
+        self.record(urls)
+        session = requests.Session()
+        with Cassette(self.path) as cassette:
+            session.mount('http://', cassette)
+            self.assertEqual(session.get(urls[123]).json()['sent'], 124)
+        self.assertRaises(ValueError, run_bulk_api_tests, self.temp_dir.name, adapter=Cassette(self.path),
+                          workers=2, executor='process')
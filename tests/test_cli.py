@@ -0,0 +1,94 @@
+import io
+import os
+import sys
+import logging
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+
+from src.dolpa.cli import main
+from src.dolpa.watch import SuiteWatcher
+from src.dolpa.dolpa import APITests
+from src.dolpa.dolpa_logger import LOGGER_NAME
+from tests.helpers import build_call, build_runner_dict, build_response, write_runner_dict
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.write_suite_file('a.json')
+        self.write_suite_file('b.json', '/b')
+        logger = logging.getLogger(LOGGER_NAME)
+        self.saved_state = (list(logger.handlers), logger.propagate, logger.level)
+        self.get = mock.Mock(side_effect=self.respond)
+        patcher = mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': self.get})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.handlers, logger.propagate, level = self.saved_state
+        logger.setLevel(level)
+        self.temp_dir.cleanup()
+
+    def write_suite_file(self, name, resource='/a'):
+        write_runner_dict(os.path.join(self.root, name), build_runner_dict(
+            build_call(resource=resource, saves={"name": "$.name"}, assertions={"nameCheck": "$.name==ann"})))
+
+    @staticmethod
+    def respond(session, url, **kwargs):
+        found = url.endswith('/a')
+        return build_response({'name': 'ann' if found else 'bob'}, status_code=200 if found else 404)
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        return main(list(argv), out), out.getvalue()
+
+    def test_run_reports_failures_and_exit_code(self):
+        code, output = self.run_cli('run', self.root, '--workers', '2', '--var', 'region=eu')
+        self.assertEqual(code, 1)
+        self.assertIn('FAILED ' + os.path.join(self.root, 'b.json'), output)
+        self.assertIn('1 passed, 1 failed, 0 skipped, 0 cached', output)
+        code, output = self.run_cli('run', os.path.join(self.root, 'a.json'))
+        self.assertEqual(code, 0)
+
+    def test_run_passes_options_to_a_single_file(self):
+        self.write_suite_file('c.json', '/{{region}}/a')
+        code, output = self.run_cli('run', os.path.join(self.root, 'c.json'), '--var', 'region=eu', '--timeout', '3')
+        self.assertEqual(code, 0)
+        self.assertEqual(self.get.call_args[0][1], 'http://localhost:8000/eu/a')
+        self.assertEqual(self.get.call_args[1]['timeout'], 3.0)
+        code, output = self.run_cli('run', os.path.join(self.root, 'c.json'), '--index',
+                                    os.path.join(self.root, 'suite.idx'))
+        self.assertEqual(code, 2)
+        self.assertIn('--index needs a folder', output)
+
+    def test_call_prints_status_and_saved_values(self):
+        code, output = self.run_cli('call', os.path.join(self.root, 'a.json'), '1', '--assert')
+        self.assertEqual(code, 0)
+        self.assertIn("GET /a -> 200\n  name = 'ann'", output)
+
+    def test_watcher_reruns_only_changed_files(self):
+        watcher = SuiteWatcher(self.root)
+        try:
+            self.assertEqual(len(watcher.poll()), 2)
+            self.assertIsNone(watcher.poll())
+            self.write_suite_file('b.json', '/b/../a')
+            summary = watcher.poll()
+            self.assertEqual([result.path for result in summary], [os.path.join(self.root, 'b.json')])
+            self.assertTrue(watcher.suite_summary.ok)
+            os.remove(os.path.join(self.root, 'a.json'))
+            self.assertIsNone(watcher.poll())
+            self.assertEqual(len(watcher.suite_summary), 1)
+        finally:
+            watcher.close()
+        self.assertEqual(self.get.call_count, 3)
+
+    def test_cli_imports_lazily(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, '-c', 'import sys, src.dolpa.cli; '
+                                                                'print("requests" in sys.modules)'], cwd=root)
+        self.assertEqual(output.strip(), b'False')
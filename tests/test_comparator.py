@@ -0,0 +1,108 @@
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.comparator import Comparator, compile_assertion, tokenize_assertion, build_assertion_plan
+from src.dolpa.exceptions import FailedAssertion, NotAllowedComparison
+
+
+class TestComparator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.response = {
+            'responseSent': 'yes',
+            'isEmployed': True,
+            'manager': None,
+            'code': '007',
+            'department': {'floor': 3, 'rating': 4.5, 'employees': ['Ram', 'Sam', 'Tammy']}
+        }
+        self.run_config = {'expected_floor': 3, 'friend': 'Tammy', 'floor_text': '3'}
+
+    def _passes(self, assertion):
+        try:
+            Comparator('check', assertion, self.run_config, self.response).execute()
+        except FailedAssertion:
+            return False
+        return True
+
+    def test_tokenizer_prefers_two_character_operators(self):
+        self.assertEqual(tokenize_assertion('$.a<=3'), ('$.a', '<=', '3'))
+        self.assertEqual(tokenize_assertion('$.a < 3'), ('$.a', '<', '3'))
+        self.assertEqual(tokenize_assertion("$.a=='x<=y'"), ('$.a', '==', "'x<=y'"))
+        self.assertRaises(NotAllowedComparison, tokenize_assertion, '$.a=3')
+
+    def test_typed_comparisons(self):
+        self.assertTrue(self._passes('$.department.floor>=3'))
+        self.assertTrue(self._passes('$.department.floor<10'))
+        self.assertTrue(self._passes('$.department.rating>4.25'))
+        self.assertTrue(self._passes('$.isEmployed==true'))
+        self.assertTrue(self._passes('$.manager==null'))
+        self.assertTrue(self._passes('$.code==007'))
+        self.assertTrue(self._passes('$.code=="007"'))
+        self.assertFalse(self._passes('$.department.floor=="3"'))
+        self.assertFalse(self._passes('$.department.floor>yes'))
+
+    def test_interpolated_values_are_typed(self):
+        self.assertTrue(self._passes('$.department.floor=={{expected_floor}}'))
+        self.assertTrue(self._passes('$.department.floor=={{floor_text}}'))
+        self.assertTrue(self._passes('$.department.employees[2]=={{friend}}'))
+        self.assertTrue(self._passes('responseSent==yes'))
+
+    def test_assertions_are_compiled_once(self):
+        self.assertIs(compile_assertion('$.department.floor>=3'), compile_assertion('$.department.floor>=3'))
+
+    def test_invalid_assertions_fail_at_load_time(self):
+        runner_dict = {"config": {"base_url": "http://localhost:8000"}, "calls": [
+            {"identifier": 1, "resource": "/a", "method": "GET", "headers": {}, "saves": {},
+             "assertions": {"broken": "$.floor=3"}}
+        ]}
+        self.assertRaises(NotAllowedComparison, APITests, runner_dict)
+
+
+class TestBulkAssertions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.response = {'items': [{'id': index, 'price': 10 if index % 1000 else -1, 'tags': ['a']}
+                                   for index in range(10000)]}
+
+    def _evaluate(self, assertions, limit=3):
+        compiled = {name: compile_assertion(assertion) for name, assertion in assertions.items()}
+        return build_assertion_plan(compiled).evaluate(self.response, {'minimum': 0}, limit)
+
+    def test_quantifiers_report_offending_indices_with_a_cap(self):
+        results = self._evaluate({'allPositive': 'all($.items[*].price) > {{minimum}}',
+                                  'anyNegative': 'any($.items[*].price) < 0',
+                                  'noneFree': 'none($.items[*].price) == 0',
+                                  'count': 'count($.items[*]) == 10000',
+                                  'countNegative': 'count($.items[?(@.price < 0)]) == 10',
+                                  'allTagged': 'all($.items[*].tags[0]) == a'})
+        self.assertEqual({name: passed for name, (passed, _) in results.items()},
+                         {'allPositive': False, 'anyNegative': True, 'noneFree': True, 'count': True,
+                          'countNegative': True, 'allTagged': True})
+        self.assertEqual(results['allPositive'][1], '10 of 10000 values did not match: $.items[0].price: -1; '
+                                                    '$.items[1000].price: -1; $.items[2000].price: -1 (and 7 more)')
+        self.assertFalse(self._evaluate({'missing': 'all($.orders[*].price) > 0'})['missing'][0])
+
+    def test_plan_walks_shared_prefixes_once(self):
+        plan = build_assertion_plan({name: compile_assertion(assertion) for name, assertion in {
+            'prices': 'all($.items[*].price) > 0', 'ids': 'all($.items[*].id) >= 0', 'floor': '$.floor==3'}.items()})
+        self.assertEqual(list(plan.assertions), ['prices', 'ids'])
+        self.assertEqual(len(plan.root.children), 1)
+        (_, items), = plan.root.children.values()
+        (_, every_item), = items.children.values()
+        self.assertEqual(len(every_item.children), 2)
+
+    def test_schema_and_quantifier_failures_fail_the_call(self):
+        runner_dict = {"config": {"base_url": "http://localhost:8000", "maxReportedIndices": 2}, "calls": [
+            {"identifier": 1, "resource": "/a", "method": "GET", "headers": {}, "saves": {}, "assertions": {
+                "shape": {"path": "$.items", "schema": {"type": "array", "items": {
+                    "type": "object", "required": ["id", "price"], "properties": {"price": {"minimum": 0}}}}},
+                "prices": "all($.items[*].price) > 0"}}]}
+        int_test = APITests(runner_dict, session=mock.Mock())
+        call = int_test.endpoint_calls[0]
+        with self.assertRaises(FailedAssertion) as raised:
+            int_test._assert_response(call, self.response)
+        self.assertIn('10 schema violations: $.items[0].price: -1 is less than 0; $.items[1000].price: -1 is less '
+                      'than 0 (and 8 more)', str(raised.exception))
+        self.assertIs(compile_assertion(runner_dict['calls'][0]['assertions']['shape']),
+                      call.compiled_assertions['shape'])
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.dataset import DatasetSettings, iter_dataset, iter_batches
+from src.dolpa.exceptions import DatasetRowsFailedError, InValidCallAttributeError
+from tests.helpers import build_call, build_runner_dict, build_response
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, 'users.csv')
+        with open(self.csv_path, 'w') as write_file:
+            write_file.write('user_id,name\n1,ann\n2,bob\n3,cid\n')
+        self.jsonl_path = os.path.join(self.temp_dir.name, 'users.jsonl')
+        with open(self.jsonl_path, 'w') as write_file:
+            write_file.write('{"user_id": 1, "name": "ann"}\n\n{"user_id": 2, "name": "bob"}\n')
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_rows_are_streamed_in_batches(self):
+        rows = iter_dataset(DatasetSettings(self.csv_path))
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual([[row['name'] for row in batch] for batch in iter_batches(rows, 2)], [['ann', 'bob'], ['cid']])
+        self.assertEqual([row['user_id'] for row in iter_dataset(DatasetSettings(self.jsonl_path))], [1, 2])
+        self.assertEqual(len(list(iter_dataset(DatasetSettings.from_config({'path': self.csv_path, 'limit': 2})))), 2)
+
+    def test_call_dataset_binds_rows_and_reports_failures_per_row(self):
+        runner_dict = build_runner_dict(build_call(
+            1, '/users/{{user_id}}', assertions={"nameCheck": "$.name==ann"},
+            dataset={"path": "users.csv", "batchSize": 2, "concurrency": 2}))
+        names = {'http://localhost:8000/users/1': 'ann', 'http://localhost:8000/users/2': 'bob',
+                 'http://localhost:8000/users/3': 'ann'}
+        get = mock.Mock(side_effect=lambda session, url, **kwargs: build_response({'name': names[url]}))
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            int_test = APITests(runner_dict, session=mock.Mock(),
+                                source_path=os.path.join(self.temp_dir.name, 'test.json'))
+            with self.assertRaises(DatasetRowsFailedError) as raised:
+                int_test.run_all()
+        self.assertEqual(get.call_count, 3)
+        report = raised.exception.report
+        self.assertEqual((report.rows, report.passed, report.failed), (3, 2, 1))
+        self.assertEqual((report.failures[0].row_number, report.failures[0].row['name']), (2, 'bob'))
+        self.assertNotIn('user_id', int_test.run_config)
+
+    def test_file_dataset_runs_every_call_per_row(self):
+        runner_dict = build_runner_dict(
+            build_call(1, '/login/{{user.name}}', saves={"token": "$.token"}),
+            build_call(2, '/users/{{user.user_id}}?token={{token}}'),
+            config={"dataset": {"path": self.jsonl_path, "as": "user"}})
+        get = mock.Mock(side_effect=lambda session, url, **kwargs: build_response({'token': url[-3:]}))
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            int_test = APITests(runner_dict, session=mock.Mock())
+            int_test.run_all()
+        self.assertEqual([call.args[1] for call in get.call_args_list], [
+            'http://localhost:8000/login/ann', 'http://localhost:8000/users/1?token=ann',
+            'http://localhost:8000/login/bob', 'http://localhost:8000/users/2?token=bob'])
+        self.assertEqual(int_test.dataset_reports['file'].rows, 2)
+
+    def test_file_dataset_honours_max_concurrent_calls_and_rejects_call_datasets(self):
+        runner_dict = build_runner_dict(build_call(1, '/a/{{user_id}}'), build_call(2, '/b/{{user_id}}'),
+                                        config={"dataset": self.jsonl_path, "maxConcurrentCalls": 2})
+        get = mock.Mock(side_effect=lambda session, url, **kwargs: build_response({}))
+        with mock.patch('src.dolpa.dolpa.CallScheduler') as scheduler, \
+                mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            APITests(runner_dict, session=mock.Mock()).run_all()
+        self.assertEqual(scheduler.call_count, 2)
+        self.assertEqual(scheduler.call_args[0][1], 2)
+        runner_dict['calls'][0]['dataset'] = self.csv_path
+        self.assertRaises(InValidCallAttributeError, APITests, runner_dict, session=mock.Mock())
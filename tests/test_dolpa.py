@@ -5,6 +5,7 @@ from unittest import mock
 
 from src.dolpa.dolpa import run_bulk_api_tests, APITests
 from src.dolpa.exceptions import FailedAssertion
+from src.dolpa.scope import refresh_environment
 
 
 class DolpaTest(unittest.TestCase):
@@ -22,6 +23,7 @@ class DolpaTest(unittest.TestCase):
         os.environ['dolpa_password'] = 'strong_password'
         os.environ['dolpa_extra_username'] = 'extra_user'
         os.environ['dolpa_extra_password'] = 'strongest_password'
+        refresh_environment()
         self.mocked_responses_list = [
             {
                 "auth_token": "xxxxxxxxxxxx",
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.load import LoadRunner, LoadResponse
+from src.dolpa.dolpa_auth import TokenAuth
+from src.dolpa.histogram import LatencyHistogram
+
+
+class FakeTransport:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.headers = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def request(self, method, url, json=None, headers=None, auth=None):
+        self.sent.append((method, url))
+        self.headers.append(headers)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if url.endswith('/missing'):
+            return LoadResponse(404, b'')
+        return LoadResponse(200, b'{"token": "abc", "status": "ok"}')
+
+
+class TestLoad(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.runner_dict = {
+            "config": {"base_url": "http://localhost:8000"},
+            "calls": [
+                {"identifier": 1, "resource": "/login", "method": "POST", "body": {}, "headers": {},
+                 "saves": {"token": "$.token"}, "assertions": {"statusCheck": "$.status==ok"}},
+                {"identifier": 2, "resource": "/items/{{token}}", "method": "GET", "headers": {},
+                 "saves": {}, "assertions": {}},
+                {"identifier": 3, "resource": "/missing", "method": "GET", "headers": {},
+                 "saves": {}, "assertions": {}},
+            ]
+        }
+
+    def test_histogram_percentiles_and_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for millis in range(1, 501):
+            first.record(millis / 1000)
+        for millis in range(501, 1001):
+            second.record(millis / 1000)
+        merged = first.merge(second)
+        self.assertEqual(merged.count, 1000)
+        self.assertAlmostEqual(merged.percentile(50), 0.5, delta=0.01)
+        self.assertAlmostEqual(merged.percentile(99), 0.99, delta=0.02)
+        self.assertEqual(merged.max, 1.0)
+        self.assertLess(len(merged.counts), 600)
+
+    def test_iterations_replay_whole_file(self):
+        transport = FakeTransport(delay=0.001)
+        api_tests = APITests(self.runner_dict)
+        report = LoadRunner(api_tests, virtual_users=5, iterations=20, transport=transport,
+                            run_assertions=True).run()
+        stats = report.to_dict()
+        self.assertEqual(stats[1]['requests'], 20)
+        self.assertEqual(stats[2]['requests'], 20)
+        self.assertEqual(stats[3]['errorRate'], 1.0)
+        self.assertEqual(transport.max_in_flight, 5)
+        self.assertIn(('GET', 'http://localhost:8000/items/abc'), transport.sent)
+        self.assertNotIn('token', api_tests.run_config)
+
+    def test_single_call_at_target_rate(self):
+        self.runner_dict['config']['token'] = 'seeded'
+        transport = FakeTransport()
+        report = LoadRunner(APITests(self.runner_dict), call_identifier=2, virtual_users=3, rate=200,
+                            duration=0.1, transport=transport).run()
+        self.assertEqual(list(report.stats), [2])
+        self.assertLessEqual(report.stats[2].requests, 25)
+        self.assertGreater(report.stats[2].requests, 5)
+
+    def test_token_refresh_runs_off_the_event_loop(self):
+        auth = TokenAuth(token_url='http://localhost:8000/token', client_id='id', client_secret='secret')
+        fetched_on = []
+
+        def fetch_token():
+            fetched_on.append(threading.current_thread())
+            auth._token = 'fresh'
+
+        api_tests = APITests(self.runner_dict)
+        transport = FakeTransport()
+        with mock.patch.object(auth, '_fetch_token', side_effect=fetch_token), \
+                mock.patch.object(api_tests, '_get_auth', return_value=auth):
+            LoadRunner(api_tests, call_identifier=1, virtual_users=2, iterations=4, transport=transport).run()
+        self.assertEqual(len(fetched_on), 1)
+        self.assertIsNot(fetched_on[0], threading.main_thread())
+        self.assertEqual({headers['Authorization'] for headers in transport.headers}, {'Bearer fresh'})
@@ -0,0 +1,46 @@
+import io
+import os
+import json
+import logging
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa_logger import CustomFormatter, configure_logging, flush_logging, get_logger, LOGGER_NAME
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.saved_state = (list(self.logger.handlers), self.logger.propagate, self.logger.level)
+
+    def tearDown(self) -> None:
+        configure_logging(level='DEBUG', structured=False, queued=False)
+        handlers, self.logger.propagate, level = self.saved_state
+        self.logger.handlers = handlers
+        self.logger.setLevel(level)
+
+    def test_formatters_are_cached_per_level(self):
+        formatter = CustomFormatter()
+        record = logging.makeLogRecord({'levelno': logging.INFO, 'levelname': 'INFO', 'msg': 'hello %s',
+                                        'args': ('world',)})
+        cached = formatter.formatters[logging.INFO]
+        self.assertIn('hello world', formatter.format(record))
+        self.assertIs(formatter.formatters[logging.INFO], cached)
+
+    def test_structured_queued_output(self):
+        stream = io.StringIO()
+        logger = configure_logging(level='INFO', structured=True, queued=True, stream=stream)
+        logger.debug('filtered %s', 'out')
+        logger.info('%s responded with status code: %s', '/a', 200, extra={'identifier': 3})
+        flush_logging()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['message'], '/a responded with status code: 200')
+        self.assertEqual((lines[0]['level'], lines[0]['identifier']), ('INFO', 3))
+
+    def test_level_from_environment(self):
+        self.logger.setLevel(logging.NOTSET)
+        with mock.patch.dict(os.environ, {'DOLPA_LOG_LEVEL': 'warning'}):
+            self.assertEqual(get_logger().level, logging.WARNING)
+        self.assertRaises(ValueError, configure_logging, level='chatty')
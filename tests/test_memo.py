@@ -0,0 +1,70 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.memo import MemoStore, memo_key
+from tests.helpers import build_call, build_runner_dict, build_response
+
+
+class TestMemoStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.runner_dict = build_runner_dict(
+            build_call(1, '/login', 'POST', body={"user": "alex"}, saves={"authToken": "$.token"}, memoize={"ttl": 60}),
+            build_call(2, '/users', body={"token": "{{authToken}}"}),
+        )
+
+    def test_memoized_login_is_shared_across_files(self):
+        login = mock.Mock(return_value=build_response({'token': 'abc'}))
+        users = mock.Mock(return_value=build_response())
+        memo_store = MemoStore()
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'POST': login, 'GET': users}):
+            for _ in range(3):
+                APITests(self.runner_dict, session=mock.Mock(), memo_store=memo_store).run_all()
+        self.assertEqual(login.call_count, 1)
+        self.assertEqual(users.call_count, 3)
+        self.assertEqual([call.kwargs['json']['token'] for call in users.call_args_list], ['abc'] * 3)
+        self.assertEqual((memo_store.hits, memo_store.misses), (2, 1))
+
+    def test_unauthorized_response_invalidates_memoized_calls(self):
+        login = mock.Mock(return_value=build_response({'token': 'abc'}))
+        users = mock.Mock(return_value=build_response(status_code=401))
+        memo_store = MemoStore()
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'POST': login, 'GET': users}):
+            for _ in range(2):
+                APITests(self.runner_dict, session=mock.Mock(), memo_store=memo_store).run_all()
+        self.assertEqual(login.call_count, 2)
+        self.assertEqual(len(memo_store), 0)
+
+    def test_single_request_in_flight_per_key(self):
+        memo_store = MemoStore()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'authToken': 'abc'}, 200
+
+        threads = [threading.Thread(target=memo_store.get_or_compute, args=('login', compute)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(memo_store.hits, 7)
+
+    def test_entries_with_ttl_persist_across_runs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'memo.json')
+            key = memo_key('POST', 'http://localhost/login', {'user': 'alex'}, {}, ('alex', 'secret'))
+            MemoStore(path).get_or_compute(key, lambda: ({'authToken': 'abc'}, 200), ttl=60)
+            MemoStore(path).get_or_compute('expired', lambda: ({'authToken': 'old'}, 200), ttl=-1)
+            reloaded = MemoStore(path)
+            self.assertEqual(len(reloaded), 1)
+            entry, hit = reloaded.get_or_compute(key, lambda: self.fail('login should be memoized'))
+            self.assertTrue(hit)
+            self.assertEqual(entry.saved, {'authToken': 'abc'})
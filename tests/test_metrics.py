@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests, run_bulk_api_tests
+from src.dolpa.dolpa_session import _CONNECTION_TIMINGS
+from src.dolpa.metrics import CallTimings, MetricsAggregator, JsonReportWriter, PrometheusExporter, PHASES
+
+
+def timings_of(total):
+    timings = CallTimings()
+    timings.server = total / 2
+    timings.total = total
+    return timings
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_aggregates_per_call_and_per_file(self):
+        aggregator = MetricsAggregator()
+        aggregator.on_call('a.json', 1, timings_of(0.1), 200, True)
+        aggregator.on_call('a.json', 1, timings_of(0.3), 500, False)
+        aggregator.on_call('a.json', 2, timings_of(0.2), 200, True)
+        report = aggregator.report()
+        self.assertEqual(report['files']['a.json']['count'], 3)
+        self.assertEqual(report['files']['a.json']['failures'], 1)
+        first_call = next(call for call in report['calls'] if call['identifier'] == 1)
+        self.assertEqual(first_call['count'], 2)
+        self.assertAlmostEqual(first_call['phases']['total']['max'], 0.3, places=2)
+        self.assertEqual(set(first_call['phases']), set(PHASES))
+
+    def test_json_report_and_prometheus_output(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = JsonReportWriter(os.path.join(temp_dir, 'report.json'))
+            writer.on_call('a.json', 1, timings_of(0.1))
+            writer.close()
+            with open(writer.path) as read_file:
+                self.assertEqual(json.load(read_file)['calls'][0]['count'], 1)
+        exporter = PrometheusExporter()
+        exporter.on_call('dir/"a".json', 1, timings_of(0.1), 200, False)
+        rendered = exporter.render()
+        self.assertIn('# TYPE dolpa_call_phase_seconds summary', rendered)
+        self.assertIn('dolpa_call_phase_seconds_count{file="dir/\\"a\\".json",identifier="1",phase="total"} 1',
+                      rendered)
+        self.assertIn('dolpa_call_failures_total{file="dir/\\"a\\".json",identifier="1"} 1', rendered)
+
+    def test_api_tests_reports_call_timings(self):
+        runner_dict = {"config": {"base_url": "http://localhost:8000"},
+                       "calls": [{"identifier": 1, "resource": "/a", "method": "GET", "headers": {},
+                                  "saves": {}, "assertions": {"tokenCheck": "$.token==abc"}}]}
+        response = mock.Mock(status_code=200, content=b'{"token": "abc"}', elapsed=datetime.timedelta(seconds=0))
+        response.json.return_value = {'token': 'abc'}
+        aggregator = MetricsAggregator()
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            APITests(runner_dict, session=mock.Mock(), metrics=aggregator, source_path='a.json').run_all()
+            untimed = APITests(runner_dict, session=mock.Mock())
+            untimed.run_all()
+        stats = aggregator.calls[('a.json', 1)]
+        self.assertEqual(stats['count'], 1)
+        self.assertGreater(stats['phases']['total'].max, 0)
+        self.assertIsNone(untimed.endpoint_calls[0].timings)
+
+    def test_report_is_written_when_the_caller_closes_the_hook(self):
+        response = mock.Mock(status_code=200, content=b'{}', elapsed=datetime.timedelta(seconds=0))
+        response.json.return_value = {}
+        runner_dict = {"config": {"base_url": "http://localhost:8000"},
+                       "calls": [{"identifier": 1, "resource": "/a", "method": "GET", "headers": {},
+                                  "saves": {}, "assertions": {}}]}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'a.json'), 'w') as write_file:
+                json.dump(runner_dict, write_file)
+            report_path = os.path.join(temp_dir, 'report.out')
+            with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+                with JsonReportWriter(report_path) as metrics:
+                    run_bulk_api_tests(temp_dir, metrics=metrics)
+                    self.assertFalse(os.path.exists(report_path))
+            with open(report_path) as read_file:
+                self.assertEqual(json.load(read_file)['calls'][0]['count'], 1)
+
+    def test_hedged_request_keeps_connection_timings(self):
+        runner_dict = {"config": {"base_url": "http://localhost:8000", "hedge": {"percentile": 50, "minSamples": 1}},
+                       "calls": [{"identifier": 1, "resource": "/a", "method": "GET", "headers": {},
+                                  "saves": {}, "assertions": {}}]}
+        response = mock.Mock(status_code=200, content=b'{}', elapsed=datetime.timedelta(seconds=1))
+        response.json.return_value = {}
+
+        def get(session, endpoint, **kwargs):
+            _CONNECTION_TIMINGS.connect = 0.25
+            time.sleep(0.05)
+            return response
+
+        aggregator = MetricsAggregator()
+        int_test = APITests(runner_dict, session=mock.Mock(), metrics=aggregator, source_path='a.json')
+        int_test.resilience.latency_tracker.record(('GET', 'http://localhost:8000/a'), 0.01)
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            int_test.run_all()
+        int_test.close()
+        self.assertAlmostEqual(aggregator.calls[('a.json', 1)]['phases']['connect'].max, 0.25, places=2)
@@ -0,0 +1,107 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from src.dolpa.dolpa import APITests, run_bulk_api_tests
+from src.dolpa.resilience import RetryPolicy, HedgePolicy, LatencyTracker, Resilience, Deadline
+from src.dolpa.exceptions import CallSkippedError, DeadlineExceededError, InValidCallAttributeError
+from tests.helpers import build_call, build_runner_dict, build_response, write_runner_dict
+
+
+class TestResilience(unittest.TestCase):
+
+    def test_call_timeout_overrides_file_and_global_timeouts(self):
+        get = mock.Mock(return_value=build_response())
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            APITests(build_runner_dict(config={'timeout': 5}), session=mock.Mock(),
+                     resilience=Resilience(timeout=30)).run_all()
+            APITests(build_runner_dict(build_call(timeout={'connect': 1, 'read': 2}), config={'timeout': 5}),
+                     session=mock.Mock()).run_all()
+            APITests(build_runner_dict(), session=mock.Mock(), resilience=Resilience(timeout=30)).run_all()
+        self.assertEqual([call.kwargs['timeout'] for call in get.call_args_list], [5, (1, 2), 30])
+
+    @mock.patch('src.dolpa.dolpa.time.sleep')
+    def test_idempotent_calls_are_retried_honouring_retry_after(self, sleep):
+        responses = [build_response(status_code=503, headers={'Retry-After': '2'}), build_response()]
+        get = mock.Mock(side_effect=responses)
+        post = mock.Mock(return_value=build_response(status_code=503))
+        retries = {'retries': {'attempts': 3, 'backoff': 0.1, 'jitter': False}}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get, 'POST': post}):
+            APITests(build_runner_dict(config=retries), session=mock.Mock()).run_all()
+            APITests(build_runner_dict(build_call(method='POST'), config=retries), session=mock.Mock()).run_all()
+        self.assertEqual((get.call_count, post.call_count), (2, 1))
+        sleep.assert_called_once_with(2.0)
+        self.assertEqual(RetryPolicy(backoff=0.5, jitter=False).delay(2), 2.0)
+
+    @mock.patch('src.dolpa.dolpa.time.sleep')
+    def test_open_circuit_skips_calls_to_a_down_host(self, sleep):
+        get = mock.Mock(side_effect=requests.ConnectionError('refused'))
+        config = {'retries': 2, 'circuitBreaker': {'failureThreshold': 2, 'resetTimeout': 60}}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+            int_test = APITests(build_runner_dict(config=config), session=mock.Mock())
+            self.assertRaises(requests.ConnectionError, int_test.run_all)
+            self.assertRaises(CallSkippedError, int_test.run_all)
+        self.assertEqual(get.call_count, 2)
+        failed, skipped = int_test.response_store.records
+        self.assertFalse(failed.skipped)
+        self.assertTrue(skipped.skipped)
+        self.assertEqual(int_test.response_store.failures, [failed])
+
+    @mock.patch('src.dolpa.dolpa.time.sleep')
+    def test_file_level_circuit_breaker_is_shared_across_a_bulk_run(self, sleep):
+        get = mock.Mock(side_effect=requests.ConnectionError('refused'))
+        config = {'circuitBreaker': {'failureThreshold': 2, 'resetTimeout': 60}}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ('a.json', 'b.json', 'c.json'):
+                write_runner_dict(os.path.join(temp_dir, name), build_runner_dict(config=config))
+            with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': get}):
+                summary = run_bulk_api_tests(temp_dir, fail_fast=False)
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(len(summary.failed), 2)
+        self.assertEqual(summary.skipped[0].path, os.path.join(temp_dir, 'c.json'))
+
+    def test_retry_attempts_below_one_are_rejected(self):
+        for settings in ({'attempts': 0}, {'attempts': -2}, -1, {'attempts': '3'}):
+            self.assertRaises(InValidCallAttributeError, RetryPolicy.from_config, settings)
+        self.assertIsNone(RetryPolicy.from_config(0))
+        self.assertEqual(RetryPolicy.from_config({'attempts': 1}).attempts_for('GET'), 1)
+
+    def test_zero_deadline_is_already_expired(self):
+        self.assertTrue(Deadline(0).expired)
+        self.assertRaises(DeadlineExceededError, Deadline(0).check, 'a.json')
+
+    def test_suite_deadline_skips_remaining_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ('a.json', 'b.json'):
+                write_runner_dict(os.path.join(temp_dir, name), build_runner_dict())
+            summary = run_bulk_api_tests(temp_dir, deadline=1e-9)
+        self.assertEqual(len(summary.skipped), 2)
+        self.assertEqual(summary.failed, [])
+        self.assertIsInstance(summary.skipped[0].error, DeadlineExceededError)
+        self.assertTrue(Deadline(1e-9).expired)
+        self.assertFalse(Deadline().expired)
+
+    def test_slow_get_is_hedged(self):
+        tracker = LatencyTracker()
+        policy = HedgePolicy(percentile=50, min_samples=1)
+        tracker.record(('GET', '/a'), 0.01)
+        calls = []
+        slow, fast = mock.Mock(), mock.Mock()
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return slow
+            return fast
+
+        started = time.perf_counter()
+        self.assertIs(tracker.send(('GET', '/a'), policy, send), fast)
+        self.assertLess(time.perf_counter() - started, 0.25)
+        time.sleep(0.35)
+        slow.close.assert_called_once()
+        tracker.close()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import run_bulk_api_tests
+from src.dolpa.dolpa_results import FileResult
+from src.dolpa.result_cache import ResultCache, compute_cache_key
+from src.dolpa.exceptions import CachedFailureError
+from tests.helpers import build_call, build_runner_dict, write_runner_dict
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name + '/suite'
+        os.mkdir(self.root)
+        self.cache_path = os.path.join(self.temp_dir.name, 'results.json')
+        self.paths = [os.path.join(self.root, name) for name in ('a.json', 'b.json', 'c.json')]
+        write_runner_dict(self.paths[0], self.build_suite_file('/users', {'tags': ['smoke']}))
+        write_runner_dict(self.paths[1], self.build_suite_file('/orders'))
+        write_runner_dict(self.paths[2], self.build_suite_file('/users/1'))
+
+    def build_suite_file(self, resource='/a', config=None):
+        return build_runner_dict(build_call(resource=resource, assertions={"statusCheck": "$.status==ok"}),
+                                 config={"base_url": "{{dolpa_host}}", **(config or {})})
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def run_suite(self, failing=(), **kwargs):
+        def run_test_file(file_path, context, indexed_file=None):
+            ran.append(file_path)
+            return FileResult(file_path, error=AssertionError('boom') if file_path in failing else None)
+
+        ran = []
+        with mock.patch('src.dolpa.dolpa._run_test_file', side_effect=run_test_file):
+            summary = run_bulk_api_tests(self.root, fail_fast=False, result_cache=self.cache_path, **kwargs)
+        return ran, summary
+
+    def test_changed_mode_skips_unchanged_files_and_reports_cached_results(self):
+        ran, _ = self.run_suite(failing=[self.paths[1]])
+        self.assertEqual(ran, self.paths)
+        write_runner_dict(self.paths[2], self.build_suite_file('/users/2'))
+        ran, summary = self.run_suite(rerun='changed')
+        self.assertEqual(ran, [self.paths[2]])
+        self.assertEqual([result.path for result in summary.results], self.paths)
+        self.assertEqual([result.path for result in summary.cached], self.paths[:2])
+        self.assertIsInstance(summary.failed[0].error, CachedFailureError)
+        self.assertIn('boom', str(summary.failed[0].error))
+        self.assertIsNone(summary.first_failure())
+
+    def test_failed_mode_reruns_only_last_failures(self):
+        self.run_suite(failing=[self.paths[1]])
+        ran, summary = self.run_suite(rerun='failed')
+        self.assertEqual(ran, [self.paths[1]])
+        self.assertEqual(len(summary.passed), 3)
+        ran, _ = self.run_suite(rerun='failed')
+        self.assertEqual(ran, [])
+
+    def test_affected_mode_selects_by_tag_or_resource_prefix(self):
+        self.run_suite()
+        ran, summary = self.run_suite(rerun='affected', tags=['smoke'])
+        self.assertEqual(ran, [self.paths[0]])
+        ran, summary = self.run_suite(rerun='affected', resource_prefix='/users')
+        self.assertEqual(ran, [self.paths[0], self.paths[2]])
+        self.assertEqual(len(summary), 3)
+
+    def test_key_covers_environment_and_base_url(self):
+        runner_dict = self.build_suite_file()
+        local = compute_cache_key('digest', runner_dict, {'dolpa_host': 'http://localhost'})
+        staging = compute_cache_key('digest', runner_dict, {'dolpa_host': 'http://staging'})
+        unrelated = compute_cache_key('digest', runner_dict, {'dolpa_host': 'http://localhost', 'dolpa_other': '1'})
+        self.assertNotEqual(local, staging)
+        self.assertEqual(local, unrelated)
+        self.assertNotEqual(local, compute_cache_key('other', runner_dict, {'dolpa_host': 'http://localhost'}))
+
+    def test_unselected_file_without_cache_entry_is_skipped(self):
+        cache = ResultCache(self.cache_path)
+        result = cache.cached_result(self.paths[0])
+        self.assertTrue(result.skipped and result.cached)
+        self.assertRaises(ValueError, run_bulk_api_tests, self.root, rerun='changed')
@@ -0,0 +1,76 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.dolpa_results import ResultStore, CallRecord
+from src.dolpa.exceptions import FailedAssertion
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.temp_dir)
+
+    def test_failures_only_body_policy(self):
+        store = ResultStore(keep_bodies='failures')
+        store.add(CallRecord(1, 200), b'{"ok": true}')
+        store.add(CallRecord(2, 500, error='FailedAssertion: boom'), b'{"ok": false}')
+        self.assertEqual([record.body for record in store], [None, b'{"ok": false}'])
+
+    def test_last_n_and_size_cap(self):
+        store = ResultStore(keep_bodies='last', last_n=2, max_body_bytes=10)
+        for index in range(4):
+            store.add(CallRecord(index, 200), b'x' * 4)
+        store.add(CallRecord(4, 200), b'x' * 11)
+        self.assertEqual([record.body for record in store], [None, None, b'xxxx', b'xxxx', None])
+
+    def test_old_records_spill_to_jsonl_and_sqlite(self):
+        for name in ('records.jsonl', 'records.db'):
+            store = ResultStore(max_records=2, spill_path=os.path.join(self.temp_dir, name))
+            for index in range(5):
+                store.add(CallRecord(index, 200, 0.1, {'token': f't-{index}'}, {'statusCheck': True}))
+            self.assertEqual(len(store.records), 2)
+            self.assertEqual(len(store), 5)
+            self.assertEqual([record.saved['token'] for record in store], [f't-{index}' for index in range(5)])
+            store.close()
+            self.assertEqual([record.identifier for record in store], list(range(5)))
+            self.assertEqual(len(store), 5)
+
+    def test_files_sharing_a_spill_path_keep_separate_spills(self):
+        config = {"resultStore": {"maxRecords": 1, "spillPath": os.path.join(self.temp_dir, 'results.jsonl')}}
+        stores = [ResultStore.from_config(config, os.path.join(self.temp_dir, name)) for name in ('a.json', 'b.json')]
+        for store in stores:
+            for index in range(3):
+                store.add(CallRecord(index, 200))
+        for store in stores:
+            store.close()
+        self.assertNotEqual(stores[0]._spill.path, stores[1]._spill.path)
+        self.assertTrue(os.path.basename(stores[0]._spill.path).startswith('results.a-'))
+        self.assertEqual([[record.identifier for record in store] for store in stores], [[0, 1, 2], [0, 1, 2]])
+
+    def test_api_tests_records_compact_results(self):
+        runner_dict = {"config": {"base_url": "http://localhost:8000", "resultStore": {"keepBodies": "failures"}},
+                       "calls": [
+                           {"identifier": 1, "resource": "/a", "method": "GET", "headers": {},
+                            "saves": {"token": "$.token"}, "assertions": {"tokenCheck": "$.token==abc"}},
+                           {"identifier": 2, "resource": "/b", "method": "GET", "headers": {},
+                            "saves": {}, "assertions": {"tokenCheck": "$.token==xyz"}},
+                       ]}
+        response = mock.Mock(status_code=200, content=b'{"token": "abc"}')
+        response.json.return_value = {'token': 'abc'}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            int_test = APITests(runner_dict, session=mock.Mock())
+            self.assertRaises(FailedAssertion, int_test.run_all)
+        first, second = int_test.response_store.records
+        self.assertEqual((first.identifier, first.status_code, first.saved, first.body), (1, 200, {'token': 'abc'}, None))
+        self.assertEqual(first.assertions, {'tokenCheck': True})
+        self.assertFalse(second.passed)
+        self.assertEqual(second.body, b'{"token": "abc"}')
+        self.assertEqual(json.loads(json.dumps(second.to_dict()))['assertions'], {'tokenCheck': False})
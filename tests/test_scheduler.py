@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import threading
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.scheduler import build_call_graph, find_variables
+from src.dolpa.exceptions import UnresolvedVariableError
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        with open(os.path.join(os.path.dirname(__file__), 'test.json'), 'r') as read_file:
+            self.runner_dict = json.load(read_file)
+        self.available = set(self.runner_dict['config']) | {'dolpa_extra_username', 'dolpa_extra_password'}
+
+    def _call(self, resource, saves=None, assertions=None):
+        return {"resource": resource, "method": "GET", "headers": {}, "saves": saves or {}, "assertions": assertions or {}}
+
+    def test_find_variables_uses_variable_roots(self):
+        found = find_variables({"a": ["{{first}}", {"b": "x-{{second.inner[1]}}"}], "{{third}}": 1})
+        self.assertEqual(found, {'first', 'second', 'third'})
+
+    def test_build_call_graph_from_saves(self):
+        graph = build_call_graph(self.runner_dict['calls'], self.available)
+        self.assertEqual(graph.dependencies[0], set())
+        self.assertEqual(graph.dependencies[1], set())
+        self.assertEqual(graph.dependencies[2], {1})
+        self.assertEqual(graph.dependencies[3], {1})
+
+    def test_write_after_read_is_ordered(self):
+        calls = [self._call('/a/{{token}}'), self._call('/b', saves={'token': '$.token'})]
+        graph = build_call_graph(calls, {'base_url', 'token'})
+        self.assertEqual(graph.dependencies[1], {0})
+
+    def test_unresolved_and_forward_references_are_reported(self):
+        calls = [self._call('/a/{{token}}'), self._call('/b/{{missing}}', saves={'token': '$.token'})]
+        with self.assertRaises(UnresolvedVariableError) as context:
+            build_call_graph(calls, {'base_url'})
+        self.assertIn('token used by the call at position 0 is only saved by the later call at position 1',
+                      str(context.exception))
+        self.assertIn('missing used by the call at position 1 is never defined', str(context.exception))
+
+    def test_assertions_may_use_values_saved_by_the_same_call(self):
+        calls = [self._call('/a', saves={'tok': '$.t'}, assertions={'tokenCheck': '$.t=={{tok}}'}),
+                 self._call('/b/{{tok}}', saves={'tok': '$.t'}, assertions={'tokenCheck': '$.t=={{tok}}'})]
+        graph = build_call_graph(calls, {'base_url'})
+        self.assertEqual(graph.dependencies[1], {0})
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'t': 'abc'}
+        int_test = APITests({"config": {"base_url": "http://localhost:8000"}, "calls": calls[:1]}, session=mock.Mock())
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            int_test.run_all()
+        self.assertEqual(int_test.run_config['tok'], 'abc')
+        with self.assertRaises(UnresolvedVariableError):
+            build_call_graph([self._call('/a/{{tok}}', saves={'tok': '$.t'})], {'base_url'})
+
+    def test_sequential_run_reports_unresolved_variables_before_sending(self):
+        calls = [self._call('/a/{{token}}'), self._call('/b', saves={'token': '$.token'})]
+        mocked_get = mock.Mock()
+        int_test = APITests({"config": {"base_url": "http://localhost:8000"}, "calls": calls}, session=mock.Mock())
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mocked_get}):
+            with self.assertRaises(UnresolvedVariableError):
+                int_test.run_all()
+        mocked_get.assert_not_called()
+
+    def test_concurrent_run_matches_sequential_results(self):
+        calls = [
+            self._call('/slow', saves={'slow': '$.value'}),
+            self._call('/fast', saves={'fast': '$.value'}),
+            self._call('/joined/{{slow}}/{{fast}}', saves={'joined': '$.value'}),
+        ]
+        started = []
+        lock = threading.Lock()
+
+        def mocked_get(session, endpoint, **kwargs):
+            with lock:
+                started.append(endpoint)
+            if endpoint.endswith('/slow'):
+                time.sleep(0.05)
+            response = mock.Mock(status_code=200)
+            response.json.return_value = {'value': endpoint.rsplit('/', 1)[-1]}
+            return response
+
+        results = []
+        for concurrency in (1, 4):
+            runner_dict = {"config": {"base_url": "http://localhost:8000"}, "calls": calls}
+            with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mocked_get}):
+                int_test = APITests(runner_dict, session=mock.Mock())
+                int_test.run_all(max_concurrency=concurrency)
+            results.append({key: int_test.run_config[key] for key in ('slow', 'fast', 'joined')})
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1]['joined'], 'fast')
+        self.assertEqual(started[-1], 'http://localhost:8000/joined/slow/fast')
@@ -0,0 +1,49 @@
+import unittest
+
+from src.dolpa.schema import compile_schema, ValidationErrors
+from src.dolpa.exceptions import InvalidSchemaError
+
+
+def violations(schema, value, limit=10):
+    errors = ValidationErrors(limit)
+    compile_schema(schema).validate(value, (), errors)
+    return errors
+
+
+class TestSchema(unittest.TestCase):
+
+    def test_supported_keywords(self):
+        schema = {
+            "type": "object",
+            "required": ["id", "name"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "integer", "minimum": 1},
+                "name": {"type": "string", "minLength": 2, "pattern": "^[A-Z]"},
+                "status": {"enum": ["active", "closed"]},
+                "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2, "uniqueItems": True},
+                "owner": {"anyOf": [{"type": "null"}, {"type": "string"}]},
+            },
+        }
+        self.assertEqual(violations(schema, {"id": 1, "name": "Ann", "status": "active", "tags": ["a"],
+                                             "owner": None}).count, 0)
+        errors = violations(schema, {"id": 0, "name": "a", "status": "open", "tags": ["a", "a", "b"],
+                                     "owner": 3, "extra": True})
+        self.assertEqual(errors.count, 8)
+        self.assertIn('$.tags[1]: duplicate item \'a\'', errors.errors)
+        self.assertIn("$: unexpected property 'extra'", errors.errors)
+        self.assertEqual(violations({"type": "integer"}, 2.0).count, 0)
+        self.assertEqual(violations({"type": "number"}, True).count, 1)
+
+    def test_multiple_of_is_exact_for_decimal_fractions(self):
+        self.assertEqual(violations({"multipleOf": 0.1}, 0.3).count, 0)
+        self.assertEqual(violations({"multipleOf": 0.01}, 19.99).count, 0)
+        self.assertEqual(violations({"multipleOf": 0.1}, 0.35).count, 1)
+        self.assertEqual(violations({"multipleOf": 3}, 9).count, 0)
+
+    def test_errors_are_capped_and_schemas_cached(self):
+        errors = violations({"items": {"type": "string"}}, list(range(50)), limit=2)
+        self.assertEqual(errors.describe(), '$[0]: expected string, found 0; $[1]: expected string, found 1 '
+                                            '(and 48 more)')
+        self.assertIs(compile_schema({"type": "string"}), compile_schema({"type": "string"}))
+        self.assertRaises(InvalidSchemaError, compile_schema, {"$ref": "#/definitions/item"})
@@ -0,0 +1,50 @@
+import os
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.scope import Scope, get_environment, refresh_environment
+
+
+class TestScope(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        refresh_environment()
+
+    def test_child_scopes_are_copy_on_write(self):
+        suite = Scope({'base_url': 'http://localhost:8000', 'team': 'qa'})
+        file_scope = Scope({'team': 'payments'}, suite)
+        first, second = file_scope.child(), file_scope.child()
+        first['token'] = 'abc'
+        self.assertEqual(first['token'], 'abc')
+        self.assertNotIn('token', second)
+        self.assertNotIn('token', file_scope)
+        self.assertEqual((first['team'], first['base_url']), ('payments', 'http://localhost:8000'))
+        self.assertIs(first.parent.local, second.parent.local)
+        self.assertEqual(first.to_dict(), {'base_url': 'http://localhost:8000', 'team': 'payments', 'token': 'abc'})
+        self.assertEqual(sorted(first), ['base_url', 'team', 'token'])
+        self.assertRaises(KeyError, lambda: first['missing'])
+
+    def test_environment_is_snapshotted_once(self):
+        with mock.patch.dict(os.environ, {'dolpa_scope_value': 'first'}):
+            self.assertEqual(refresh_environment()['dolpa_scope_value'], 'first')
+            os.environ['dolpa_scope_value'] = 'second'
+            self.assertEqual(get_environment()['dolpa_scope_value'], 'first')
+            self.assertEqual(refresh_environment()['dolpa_scope_value'], 'second')
+
+    def test_saves_override_environment_which_overrides_config(self):
+        config = {"base_url": "http://localhost:8000", "dolpa_user": "config", "dolpa_token": "config"}
+        runner_dict = {"config": config, "calls": [
+            {"identifier": 1, "resource": "/login", "method": "GET", "headers": {}, "saves": {"dolpa_token": "$.token"},
+             "assertions": {}}]}
+        response = mock.Mock(status_code=200, content=b'{}')
+        response.json.return_value = {'token': 'saved'}
+        with mock.patch.dict(os.environ, {'dolpa_user': 'env', 'dolpa_token': 'env'}):
+            refresh_environment()
+            with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+                int_test = APITests(runner_dict, session=mock.Mock(), variables={'region': 'eu'})
+                int_test.run_all()
+        self.assertEqual(int_test.run_config['dolpa_user'], 'env')
+        self.assertEqual(int_test.run_config['dolpa_token'], 'saved')
+        self.assertEqual(int_test.run_config['region'], 'eu')
+        self.assertEqual(config['dolpa_token'], 'config')
@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.dolpa_session import build_session, SessionRegistry, PooledAdapter
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.runner_dict = {
+            "config": {
+                "base_url": "http://localhost:8000",
+                "session": {"poolConnections": 2, "poolMaxsize": 4, "keepAlive": False}
+            },
+            "calls": [
+                {"identifier": 1, "resource": "/ping", "method": "GET", "headers": {}, "saves": {}, "assertions": {}}
+            ]
+        }
+
+    def test_build_session_uses_config_block(self):
+        session = build_session(self.runner_dict['config'])
+        adapter = session.get_adapter('https://localhost')
+        self.assertIsInstance(adapter, PooledAdapter)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+    def test_session_registry_shares_sessions(self):
+        registry = SessionRegistry()
+        first = registry.get({"base_url": "http://a"})
+        second = registry.get({"base_url": "http://b"})
+        third = registry.get(self.runner_dict['config'])
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+
+    def test_injected_session_is_used_for_calls(self):
+        session = mock.Mock()
+        session.get.return_value.json.return_value = {}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': lambda s, *a, **kw: s.get(*a, **kw)}):
+            APITests(self.runner_dict, session=session).run_all()
+        session.get.assert_called_once()
+        self.assertEqual(session.get.call_args[0][0], 'http://localhost:8000/ping')
@@ -0,0 +1,78 @@
+import json
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import APITests
+from src.dolpa.dolpa_utils import compile_json_path
+from src.dolpa.streaming import extract_json_paths
+
+
+class TestStreaming(unittest.TestCase):
+    class StreamedResponse:
+        status_code = 200
+
+        def __init__(self, payload, chunk_size=7):
+            self.raw = json.dumps(payload).encode()
+            self.chunk_size = chunk_size
+            self.closed = False
+            self.json_calls = 0
+
+        def iter_content(self, chunk_size):
+            for index in range(0, len(self.raw), self.chunk_size):
+                yield self.raw[index:index + self.chunk_size]
+
+        def json(self):
+            self.json_calls += 1
+            return json.loads(self.raw)
+
+        def close(self):
+            self.closed = True
+
+    def setUp(self) -> None:
+        self.payload = {
+            'export': [{'id': index, 'name': f'user-{index}', 'tags': ['a', 'b']} for index in range(500)],
+            'meta': {'count': 500, 'next': None, 'owner': {'name': 'alex'}},
+            'status': 'done',
+        }
+
+    def test_extract_full_document_in_small_chunks(self):
+        raw = json.dumps(self.payload).encode()
+        chunks = (raw[index:index + 3] for index in range(0, len(raw), 3))
+        self.assertEqual(extract_json_paths(chunks), self.payload)
+
+    def test_extract_only_required_paths(self):
+        raw = json.dumps(self.payload).encode()
+        paths = [compile_json_path('meta.count'), compile_json_path('export[2].name')]
+        extracted = extract_json_paths([raw], paths)
+        self.assertEqual(extracted, {'export': [None, None, {'name': 'user-2'}],
+                                     'meta': {'count': 500}})
+
+    def test_stream_response_mode_parses_once_and_releases_body(self):
+        response = self.StreamedResponse(self.payload)
+        runner_dict = {"config": {"base_url": "http://localhost:8000", "responseMode": "stream"}, "calls": [
+            {"identifier": 1, "resource": "/export", "method": "GET", "headers": {},
+             "saves": {"owner": "$.meta.owner.name"},
+             "assertions": {"countCheck": "$.meta.count==500", "lastCheck": "$.export[499].id>=499"}}
+        ]}
+        mocked_get = mock.Mock(return_value=response)
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mocked_get}):
+            int_test = APITests(runner_dict, session=mock.Mock())
+            int_test.run_all()
+        self.assertTrue(mocked_get.call_args[1]['stream'])
+        self.assertTrue(response.closed)
+        self.assertEqual(response.json_calls, 0)
+        self.assertEqual(int_test.run_config['owner'], 'alex')
+
+    def test_json_response_mode_parses_once(self):
+        response = self.StreamedResponse(self.payload)
+        runner_dict = {"config": {"base_url": "http://localhost:8000"}, "calls": [
+            {"identifier": 1, "resource": "/export", "method": "GET", "headers": {}, "saves": {},
+             "assertions": {"statusCheck": "$.status==done"}}
+        ]}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            int_test = APITests(runner_dict, session=mock.Mock())
+            endpoint_call = int_test.run(1, run_with_assertions=True)
+        self.assertEqual(response.json_calls, 1)
+        self.assertIsNot(endpoint_call.response, response)
+        self.assertEqual(endpoint_call.response.status_code, 200)
+        self.assertIsNone(endpoint_call.response.content)
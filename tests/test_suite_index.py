@@ -0,0 +1,74 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.dolpa.dolpa import compile_calls, run_bulk_api_tests, APITests
+from src.dolpa.suite_index import SuiteIndex
+from src.dolpa.exceptions import InValidCallAttributeError
+
+
+class TestSuiteIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.cache_path = os.path.join(tempfile.mkdtemp(), 'suite.index')
+        os.makedirs(os.path.join(self.root, 'nested'))
+        self._write('a.json', '/a')
+        self._write('nested/b.json', '/b')
+        self.compiler = mock.Mock(side_effect=compile_calls)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+        shutil.rmtree(os.path.dirname(self.cache_path))
+
+    def _write(self, name, resource, extra_call_keys=None):
+        call = {"resource": resource, "method": "GET", "headers": {}, "saves": {}, "assertions": {}}
+        call.update(extra_call_keys or {})
+        with open(os.path.join(self.root, name), 'w') as write_file:
+            json.dump({"config": {"base_url": "http://localhost:8000"}, "calls": [call]}, write_file)
+
+    def _refreshed_index(self):
+        index = SuiteIndex(self.root, self.cache_path, self.compiler)
+        index.refresh()
+        index.save()
+        return index
+
+    def test_unchanged_files_are_loaded_from_cache(self):
+        self._refreshed_index()
+        self.assertEqual(self.compiler.call_count, 2)
+        index = self._refreshed_index()
+        self.assertEqual(self.compiler.call_count, 2)
+        self.assertEqual([os.path.relpath(path, self.root) for path in index.test_files], ['a.json', 'nested/b.json'])
+        self.assertEqual(index.get(index.test_files[1]).endpoint_calls[0].resource, '/b')
+
+    def test_changed_files_are_recompiled_and_validated(self):
+        self._refreshed_index()
+        self._write('nested/b.json', '/changed', {"unknownKey": 1})
+        self._write('nested/c.json', '/c')
+        index = self._refreshed_index()
+        self.assertEqual(self.compiler.call_count, 4)
+        self.assertIsInstance(index.get(os.path.join(self.root, 'nested/b.json')).error, InValidCallAttributeError)
+        self.assertEqual(len(index.test_files), 3)
+
+    def test_run_bulk_api_tests_with_index(self):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {}
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            first = run_bulk_api_tests(self.root, index_path=self.cache_path)
+            second = run_bulk_api_tests(self.root, index_path=self.cache_path, workers=2)
+        self.assertEqual(len(first.passed), 2)
+        self.assertEqual(len(second.passed), 2)
+
+    def test_schema_assertions_survive_the_index(self):
+        self._write('a.json', '/a', {"assertions": {"shapeCheck": {"schema": {"type": "object", "required": ["id"]}}}})
+        response = mock.Mock(status_code=200)
+        with mock.patch.dict(APITests.call_method_to_req_method_mapping, {'GET': mock.Mock(return_value=response)}):
+            response.json.return_value = {'id': 1}
+            first = run_bulk_api_tests(self.root, index_path=self.cache_path)
+            response.json.return_value = {}
+            second = run_bulk_api_tests(self.root, index_path=self.cache_path, fail_fast=False)
+        self.assertEqual(len(first.passed), 2)
+        self.assertEqual([os.path.relpath(result.path, self.root) for result in second.failed], ['a.json'])
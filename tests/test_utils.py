@@ -1,7 +1,8 @@
 import os
 import unittest
 
-from src.dolpa.dolpa_utils import interpolate, get_dict_value_from_json_path, do_string_interpolation, get_all_lookouts
+from src.dolpa.dolpa_utils import (interpolate, get_dict_value_from_json_path, do_string_interpolation, get_all_lookouts,
+                                   compile_json_path, compile_template, do_dict_interpolation)
 from src.dolpa.dolpa import run_bulk_api_tests
 
 
@@ -50,3 +51,41 @@ class TestUtils(unittest.TestCase):
         actual_value = do_string_interpolation('{{value-1}}', self.test_config)
         self.assertEqual(actual_value, 'test-value-1')
 
+    def test_compile_json_path_is_cached(self):
+        self.assertIs(compile_json_path('$.body.sampleArray[0]'), compile_json_path('$.body.sampleArray[0]'))
+
+    def test_json_path_wildcards_slices_and_recursive_descent(self):
+        document = {'items': [{'price': 3, 'tags': ['a', 'b']}, {'price': 0}, {'price': 7, 'tags': ['c']}]}
+        self.assertEqual(list(compile_json_path('$.items[*].price').find(document)), [3, 0, 7])
+        self.assertEqual(list(compile_json_path('$.items[0:2].price').find(document)), [3, 0])
+        self.assertEqual(list(compile_json_path('$.items[-1].tags[0]').find(document)), ['c'])
+        self.assertEqual(list(compile_json_path('$..tags[*]').find(document)), ['a', 'b', 'c'])
+        self.assertEqual(list(compile_json_path('$.items[?(@.price > 2)].price').find(document)), [3, 7])
+        self.assertEqual(list(compile_json_path("$['items'][?(@.tags)].price").find(document)), [3, 7])
+        self.assertEqual(get_dict_value_from_json_path({'grid': [[1, 2], [3, 4]]}, 'grid[1][0]'), 3)
+
+    def test_json_path_find_is_lazy(self):
+        self.assertEqual(next(compile_json_path('$.items[*].id').find({'items': [{'id': 1}] * 100000})), 1)
+
+    def test_get_all_lookouts(self):
+        self.assertEqual(get_all_lookouts('items[0:2].tags[*]', upper_limit=2),
+                         ['items[0].tags[0]', 'items[0].tags[1]', 'items[1].tags[0]', 'items[1].tags[1]'])
+
+    def test_do_dict_interpolation_keeps_scalars_and_lists(self):
+        interpolated = do_dict_interpolation(self.test_call['body'], self.test_config)
+        self.assertEqual(interpolated['sampleArray'], self.test_call['body']['sampleArray'])
+        self.assertEqual(do_dict_interpolation({'count': 3, 'flag': False, 'ids': ['{{value-2}}', 7]}, self.test_config),
+                         {'count': 3, 'flag': False, 'ids': ['test-value-2', 7]})
+
+    def test_compiled_template_shares_static_subtrees(self):
+        template = compile_template(self.test_call['body'])
+        first, second = template.render(self.test_config), template.render({'value-1': 'other'})
+        self.assertIs(first['sampleArray'], self.test_call['body']['sampleArray'])
+        self.assertEqual((first['value-1'], second['value-1']), ('test-value-1', 'other'))
+        static_body = {'static': [1, 2]}
+        self.assertIs(compile_template(static_body).render(self.test_config), static_body)
+
+    def test_string_templates_keep_value_types(self):
+        config = {'count': 3, 'user': {'name': 'alex'}}
+        self.assertEqual(interpolate('{{count}}', config), 3)
+        self.assertEqual(interpolate('/users/{{user.name}}/items/{{count}}', config), '/users/alex/items/3')